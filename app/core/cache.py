@@ -0,0 +1,83 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+class ResponseCache:
+    """
+    Caché en proceso con TTL, desalojo LRU por tamaño máximo y coalescencia
+    de requests (single-flight): si varias peticiones piden la misma llave en frío,
+    solo la primera ejecuta el cálculo y las demás esperan su resultado.
+    """
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: dict = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        # 1. Entrada vigente en memoria
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        # 2. Cálculo en curso para la misma llave: nos colgamos del mismo task
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            generation = self._generation
+            task.add_done_callback(lambda t: self._on_done(key, generation, t))
+
+        # shield: si un cliente cancela, el cálculo sigue para los demás
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, generation: int, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        # Un invalidate() durante el cálculo descarta el resultado
+        if generation != self._generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> int:
+        """Vacía la caché y devuelve cuántas entradas se eliminaron."""
+        removed = len(self._entries)
+        self._entries.clear()
+        self._generation += 1
+        return removed
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
+
+# Caché compartida por los resúmenes ejecutivos (conciertos y discografía)
+executive_summary_cache = ResponseCache(
+    ttl_seconds=float(os.getenv("EXECUTIVE_SUMMARY_CACHE_TTL", "300")),
+    max_size=int(os.getenv("EXECUTIVE_SUMMARY_CACHE_MAX_SIZE", "32"))
+)
@@ -0,0 +1,66 @@
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+from fastapi import Depends, Request
+from app.database import get_db
+from app.core.metrics import METRICS_ENABLED
+from app.core.slow_queries import SLOW_QUERY_LOG
+
+T = TypeVar("T")
+
+class ServiceContainer:
+    """
+    Servicios y repositorios de la aplicación, uno por proceso. Ninguno guarda estado
+    por request (solo db), así que se construyen una vez y los providers de
+    app/core/dependencies.py devuelven siempre la misma instancia. Es el lugar para
+    colgar cachés, pipelines preparados o métricas de cada servicio.
+    Cada servicio se construye en su primer uso: con LAZY_ROUTERS no se adelanta nada.
+    read_dbs asigna a ciertos routers la base con preferencia de lectura de analítica
+    (MONGODB_SECONDARY_ROUTERS); los demás usan db (primario).
+    """
+    def __init__(self, db, read_dbs: Optional[Dict[str, Any]] = None):
+        self.db = db
+        self.read_dbs = read_dbs or {}
+        self.created_at = time.time()
+        self._services: Dict[Callable, Any] = {}
+        self.resolutions = 0
+
+    def get(self, factory: Callable[[Any], T], router: Optional[str] = None) -> T:
+        self.resolutions += 1
+        service = self._services.get(factory)
+        if service is None:
+            db = self.db_for(router)
+            if METRICS_ENABLED or SLOW_QUERY_LOG:
+                # Repositorios medidos por (repository, method, collection): app/core/instrumented_db.py
+                from app.core.instrumented_db import InstrumentedDatabase
+                db = InstrumentedDatabase(db)
+            service = self._services.setdefault(factory, factory(db))
+        return service
+
+    def db_for(self, router: Optional[str]):
+        return self.read_dbs.get(router, self.db)
+
+    def clear(self) -> int:
+        """Descarta las instancias (se reconstruyen en el próximo request)."""
+        removed = len(self._services)
+        self._services.clear()
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "services": sorted(factory.__name__ for factory in self._services),
+            "secondary_routers": sorted(self.read_dbs),
+            "resolutions": self.resolutions,
+            "created_at": self.created_at
+        }
+
+def init_container(app, db, read_dbs: Optional[Dict[str, Any]] = None) -> ServiceContainer:
+    """Se llama en el lifespan, una vez conectada la base."""
+    app.state.services = ServiceContainer(db, read_dbs)
+    return app.state.services
+
+def get_container(request: Request, db=Depends(get_db)) -> ServiceContainer:
+    container = getattr(request.app.state, "services", None)
+    # Sin lifespan (clientes de prueba) o con get_db sobrescrito: contenedor para esa base
+    if container is None or container.db is not db:
+        container = init_container(request.app, db)
+    return container
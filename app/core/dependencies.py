@@ -1,56 +1,101 @@
 from fastapi import Depends
-from app.database import get_db
-from app.repositories.statistics_discography_repository import StatisticsDiscographyRepository
-from app.repositories.statistics_concerts_repository import StatisticsConcertsRepository
-from app.services.statistics_discography_service import StatisticsDiscographyService
-from app.repositories.album_repository import AlbumRepository
-from app.services.album_service import AlbumService
-from app.repositories.composer_repository import ComposerRepository
-from app.services.composer_service import ComposerService
-from app.repositories.geography_repository import GeographyRepository
-from app.services.geography_service import GeographyService
-from app.repositories.musician_repository import MusicianRepository
-from app.services.musician_service import MusicianService
-from app.repositories.track_repository import TrackRepository
-from app.services.track_service import TrackService
-from app.repositories.discography_executive_summary_repository import DiscographyExecutiveSummaryRepository
-from app.repositories.concert_repository import ConcertRepository
-from app.services.concert_service import ConcertService
-from app.repositories.concert_masters_repository import ConcertMastersRepository
-from app.services.concert_masters_service import ConcertMastersService
-from app.repositories.concerts_executive_summary_repository import ConcertsExecutiveSummaryRepository
-from app.services.statistics_concerts_service import StatisticsConcertsService
-
-def get_stats_discography_service(db=Depends(get_db)):
+from app.core.container import ServiceContainer, get_container
+
+# --- Fábricas: se ejecutan una vez por proceso (ServiceContainer en app/core/container.py) ---
+# Cada fábrica importa su repositorio y su servicio: con LAZY_ROUTERS=true el primer router que se
+# carga solo paga el import de lo que usa, no el de todos los repositorios y servicios de la API.
+
+def build_stats_discography_service(db):
+    from app.core.cache import executive_summary_cache
+    from app.repositories.discography_executive_summary_repository import DiscographyExecutiveSummaryRepository
+    from app.repositories.statistics_discography_repository import StatisticsDiscographyRepository
+    from app.services.statistics_discography_service import StatisticsDiscographyService
     repo = StatisticsDiscographyRepository(db)
     executiveSummaryRepo = DiscographyExecutiveSummaryRepository(db)
-    return StatisticsDiscographyService(repo, executiveSummaryRepo)
+    return StatisticsDiscographyService(repo, executiveSummaryRepo, executive_summary_cache)
 
-def get_album_service(db=Depends(get_db)):
+def build_album_service(db):
+    from app.repositories.album_repository import AlbumRepository
+    from app.services.album_service import AlbumService
     repo = AlbumRepository(db)
     return AlbumService(repo)
 
-def get_composer_service(db=Depends(get_db)):
+def build_composer_service(db):
+    from app.repositories.composer_repository import ComposerRepository
+    from app.services.composer_service import ComposerService
     repo = ComposerRepository(db)
     return ComposerService(repo)
 
-def get_geo_service(db=Depends(get_db)):
+def build_geo_service(db):
+    from app.repositories.geography_repository import GeographyRepository
+    from app.services.geography_service import GeographyService
     repo = GeographyRepository(db)
     return GeographyService(repo)
 
-def get_musician_service(db=Depends(get_db)):
+def build_musician_service(db):
+    from app.repositories.musician_repository import MusicianRepository
+    from app.services.musician_service import MusicianService
     return MusicianService(MusicianRepository(db))
 
-def get_track_service(db=Depends(get_db)):
+def build_track_service(db):
+    from app.repositories.track_repository import TrackRepository
+    from app.services.track_service import TrackService
     return TrackService(TrackRepository(db))
 
-def get_concert_service(db=Depends(get_db)):
+def build_concert_service(db):
+    from app.repositories.concert_repository import ConcertRepository
+    from app.services.concert_service import ConcertService
     return ConcertService(ConcertRepository(db))
 
-def get_concert_masters_service(db=Depends(get_db)):
+def build_concert_masters_service(db):
+    from app.repositories.concert_masters_repository import ConcertMastersRepository
+    from app.services.concert_masters_service import ConcertMastersService
     return ConcertMastersService(ConcertMastersRepository(db))
 
-def get_stats_concerts_service(db=Depends(get_db)):
+def build_stats_concerts_service(db):
+    from app.core.cache import executive_summary_cache
+    from app.repositories.concerts_executive_summary_repository import ConcertsExecutiveSummaryRepository
+    from app.repositories.statistics_concerts_repository import StatisticsConcertsRepository
+    from app.services.statistics_concerts_service import StatisticsConcertsService
     repo = StatisticsConcertsRepository(db)
     executiveSummaryRepo = ConcertsExecutiveSummaryRepository(db)
-    return StatisticsConcertsService(repo, executiveSummaryRepo)
+    return StatisticsConcertsService(repo, executiveSummaryRepo, executive_summary_cache)
+
+def build_search_service(db):
+    from app.repositories.search_index import search_index
+    from app.repositories.search_repository import SearchRepository
+    from app.services.search_service import SearchService
+    return SearchService(SearchRepository(db), search_index)
+
+# --- Providers de Depends: devuelven la instancia compartida ---
+# El segundo argumento es el router: decide la preferencia de lectura (MONGODB_SECONDARY_ROUTERS)
+
+def get_stats_discography_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_stats_discography_service, "statistics")
+
+def get_album_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_album_service, "albums")
+
+def get_composer_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_composer_service, "composers")
+
+def get_geo_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_geo_service, "geography")
+
+def get_musician_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_musician_service, "musicians")
+
+def get_track_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_track_service, "tracks")
+
+def get_concert_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_concert_service, "concerts")
+
+def get_concert_masters_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_concert_masters_service, "concert-masters")
+
+def get_stats_concerts_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_stats_concerts_service, "statistics")
+
+def get_search_service(container: ServiceContainer = Depends(get_container)):
+    return container.get(build_search_service, "search")
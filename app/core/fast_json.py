@@ -0,0 +1,44 @@
+import os
+from functools import lru_cache
+from typing import Any, List, Type
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el JSONResponse estándar
+    orjson = None
+
+# Camino rápido opt-in (FAST_JSON=true): los endpoints de listas serializan los DTOs
+# una sola vez con pydantic-core en lugar de volver a validarlos vía response_model.
+FAST_JSON = os.getenv("FAST_JSON", "false").strip().lower() in ("1", "true", "yes")
+
+def fast_json_enabled() -> bool:
+    return FAST_JSON
+
+@lru_cache(maxsize=None)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+def validate_list(dto_type: Type, rows: List[dict]) -> list:
+    """Valida todas las filas en una sola llamada (TypeAdapter(List[Dto])) en vez de model_validate por fila."""
+    return _adapter(List[dto_type]).validate_python(rows)
+
+def json_response(content: Any, annotation: Any) -> Any:
+    """
+    Con FAST_JSON devuelve un Response ya serializado (FastAPI no vuelve a pasar por response_model);
+    sin él devuelve el contenido tal cual para el camino habitual.
+    """
+    if not FAST_JSON:
+        return content
+    return Response(
+        content=_adapter(annotation).dump_json(content, by_alias=True),
+        media_type="application/json"
+    )
+
+def default_response_class() -> Type[JSONResponse]:
+    """ORJSONResponse para las respuestas sin response_model cuando FAST_JSON está activo y orjson instalado."""
+    if FAST_JSON and orjson is not None:
+        from fastapi.responses import ORJSONResponse
+        return ORJSONResponse
+    return JSONResponse
@@ -0,0 +1,124 @@
+import time
+from app.core.metrics import MONGO_OPERATION_SECONDS
+from app.core.operation_labels import current_operation
+from app.core.slow_queries import SLOW_QUERY_LOG, slow_query_log
+
+# Operaciones que devuelven un cursor (se mide hasta agotarlo) y las que se esperan directamente
+_CURSOR_OPERATIONS = ("aggregate", "find")
+_AWAITABLE_OPERATIONS = ("count_documents", "estimated_document_count", "distinct", "find_one")
+# Modificadores encadenados de find(): forman parte de la consulta que se repite con explain()
+_CURSOR_MODIFIERS = ("sort", "skip", "limit", "hint", "collation")
+
+class InstrumentedCursor:
+    """Cursor de Motor que acumula el tiempo de to_list / iteración y lo observa al terminar."""
+
+    def __init__(self, cursor, labels: tuple, collection=None, call: tuple = ((), {})):
+        self._cursor = cursor
+        self._labels = labels
+        # Colección y argumentos originales: el slow-query log repite la consulta con explain()
+        self._collection = collection
+        self._call = (call[0], dict(call[1]))
+        self._elapsed = 0.0
+        self._observed = False
+
+    def _observe(self) -> None:
+        if not self._observed:
+            self._observed = True
+            MONGO_OPERATION_SECONDS.observe(self._elapsed, *self._labels)
+            if SLOW_QUERY_LOG and self._collection is not None:
+                slow_query_log.observe(self._collection, self._labels[3], *self._call, self._labels, self._elapsed)
+
+    async def to_list(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await self._cursor.to_list(*args, **kwargs)
+        finally:
+            self._elapsed += time.perf_counter() - started
+            self._observe()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        started = time.perf_counter()
+        try:
+            return await self._cursor.__anext__()
+        except StopAsyncIteration:
+            self._elapsed += time.perf_counter() - started
+            self._observe()
+            raise
+        finally:
+            if not self._observed:
+                self._elapsed += time.perf_counter() - started
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            # sort/limit/skip/batch_size devuelven el mismo cursor: se conserva el envoltorio
+            result = attr(*args, **kwargs)
+            if name in _CURSOR_MODIFIERS and args:
+                self._record(name, args, kwargs)
+            return self if result is self._cursor else result
+        return chained
+
+    def _record(self, name: str, args: tuple, kwargs: dict) -> None:
+        """Guarda sort/skip/limit/... como si se hubieran pasado a find(): el explain usa la consulta real."""
+        value = args[0]
+        if name == "sort" and isinstance(value, str):
+            # cursor.sort("campo", dirección) -> [("campo", dirección)]
+            direction = args[1] if len(args) > 1 else kwargs.get("direction", 1)
+            value = [(value, 1 if direction is None else direction)]
+        self._call[1][name] = value
+
+async def _timed(awaitable, labels: tuple):
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        MONGO_OPERATION_SECONDS.observe(time.perf_counter() - started, *labels)
+
+class InstrumentedCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name in _CURSOR_OPERATIONS:
+            def cursor_operation(*args, **kwargs):
+                labels = (*current_operation.get(), self._collection.name, name)
+                return InstrumentedCursor(attr(*args, **kwargs), labels, self._collection, (args, kwargs))
+            return cursor_operation
+        if name in _AWAITABLE_OPERATIONS:
+            def awaitable_operation(*args, **kwargs):
+                labels = (*current_operation.get(), self._collection.name, name)
+                return _timed(attr(*args, **kwargs), labels)
+            return awaitable_operation
+        return attr
+
+    def __getitem__(self, name):
+        return InstrumentedCollection(self._collection[name])
+
+class InstrumentedDatabase:
+    """
+    Envoltorio de la base que ven los repositorios cuando METRICS_ENABLED=true o
+    SLOW_QUERY_LOG=true: aggregate/find/count_documents/distinct/find_one quedan medidos
+    con labels (repository, method, collection, operation), donde repository y method los fija
+    @labelled_operations (app/core/operation_labels.py), y los cursores lentos pasan
+    al slow-query log (app/core/slow_queries.py). Todo lo demás pasa directo a Motor.
+    """
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        return InstrumentedCollection(attr) if hasattr(attr, "aggregate") and hasattr(attr, "name") else attr
+
+    def __getitem__(self, name):
+        return InstrumentedCollection(self._db[name])
+
+    def get_collection(self, name, *args, **kwargs):
+        return InstrumentedCollection(self._db.get_collection(name, *args, **kwargs))
@@ -0,0 +1,77 @@
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Iterable, List, Optional, Sequence, Tuple
+from fastapi import FastAPI
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Devuelve el módulo sin ejecutarlo: se carga en el primer acceso a un atributo.
+    Para dependencias pesadas (numpy) que solo usan algunos endpoints.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+class LazyRouterLoader:
+    """
+    Registra los routers en el primer request que llega a su prefijo, en lugar de importarlos
+    todos al arrancar. Los documentos de OpenAPI cargan todos los routers pendientes.
+    """
+
+    def __init__(self, app: FastAPI, routers: Sequence[Tuple[str, str]], prefix: str = "", dependencies: Optional[list] = None):
+        # routers: (módulo, prefijo declarado en su APIRouter)
+        self.app = app
+        self.prefix = prefix
+        self.dependencies = dependencies or []
+        self.pending = {module: prefix + router_prefix for module, router_prefix in routers}
+        self.loaded: List[str] = []
+
+    def load(self, module_name: str) -> None:
+        if self.pending.pop(module_name, None) is None:
+            return
+        module = importlib.import_module(module_name)
+        self.app.include_router(module.router, prefix=self.prefix, dependencies=self.dependencies)
+        self.loaded.append(module_name)
+        # El esquema OpenAPI se regenera con las rutas nuevas
+        self.app.openapi_schema = None
+
+    def load_all(self) -> None:
+        for module_name in list(self.pending):
+            self.load(module_name)
+
+    def modules_for_path(self, path: str) -> Iterable[str]:
+        for module_name, full_prefix in list(self.pending.items()):
+            if full_prefix == self.prefix:
+                # Router sin prefijo propio (p. ej. composers en /api/v1/)
+                if path.rstrip("/") == self.prefix.rstrip("/"):
+                    yield module_name
+            elif path == full_prefix or path.startswith(full_prefix + "/"):
+                yield module_name
+
+class LazyRouterMiddleware:
+    """Middleware ASGI que importa el router correspondiente antes de enrutar el request."""
+
+    def __init__(self, app, loader: LazyRouterLoader):
+        self.app = app
+        self.loader = loader
+        self.docs_paths = {loader.app.openapi_url, loader.app.docs_url, loader.app.redoc_url}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.loader.pending:
+            path = scope["path"]
+            if path in self.docs_paths:
+                self.loader.load_all()
+            else:
+                for module_name in self.loader.modules_for_path(path):
+                    self.loader.load(module_name)
+        await self.app(scope, receive, send)
@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from pymongo import monitoring
+
+# Con METRICS_ENABLED=false (por defecto) no se registra el listener, ni el middleware,
+# ni se envuelve la base de los repositorios: costo cero en cada request.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+# Bearer token para /metrics; sin token el endpoint solo responde fuera de producción
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, value: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in items]
+        return lines
+
+class Histogram:
+    """Histograma acumulativo al estilo Prometheus: conteo por bucket (le), suma y total por combinación de labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[tuple, Tuple[List[int], float, int]]:
+        with self._lock:
+            return {labels: (list(s[0]), s[1], s[2]) for labels, s in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class GaugeCallback:
+    """Gauge que se calcula al momento del scrape (p. ej. el estado del pool de conexiones)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], collect: Callable[[], Iterable[Tuple[tuple, float]]]):
+        self.name, self.documentation, self.labelnames, self.collect = name, documentation, tuple(labelnames), collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in self.collect()]
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, labelnames: Sequence[str], collect) -> GaugeCallback:
+        return self._metrics.setdefault(name, GaugeCallback(name, documentation, labelnames, collect))
+
+    def render(self) -> str:
+        """Formato de texto de Prometheus (text/plain; version=0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Latencia de los requests HTTP por ruta", ("method", "route", "status"))
+MONGO_COMMAND_SECONDS = registry.histogram(
+    "mongo_command_duration_seconds", "Duración de cada comando enviado a MongoDB (CommandListener)", ("command", "collection"))
+MONGO_COMMAND_FAILURES = registry.counter(
+    "mongo_command_failures_total", "Comandos de MongoDB que fallaron", ("command", "collection"))
+MONGO_OPERATION_SECONDS = registry.histogram(
+    "mongo_operation_duration_seconds",
+    "Duración de aggregate/find/count_documents/distinct/find_one vista desde el repositorio (incluye getMore)",
+    ("repository", "method", "collection", "operation"))
+
+# --- Mongo: todos los comandos, incluso los ad-hoc (scripts, maestros, get_data_version) ---
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Los eventos llegan desde los hilos del driver. started guarda la colección del comando
+    (succeeded/failed no la traen) y succeeded/failed observan duration_micros.
+    """
+
+    def __init__(self):
+        self._collections: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        command = event.command
+        target = command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        with self._lock:
+            self._collections[self._key(event)] = collection
+
+    def _pop(self, event) -> str:
+        with self._lock:
+            return self._collections.pop(self._key(event), "-")
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, event.command_name, self._pop(event))
+
+    def failed(self, event):
+        collection = self._pop(event)
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, event.command_name, collection)
+        MONGO_COMMAND_FAILURES.inc(event.command_name, collection)
+
+command_metrics = CommandMetrics()
+
+def register_pool_gauges(pool_metrics) -> None:
+    """Conexiones abiertas/en uso/en espera por servidor (app/core/pool_metrics.py)."""
+    def collect(field):
+        return lambda: [((address,), s[field]) for address, s in pool_metrics.stats()["servers"].items()]
+
+    registry.gauge_callback("mongo_pool_open_connections", "Conexiones abiertas en el pool", ("server",), collect("open"))
+    registry.gauge_callback("mongo_pool_in_use_connections", "Conexiones prestadas a operaciones", ("server",), collect("in_use"))
+    registry.gauge_callback("mongo_pool_waiting_checkouts", "Operaciones esperando una conexión", ("server",), collect("waiting"))
+    registry.gauge_callback("mongo_pool_checkout_failures", "Checkouts fallidos (acumulado)", ("server",), collect("checkout_failures"))
+
+# --- HTTP ---
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: latencia por plantilla de ruta (/albums/{album_id}, no la URL concreta,
+    para no multiplicar las series). Las rutas no encontradas se agrupan en "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, scope["method"],
+                getattr(route, "path", None) or "unmatched", str(status["code"])
+            )
+
+def authorized(authorization: Optional[str]) -> bool:
+    if METRICS_TOKEN:
+        return authorization == f"Bearer {METRICS_TOKEN}"
+    return os.getenv("ENVIRONMENT", "development") != "production"
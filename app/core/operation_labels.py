@@ -0,0 +1,34 @@
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Iterable, Tuple
+
+# (repositorio, método) del que sale cada consulta: lo lee InstrumentedDatabase (app/core/instrumented_db.py).
+# Es un ContextVar: las tareas de asyncio.gather heredan el valor de quien las creó.
+current_operation: ContextVar[Tuple[str, str]] = ContextVar("mongo_operation", default=("-", "-"))
+
+def _labelled(owner: str, name: str, method):
+    @functools.wraps(method)
+    async def call(*args, **kwargs):
+        token = current_operation.set((owner, name))
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+    return call
+
+def labelled_operations(skip: Iterable[str] = ()):
+    """
+    Decorador de clase: cada método async declarado en la clase etiqueta las consultas que hace
+    con (nombre de la clase, nombre del método). Los helpers genéricos (skip) no cambian la etiqueta:
+    sus consultas se atribuyen al método que los llamó.
+    """
+    skipped = set(skip)
+
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name in skipped or name.startswith("__") or not inspect.iscoroutinefunction(member):
+                continue
+            setattr(cls, name, _labelled(cls.__name__, name, member))
+        return cls
+    return decorate
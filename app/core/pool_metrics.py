@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict, Optional
+from pymongo import monitoring
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Contadores del pool de conexiones de Motor/PyMongo por servidor.
+    Los eventos llegan desde los hilos del driver, por eso cada actualización va bajo lock.
+    Saturación = conexiones en uso / maxPoolSize; "waiting" son los checkouts que
+    todavía esperan una conexión (la cola que se forma cuando el pool está lleno).
+    """
+
+    def __init__(self, max_pool_size: Optional[int] = None):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._servers: Dict[str, dict] = {}
+
+    def _server(self, address) -> dict:
+        key = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+        server = self._servers.get(key)
+        if server is None:
+            server = self._servers[key] = {
+                "open": 0, "in_use": 0, "waiting": 0, "max_in_use": 0, "max_waiting": 0,
+                "created": 0, "closed": 0, "checkouts": 0, "checkout_failures": 0,
+                "checkout_wait_ms_total": 0.0, "checkout_wait_ms_max": 0.0,
+                "cleared": 0, "closed_reasons": {}, "failure_reasons": {}
+            }
+        return server
+
+    # --- Eventos del pool ---
+
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._server(event.address)["cleared"] += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["created"] += 1
+            server["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["closed"] += 1
+            server["open"] = max(server["open"] - 1, 0)
+            reasons = server["closed_reasons"]
+            reasons[event.reason] = reasons.get(event.reason, 0) + 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["waiting"] += 1
+            server["max_waiting"] = max(server["max_waiting"], server["waiting"])
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["waiting"] = max(server["waiting"] - 1, 0)
+            server["checkout_failures"] += 1
+            reasons = server["failure_reasons"]
+            reasons[event.reason] = reasons.get(event.reason, 0) + 1
+
+    def connection_checked_out(self, event):
+        # duration (segundos) existe desde PyMongo 4.7: tiempo total esperando la conexión
+        wait_ms = (getattr(event, "duration", None) or 0.0) * 1000
+        with self._lock:
+            server = self._server(event.address)
+            server["waiting"] = max(server["waiting"] - 1, 0)
+            server["in_use"] += 1
+            server["checkouts"] += 1
+            server["max_in_use"] = max(server["max_in_use"], server["in_use"])
+            server["checkout_wait_ms_total"] += wait_ms
+            server["checkout_wait_ms_max"] = max(server["checkout_wait_ms_max"], wait_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["in_use"] = max(server["in_use"] - 1, 0)
+
+    # --- Lectura ---
+
+    def stats(self) -> dict:
+        with self._lock:
+            servers = {}
+            for address, s in self._servers.items():
+                servers[address] = {
+                    **{k: v for k, v in s.items() if not isinstance(v, dict)},
+                    "closed_reasons": dict(s["closed_reasons"]),
+                    "failure_reasons": dict(s["failure_reasons"]),
+                    "checkout_wait_ms_avg": round(s["checkout_wait_ms_total"] / s["checkouts"], 3) if s["checkouts"] else 0.0,
+                    "checkout_wait_ms_total": round(s["checkout_wait_ms_total"], 3),
+                    "checkout_wait_ms_max": round(s["checkout_wait_ms_max"], 3),
+                    "saturation": round(s["in_use"] / self.max_pool_size, 4) if self.max_pool_size else None,
+                    "peak_saturation": round(s["max_in_use"] / self.max_pool_size, 4) if self.max_pool_size else None
+                }
+        return {"max_pool_size": self.max_pool_size, "collected_at": time.time(), "servers": servers}
+
+    def reset_peaks(self) -> None:
+        """Reinicia los máximos (max_in_use, max_waiting, espera máxima) para medir una nueva ventana."""
+        with self._lock:
+            for s in self._servers.values():
+                s["max_in_use"] = s["in_use"]
+                s["max_waiting"] = s["waiting"]
+                s["checkout_wait_ms_max"] = 0.0
@@ -42,4 +42,16 @@ async def validate_layered_security(request: Request, api_key: str = Security(ap
                     detail=f"Access denied from this origin: '{referer}'"
                 )
         
-    return api_key
\ No newline at end of file
+    return api_key
+
+ADMIN_KEY_NAME = "X-Santana-Admin-Token"
+
+admin_key_header = APIKeyHeader(name=ADMIN_KEY_NAME, auto_error=False)
+
+async def validate_admin_token(admin_key: str = Security(admin_key_header)):
+    # Las operaciones administrativas exigen un token propio además del token de la app
+    expected = os.getenv("API_KEY_ADMIN")
+    if not expected or admin_key != expected:
+        raise HTTPException(status_code=403, detail="Invalid Admin Token")
+
+    return admin_key
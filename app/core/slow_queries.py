@@ -0,0 +1,229 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from bson import json_util
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+# Modo diagnóstico: cada aggregate/find de un repositorio que supere SLOW_QUERY_MS se
+# vuelve a ejecutar con explain("executionStats") y queda registrado en slow_queries.
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "false").strip().lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# explain("executionStats") repite la consulta: uno por (repositorio, método) cada N segundos
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+SLOW_QUERY_MAX_PENDING = int(os.getenv("SLOW_QUERY_MAX_PENDING", "2"))
+# Colección capped: Mongo descarta las entradas más viejas al llegar al tamaño
+SLOW_QUERY_COLLECTION = "slow_queries"
+SLOW_QUERY_CAPPED_BYTES = int(os.getenv("SLOW_QUERY_CAPPED_BYTES", str(16 * 1024 * 1024)))
+_MAX_PIPELINE_CHARS = 8000
+
+# Opciones de aggregate/find que cambian el plan y deben viajar con el explain
+_AGGREGATE_OPTIONS = ("allowDiskUse", "hint", "collation", "let")
+_FIND_OPTIONS = {"sort": "sort", "limit": "limit", "skip": "skip", "hint": "hint", "collation": "collation"}
+
+def _walk_plan(plan: Optional[dict], stages: list, indexes: set, lookups: list) -> None:
+    """Recorre el árbol del plan ganador (clásico o SBE) juntando etapas, índices y estrategias de $lookup."""
+    if not isinstance(plan, dict):
+        return
+    if "queryPlan" in plan:
+        _walk_plan(plan["queryPlan"], stages, indexes, lookups)
+        return
+    stage = plan.get("stage")
+    if stage:
+        stages.append(stage)
+        if plan.get("indexName"):
+            indexes.add(plan["indexName"])
+        if stage == "EQ_LOOKUP":
+            lookups.append({"from": plan.get("foreignCollection"), "strategy": plan.get("strategy"),
+                            "index": plan.get("indexName")})
+    for key in ("inputStage", "outerStage", "innerStage"):
+        _walk_plan(plan.get(key), stages, indexes, lookups)
+    for child in plan.get("inputStages") or []:
+        _walk_plan(child, stages, indexes, lookups)
+
+def _cursor_summary(section: dict, summary: dict) -> None:
+    """Sección con queryPlanner + executionStats ($cursor, find o pipeline empujado a SBE)."""
+    execution = section.get("executionStats") or {}
+    summary["docs_examined"] += execution.get("totalDocsExamined", 0)
+    summary["keys_examined"] += execution.get("totalKeysExamined", 0)
+    summary["n_returned"] = execution.get("nReturned", summary["n_returned"])
+    summary["execution_ms"] = max(summary["execution_ms"], execution.get("executionTimeMillis", 0))
+
+    plan_stages, indexes, lookups = [], set(), []
+    _walk_plan((section.get("queryPlanner") or {}).get("winningPlan"), plan_stages, indexes, lookups)
+    summary["plan"] += plan_stages
+    summary["indexes_used"] = sorted(set(summary["indexes_used"]) | indexes)
+    summary["lookups"] += lookups
+    summary["collection_scans"] += plan_stages.count("COLLSCAN")
+    summary["stages"].append({
+        "stage": "$cursor", "n_returned": execution.get("nReturned"),
+        "time_ms": execution.get("executionTimeMillis"),
+        "docs_examined": execution.get("totalDocsExamined"), "keys_examined": execution.get("totalKeysExamined"),
+        "plan": " <- ".join(plan_stages)
+    })
+
+def summarize_explain(explain: dict) -> dict:
+    """
+    Resumen de explain("executionStats"): documentos y claves examinados, scans de
+    colección y tiempo por etapa. Los $lookup del motor clásico reportan sus propios
+    collectionScans/totalDocsExamined; en SBE aparecen como EQ_LOOKUP con su estrategia
+    (NestedLoopJoin = scan de la colección foránea por cada documento).
+    """
+    summary = {"docs_examined": 0, "keys_examined": 0, "n_returned": None, "execution_ms": 0,
+               "collection_scans": 0, "indexes_used": [], "plan": [], "lookups": [], "stages": []}
+
+    # Colecciones sharded: un explain por shard
+    sections = list(explain["shards"].values()) if isinstance(explain.get("shards"), dict) else [explain]
+    for section in sections:
+        if "stages" not in section:
+            _cursor_summary(section, summary)
+            continue
+        for stage in section["stages"]:
+            name = next((k for k in stage if k.startswith("$")), "?")
+            if name == "$cursor":
+                _cursor_summary(stage["$cursor"], summary)
+                summary["stages"][-1]["time_ms"] = stage.get("executionTimeMillisEstimate")
+                continue
+            docs, keys = stage.get("totalDocsExamined"), stage.get("totalKeysExamined")
+            summary["docs_examined"] += docs or 0
+            summary["keys_examined"] += keys or 0
+            summary["collection_scans"] += stage.get("collectionScans", 0)
+            summary["indexes_used"] = sorted(set(summary["indexes_used"]) | {
+                i.get("index") for i in stage.get("indexesUsed") or [] if isinstance(i, dict) and i.get("index")
+            } | {i for i in stage.get("indexesUsed") or [] if isinstance(i, str)})
+            summary["stages"].append({
+                "stage": name, "n_returned": stage.get("nReturned"), "time_ms": stage.get("executionTimeMillisEstimate"),
+                "docs_examined": docs, "keys_examined": keys, "collection_scans": stage.get("collectionScans")
+            })
+    # Devueltos por la última etapa, no por el $cursor inicial
+    returned = [s["n_returned"] for s in summary["stages"] if s.get("n_returned") is not None]
+    if returned:
+        summary["n_returned"] = returned[-1]
+    summary["execution_ms"] = max(
+        [summary["execution_ms"]] + [s["time_ms"] for s in summary["stages"] if isinstance(s.get("time_ms"), (int, float))]
+    )
+    return summary
+
+def explain_command(collection_name: str, operation: str, args: tuple, kwargs: dict) -> Optional[dict]:
+    """Comando explain equivalente a la llamada original del repositorio (None si no aplica)."""
+    if operation == "aggregate":
+        pipeline = args[0] if args else kwargs.get("pipeline", [])
+        command = {"aggregate": collection_name, "pipeline": pipeline, "cursor": {}}
+        command.update({k: kwargs[k] for k in _AGGREGATE_OPTIONS if k in kwargs})
+    elif operation == "find":
+        command = {"find": collection_name, "filter": (args[0] if args else kwargs.get("filter")) or {}}
+        projection = args[1] if len(args) > 1 else kwargs.get("projection")
+        if projection is not None:
+            command["projection"] = dict.fromkeys(projection, 1) if isinstance(projection, (list, tuple)) else projection
+        command.update({field: kwargs[k] for k, field in _FIND_OPTIONS.items() if k in kwargs})
+        if isinstance(command.get("sort"), list):
+            command["sort"] = dict(command["sort"])
+    else:
+        return None
+    return {"explain": command, "verbosity": "executionStats"}
+
+class SlowQueryLog:
+    """
+    Captura en segundo plano (no retrasa la respuesta): el request ya pagó la consulta
+    lenta; el explain corre después y se limita con SLOW_QUERY_EXPLAIN_INTERVAL y
+    SLOW_QUERY_MAX_PENDING para no duplicar la carga de un pipeline caro.
+    Las apariciones dentro del intervalo se registran igual, sin explain.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, explain_interval: float = SLOW_QUERY_EXPLAIN_INTERVAL,
+                 max_pending: int = SLOW_QUERY_MAX_PENDING):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self.max_pending = max_pending
+        self._last_explain: Dict[Tuple[str, str], float] = {}
+        self._tasks: set = set()
+        self._explaining = 0
+        self._collection_ready = False
+        self.captured = 0
+        self.explained = 0
+        self.errors = 0
+
+    def observe(self, collection, operation: str, args: tuple, kwargs: dict, labels: tuple, elapsed: float) -> None:
+        """Llamado por app/core/instrumented_db.py al terminar cada cursor."""
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms or operation not in ("aggregate", "find"):
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(
+                self._capture(collection, operation, args, kwargs, labels, duration_ms))
+        except RuntimeError:
+            return
+        # Referencia fuerte hasta que termine (asyncio solo guarda referencias débiles)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _should_explain(self, key: Tuple[str, str]) -> Optional[str]:
+        """None si corresponde explicar; si no, el motivo por el que se omite."""
+        now = time.monotonic()
+        if now - self._last_explain.get(key, float("-inf")) < self.explain_interval:
+            return "throttled"
+        if self._explaining >= self.max_pending:
+            return "busy"
+        self._last_explain[key] = now
+        return None
+
+    async def _capture(self, collection, operation: str, args: tuple, kwargs: dict, labels: tuple, duration_ms: float) -> None:
+        repository, method = labels[0], labels[1]
+        command = explain_command(collection.name, operation, args, kwargs)
+        entry = {
+            "created_at": datetime.utcnow(),
+            "repository": repository,
+            "method": method,
+            "collection": collection.name,
+            "operation": operation,
+            "duration_ms": round(duration_ms, 1),
+            "threshold_ms": self.threshold_ms,
+            # Como texto: los nombres de campo con $ del pipeline no se guardan tal cual
+            "query": json_util.dumps(command["explain"] if command else args)[:_MAX_PIPELINE_CHARS],
+            "summary": None,
+            "explain_skipped": self._should_explain((repository, method))
+        }
+        database = collection.database
+        try:
+            if command and entry["explain_skipped"] is None:
+                # Mismo miembro del replica set que la consulta original (read preference del router)
+                self._explaining += 1
+                try:
+                    explain = await database.command(command, read_preference=collection.read_preference)
+                finally:
+                    self._explaining -= 1
+                entry["summary"] = summarize_explain(explain)
+                self.explained += 1
+            await self._ensure_collection(database)
+            await database[SLOW_QUERY_COLLECTION].insert_one(entry)
+            self.captured += 1
+            print(f"🐢 Consulta lenta: {repository}.{method} ({collection.name}.{operation}) {entry['duration_ms']} ms"
+                  + (f", {entry['summary']['docs_examined']} docs examinados, {entry['summary']['collection_scans']} COLLSCAN"
+                     if entry["summary"] else ""))
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ No se pudo registrar la consulta lenta de {repository}.{method}: {e}")
+
+    async def _ensure_collection(self, database) -> None:
+        if self._collection_ready:
+            return
+        try:
+            await database.create_collection(SLOW_QUERY_COLLECTION, capped=True, size=SLOW_QUERY_CAPPED_BYTES)
+        except (CollectionInvalid, OperationFailure):
+            pass  # Ya existe
+        self._collection_ready = True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SLOW_QUERY_LOG,
+            "threshold_ms": self.threshold_ms,
+            "explain_interval": self.explain_interval,
+            "captured": self.captured,
+            "explained": self.explained,
+            "errors": self.errors,
+            "pending": len(self._tasks)
+        }
+
+# Instancia compartida por el proceso
+slow_query_log = SlowQueryLog()
@@ -1,16 +1,154 @@
+import importlib.util
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
+from app.core.pool_metrics import PoolMetrics
+from app.core.metrics import METRICS_ENABLED, command_metrics, register_pool_gauges
+
+# Contador (colección counters) que los loaders incrementan cada vez que cambian los datos
+DATA_VERSION_COUNTER = "data_version"
+
+# Compresores de red y el paquete que PyMongo necesita para cada uno (zlib viene con Python)
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+_READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+def _env_list(name: str, default: str) -> Tuple[str, ...]:
+    return tuple(v.strip() for v in os.getenv(name, default).split(",") if v.strip())
+
+@dataclass(frozen=True)
+class MongoSettings:
+    """
+    Configuración del cliente de Motor (variables MONGODB_*). Los routers de solo lectura
+    (secondary_routers) usan analytics_read_preference; el resto, y toda escritura, va al primario.
+    """
+    uri: Optional[str] = None
+    db_name: Optional[str] = None
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: Optional[int] = None
+    wait_queue_timeout_ms: Optional[int] = None
+    server_selection_timeout_ms: int = 30000
+    connect_timeout_ms: int = 20000
+    compressors: Tuple[str, ...] = ()
+    analytics_read_preference: str = "secondaryPreferred"
+    max_staleness_seconds: Optional[int] = None
+    secondary_routers: Tuple[str, ...] = ("statistics", "search")
+
+    @classmethod
+    def from_env(cls) -> "MongoSettings":
+        settings = cls(
+            uri=os.getenv("MONGODB_URL"),
+            db_name=os.getenv("MONGODB_NAME"),
+            max_pool_size=_env_int("MONGODB_MAX_POOL_SIZE", 100),
+            min_pool_size=_env_int("MONGODB_MIN_POOL_SIZE", 0),
+            max_idle_time_ms=_env_int("MONGODB_MAX_IDLE_TIME_MS", None),
+            wait_queue_timeout_ms=_env_int("MONGODB_WAIT_QUEUE_TIMEOUT_MS", None),
+            server_selection_timeout_ms=_env_int("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 30000),
+            connect_timeout_ms=_env_int("MONGODB_CONNECT_TIMEOUT_MS", 20000),
+            compressors=_env_list("MONGODB_COMPRESSORS", ""),
+            analytics_read_preference=os.getenv("MONGODB_ANALYTICS_READ_PREFERENCE", "secondaryPreferred").strip(),
+            max_staleness_seconds=_env_int("MONGODB_MAX_STALENESS_SECONDS", None),
+            secondary_routers=_env_list("MONGODB_SECONDARY_ROUTERS", "statistics,search"),
+        )
+        settings.validate()
+        return settings
+
+    def validate(self) -> None:
+        if self.min_pool_size > self.max_pool_size > 0:
+            raise ValueError(f"MONGODB_MIN_POOL_SIZE ({self.min_pool_size}) > MONGODB_MAX_POOL_SIZE ({self.max_pool_size})")
+        if self.analytics_read_preference not in _READ_PREFERENCES:
+            raise ValueError(f"MONGODB_ANALYTICS_READ_PREFERENCE inválido: {self.analytics_read_preference} "
+                             f"(usa {', '.join(_READ_PREFERENCES)})")
+        unknown = [c for c in self.compressors if c not in _COMPRESSOR_MODULES]
+        if unknown:
+            raise ValueError(f"MONGODB_COMPRESSORS desconocidos: {', '.join(unknown)}")
+
+    def available_compressors(self) -> Tuple[str, ...]:
+        """Los compresores cuyo paquete no está instalado se omiten (el servidor negocia el resto)."""
+        return tuple(
+            c for c in self.compressors
+            if _COMPRESSOR_MODULES[c] is None or importlib.util.find_spec(_COMPRESSOR_MODULES[c]) is not None
+        )
+
+    def client_options(self) -> dict:
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+        }
+        if self.max_idle_time_ms is not None:
+            options["maxIdleTimeMS"] = self.max_idle_time_ms
+        if self.wait_queue_timeout_ms is not None:
+            options["waitQueueTimeoutMS"] = self.wait_queue_timeout_ms
+        compressors = self.available_compressors()
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        return options
+
+    def read_preference(self):
+        mode = _READ_PREFERENCES[self.analytics_read_preference]
+        if self.max_staleness_seconds is not None and mode is not ReadPreference.PRIMARY:
+            return type(mode)(max_staleness=self.max_staleness_seconds)
+        return mode
+
+    def public(self) -> dict:
+        """Configuración efectiva sin la URI (puede llevar credenciales)."""
+        return {
+            **self.client_options(),
+            "requested_compressors": list(self.compressors),
+            "analytics_read_preference": self.analytics_read_preference,
+            "max_staleness_seconds": self.max_staleness_seconds,
+            "secondary_routers": list(self.secondary_routers),
+        }
 
 class Database:
     client: AsyncIOMotorClient = None
     db = None
+    settings: Optional[MongoSettings] = None
+    pool_metrics: Optional[PoolMetrics] = None
+    # Router -> base con la preferencia de lectura de analítica (app/core/container.py)
+    read_dbs: Dict[str, object] = {}
 
 db_instance = Database()
 
-async def connect_to_mongo(uri: str, db_name: str):
+async def connect_to_mongo(uri: str, db_name: str, settings: Optional[MongoSettings] = None):
+    settings = settings or MongoSettings.from_env()
+    db_instance.settings = settings
+    db_instance.pool_metrics = PoolMetrics(settings.max_pool_size)
+    listeners = [db_instance.pool_metrics]
+    if METRICS_ENABLED:
+        # Duración de cada comando (incluidos los ad-hoc) para /metrics
+        listeners.append(command_metrics)
+        register_pool_gauges(db_instance.pool_metrics)
     # IMPORTANTE: Usar la uri que viene del .env
-    db_instance.client = AsyncIOMotorClient(uri)
+    db_instance.client = AsyncIOMotorClient(uri, event_listeners=listeners, **settings.client_options())
     db_instance.db = db_instance.client[db_name]
-    print(f"✅ Conectado a MongoDB: {db_name}")
+
+    # Misma conexión (mismo pool); solo cambia a qué miembro del replica set van las lecturas
+    if settings.analytics_read_preference != "primary":
+        analytics_db = db_instance.client.get_database(db_name, read_preference=settings.read_preference())
+        db_instance.read_dbs = {router: analytics_db for router in settings.secondary_routers}
+    else:
+        db_instance.read_dbs = {}
+
+    missing = set(settings.compressors) - set(settings.available_compressors())
+    if missing:
+        print(f"⚠️ Compresores sin paquete instalado (se omiten): {', '.join(sorted(missing))}")
+    print(f"✅ Conectado a MongoDB: {db_name} (pool {settings.min_pool_size}-{settings.max_pool_size}, "
+          f"lecturas de {', '.join(settings.secondary_routers) or '-'}: {settings.analytics_read_preference})")
 
 def get_db():
     # Esta función debe retornar el objeto db de la instancia global
@@ -27,36 +165,10 @@ async def get_next_sequence_value(sequence_name: str):
     )
     return result["sequence_value"]
 
-async def setup_database_indexes(db: AsyncIOMotorClient):
+async def get_data_version(db) -> int:
     """
-    Crea los índices necesarios para optimizar los pipelines del Executive Summary.
+    Devuelve la versión actual de los datos del archivo.
+    Se incrementa desde scripts/maintenance/load_concerts.py en cada carga.
     """
-    try:
-        print("Ensuring MongoDB indexes...")
-
-        # --- Colección: concert_songs ---
-        await db.concert_songs.create_index("track_ids", background=True)
-        await db.concert_songs.create_index([("song_number", 1), ("song_name", 1)], background=True)
-        
-        # --- Colección: concerts ---
-        await db.concerts.create_index([("concert_year", -1)], background=True)
-        await db.concerts.create_index("country_id", background=True)
-        await db.concerts.create_index("concert_date", background=True)
-
-        # --- Colección: tracks ---
-        await db.tracks.create_index([("metadata.is_live", 1), ("id", 1)], background=True)
-        await db.tracks.create_index("album_id", background=True)
-
-        # --- Colección: tracks ---
-        # Para _get_top_lead_singer y _get_general_track_stats
-        await db.tracks.create_index("lead_vocal_ids", background=True)
-
-        # Para get_total_guest_artists
-        await db.tracks.create_index("guest_artist_ids", background=True)
-
-        # Para get_total_by_composer
-        await db.tracks.create_index("composer_ids", background=True)
-
-        print("✅ All indexes ensured successfully.")
-    except Exception as e:
-        print(f"❌ Error creating indexes: {e}")
\ No newline at end of file
+    counter = await db.counters.find_one({"_id": DATA_VERSION_COUNTER})
+    return counter["sequence_value"] if counter else 0
@@ -9,4 +9,10 @@ class ConcertSongDto(BaseModel):
     track_ids: List[int] = Field(default_factory=list, validation_alias="track_ids", serialization_alias="trackIds")
     guestArtists: List[str] = Field(default_factory=list, validation_alias="guest_artists", serialization_alias="guest_artists")
 
-    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+class ConcertSetlistDto(BaseModel):
+    concertId: int = Field(..., validation_alias="concert_id", serialization_alias="concertId")
+    setlist: List[ConcertSongDto] = Field(default_factory=list, validation_alias="setlist", serialization_alias="setlist")
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
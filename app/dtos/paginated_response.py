@@ -1,10 +1,14 @@
 from pydantic import BaseModel
-from typing import List, Generic, TypeVar
+from typing import List, Generic, Optional, TypeVar
 
 T = TypeVar('T')
 
 class PaginatedResponse(BaseModel, Generic[T]):
-    total: int
+    # total es None cuando se pide includeTotal=false
+    total: Optional[int] = None
     page: int
     pageSize: int
-    results: List[T]
\ No newline at end of file
+    results: List[T]
+    # Paginación por cursor (keyset): token opaco para pedir la página siguiente
+    nextCursor: Optional[str] = None
+    hasMore: bool = False
\ No newline at end of file
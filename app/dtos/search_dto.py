@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional
+
+class SearchResultDto(BaseModel):
+    type: str = Field(..., description="track | album | venue | musician")
+    id: Optional[int] = None
+    name: str
+    subtitle: Optional[str] = None
+    score: float
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+class SearchResponseDto(BaseModel):
+    query: str
+    backend: str
+    total: int
+    tookMs: float = Field(..., validation_alias="took_ms", serialization_alias="tookMs")
+    results: List[SearchResultDto]
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
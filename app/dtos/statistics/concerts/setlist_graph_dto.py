@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional
+
+class SongTransitionDto(BaseModel):
+    fromSong: str = Field(..., validation_alias="song_from", serialization_alias="fromSong")
+    fromTrackId: Optional[int] = Field(None, validation_alias="track_id_from", serialization_alias="fromTrackId")
+    toSong: str = Field(..., validation_alias="song_to", serialization_alias="toSong")
+    toTrackId: Optional[int] = Field(None, validation_alias="track_id_to", serialization_alias="toTrackId")
+    count: int = Field(0, description="Times the second song was played right after the first one")
+    probability: float = Field(0.0, description="P(next = toSong | current = fromSong)")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class SongCoOccurrenceDto(BaseModel):
+    songA: str = Field(..., validation_alias="song_a", serialization_alias="songA")
+    trackIdA: Optional[int] = Field(None, validation_alias="track_id_a", serialization_alias="trackIdA")
+    songB: str = Field(..., validation_alias="song_b", serialization_alias="songB")
+    trackIdB: Optional[int] = Field(None, validation_alias="track_id_b", serialization_alias="trackIdB")
+    concerts: int = Field(0, description="Concerts where both songs were played")
+    support: float = Field(0.0, description="Share of all concerts with both songs")
+    lift: float = Field(0.0, description="P(A and B) / (P(A) * P(B)); > 1 means they are played together more than by chance")
+
+    model_config = ConfigDict(populate_by_name=True)
@@ -5,16 +5,27 @@ from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 from app.core.security import validate_layered_security
+from app.core.fast_json import default_response_class
+from app.core.metrics import METRICS_ENABLED, MetricsMiddleware
 from fastapi import Depends
 
-from app.routes.geography_routes import router as geo_router
-from app.routes.musicians_routes import router as musician_router
-from app.routes.albums_routes import router as album_router
-from app.routes.composers_routes import router as composer_router
-from app.routes.tracks_routes import router as track_router
-from app.routes.statistics_routes import router as statistics_router
-from app.routes.concert_routes import router as concert_routes
-from app.routes.concert_masters_routes import router as concert_masters_routes
+from app.core.lazy import LazyRouterLoader, LazyRouterMiddleware
+import importlib
+
+# (módulo, prefijo de su APIRouter). Con LAZY_ROUTERS=true cada módulo (y sus servicios,
+# repositorios y DTOs) se importa recién con el primer request a su prefijo.
+ROUTER_MODULES = [
+    ("app.routes.geography_routes", "/geography"),
+    ("app.routes.musicians_routes", "/musicians"),
+    ("app.routes.albums_routes", "/albums"),
+    ("app.routes.composers_routes", ""),
+    ("app.routes.tracks_routes", "/tracks"),
+    ("app.routes.statistics_routes", "/statistics"),
+    ("app.routes.concert_routes", "/concerts"),
+    ("app.routes.concert_masters_routes", "/concert-masters"),
+    ("app.routes.search_routes", "/search"),
+    ("app.routes.admin_routes", "/admin"),
+]
 
 env_type = os.getenv("ENVIRONMENT", "development")
 env_file = ".env.production" if env_type == "production" else ".env"
@@ -56,11 +67,21 @@ async def lifespan(app: FastAPI):
     if db_instance.db is not None:
         print("✅ MongoDB está listo y asignado a db_instance.db")
 
-        # --- LLAMADA A LA CONFIGURACIÓN DE ÍNDICES ---
-        from app.database import setup_database_indexes # Asegúrate de importar tu función
-        print("indexing database...")
-        await setup_database_indexes(db_instance.db)
+        # Contenedor de servicios: una instancia por proceso en lugar de una por request
+        from app.core.container import init_container
+        init_container(app, db_instance.db, db_instance.read_dbs)
+
+        # --- VERIFICACIÓN DEL ESQUEMA DE ÍNDICES ---
+        # Una sola lectura de schema_meta; si la versión cambió se avisa (scripts/migrations/apply_schema crea los índices)
+        from app.schema_registry import ensure_schema
+        schema_version = await ensure_schema(db_instance.db)
+        print(f"🗂️  Esquema de índices v{schema_version}")
         # ---------------------------------------------
+
+        # Maestros (tipos, tours, geografía, géneros, etc.) en memoria para evitar $lookup
+        from app.repositories.master_data_registry import master_data
+        await master_data.load(db_instance.db)
+        print(f"📚 Maestros cargados en memoria: {master_data.stats()['collections']}")
     else:
         print("❌ ERROR: La conexión falló, db_instance.db sigue siendo None")
 
@@ -69,7 +90,7 @@ async def lifespan(app: FastAPI):
         db_instance.client.close()
         print("🔌 Conexión a MongoDB cerrada")
 
-app = FastAPI(title="Santana Archive", lifespan=lifespan)
+app = FastAPI(title="Santana Archive", lifespan=lifespan, default_response_class=default_response_class())
 
 # Configuración de CORS
 app.add_middleware(
@@ -80,16 +101,22 @@ app.add_middleware(
     allow_headers=["*"], # Es más seguro dejar que el navegador maneje los headers
 )
 
+# --- MÉTRICAS (METRICS_ENABLED=true): latencia por ruta, comandos de Mongo y /metrics para Prometheus ---
+if METRICS_ENABLED:
+    from app.routes import metrics_routes
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_routes.router)
+
 API_V1 = "/api/v1"
 
-app.include_router(geo_router, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
-app.include_router(musician_router, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
-app.include_router(album_router, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
-app.include_router(composer_router, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
-app.include_router(track_router, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
-app.include_router(statistics_router, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
-app.include_router(concert_routes, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
-app.include_router(concert_masters_routes, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
+LAZY_ROUTERS = os.getenv("LAZY_ROUTERS", "false").strip().lower() in ("1", "true", "yes")
+
+if LAZY_ROUTERS:
+    router_loader = LazyRouterLoader(app, ROUTER_MODULES, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
+    app.add_middleware(LazyRouterMiddleware, loader=router_loader)
+else:
+    for module_name, _ in ROUTER_MODULES:
+        app.include_router(importlib.import_module(module_name).router, prefix=API_V1, dependencies=[Depends(validate_layered_security)])
 
 #MÁS REPORTES:
 #Músicos que tuvieron otros roles en canciones: por ejemplo, Carlos tocaba congas en algunas canciones
\ No newline at end of file
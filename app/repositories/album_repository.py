@@ -1,6 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations()
 class AlbumRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -0,0 +1,637 @@
+from __future__ import annotations
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.lazy import lazy_import
+
+# numpy se carga en el primer uso del motor (no en el arranque de la API)
+np = lazy_import("numpy")
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.database import get_data_version
+from app.repositories.master_data_registry import master_data
+from app.core.operation_labels import labelled_operations
+
+# "mongo" (por defecto) ejecuta los pipelines de agregación originales;
+# "columnar" responde las estadísticas desde los arreglos NumPy en memoria.
+ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "mongo").strip().lower()
+# Edad máxima de la carga: los scripts de discografía no incrementan la versión de datos
+ANALYTICS_ENGINE_MAX_AGE = float(os.getenv("ANALYTICS_ENGINE_MAX_AGE", "3600"))
+
+_MISSING = object()
+_NO_ID = -1
+
+def columnar_engine_enabled() -> bool:
+    return ANALYTICS_ENGINE == "columnar"
+
+# --- Helpers que replican la semántica de los operadores de Mongo ---
+
+def _get(doc: Optional[dict], path: str) -> Any:
+    """Acceso por ruta con puntos ('metadata.is_live'); devuelve _MISSING si no existe."""
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _put(target: dict, key: str, value: Any) -> None:
+    """$project omite los campos cuya expresión resuelve a un campo inexistente."""
+    if value is not _MISSING:
+        target[key] = value
+
+def _if_null(value: Any, default: Any) -> Any:
+    return default if value is _MISSING or value is None else value
+
+def _truthy(value: Any) -> bool:
+    """Evaluación booleana de $cond: null, ausente, false y 0 son falsos."""
+    return value is not _MISSING and value is not None and value is not False and value != 0
+
+def _as_list(value: Any) -> list:
+    """Valores que produce un $unwind sobre el campo."""
+    if value is _MISSING or value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _sum_numbers(values) -> Any:
+    """$sum ignora los valores no numéricos."""
+    return sum(v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool))
+
+def _int_or(value: Any, default: int = _NO_ID) -> int:
+    return value if isinstance(value, int) and not isinstance(value, bool) else default
+
+def _codes(sorted_keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Convierte llaves foráneas en posiciones dentro de sorted_keys (-1 si no existen)."""
+    if sorted_keys.size == 0 or values.size == 0:
+        return np.full(values.shape, -1, dtype=np.int64)
+    pos = np.searchsorted(sorted_keys, values)
+    pos = np.clip(pos, 0, sorted_keys.size - 1)
+    return np.where(sorted_keys[pos] == values, pos, -1)
+
+
+@labelled_operations()
+class ColumnarAnalyticsEngine:
+    """
+    Copia columnar en memoria de tracks, albums, concerts y concert_songs
+    (más los maestros pequeños usados en los $lookup). Las llaves foráneas
+    se codifican como enteros para resolver los conteos con bincount/argsort.
+    Los métodos devuelven exactamente los mismos dicts que los pipelines de
+    StatisticsConcertsRepository y StatisticsDiscographyRepository.
+    """
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, db: AsyncIOMotorDatabase) -> "ColumnarAnalyticsEngine":
+        # Nombres de géneros/compositores/invitados: los mismos diccionarios que usan los repositorios
+        await master_data.ensure_fresh(db)
+        version = await get_data_version(db)
+        if self._is_fresh(version):
+            return self
+
+        async with self._lock:
+            # Otro request pudo haber recargado mientras esperábamos el lock
+            if not self._is_fresh(version):
+                await self.load(db, version)
+        return self
+
+    def _is_fresh(self, version: int) -> bool:
+        return self.version == version and (time.monotonic() - self.loaded_at) < ANALYTICS_ENGINE_MAX_AGE
+
+    def invalidate(self) -> None:
+        self.version = None
+
+    async def load(self, db: AsyncIOMotorDatabase, version: int) -> None:
+        (
+            tracks, albums, concerts, concert_songs,
+            genres, musicians, composers, countries, continents, guest_artists
+        ) = await asyncio.gather(
+            db.tracks.find({}, {"_id": 0}).to_list(length=None),
+            db.albums.find({}, {"_id": 0}).to_list(length=None),
+            db.concerts.find({}, {"_id": 0, "id": 1, "concert_year": 1, "country_id": 1}).to_list(length=None),
+            db.concert_songs.find({}, {"_id": 0, "concert_id": 1, "song_number": 1, "song_name": 1, "track_ids": 1}).to_list(length=None),
+            db.genres.find({}, {"_id": 0}).to_list(length=None),
+            db.musicians.find({}, {"_id": 0}).to_list(length=None),
+            db.composers.find({}, {"_id": 0}).to_list(length=None),
+            db.countries.find({}, {"_id": 0}).to_list(length=None),
+            db.continents.find({}, {"_id": 0}).to_list(length=None),
+            db.guest_artists.find({}, {"_id": 0}).to_list(length=None)
+        )
+        # La construcción de columnas es CPU pura: corre en un hilo para no bloquear el event loop.
+        # Se arma sobre una instancia aparte y se publica de una vez desde el loop, así un request
+        # que esté respondiendo con la carga anterior nunca ve columnas de dos versiones mezcladas.
+        staged = ColumnarAnalyticsEngine()
+        await asyncio.to_thread(
+            staged._build, tracks, albums, concerts, concert_songs,
+            genres, musicians, composers, countries, continents, guest_artists
+        )
+        self.__dict__.update({k: v for k, v in vars(staged).items() if k not in ("version", "loaded_at", "_lock")})
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def _build(self, tracks, albums, concerts, concert_songs, genres, musicians, composers, countries, continents, guest_artists) -> None:
+        # Maestros pequeños: se conservan en orden natural (es el orden que devuelve $lookup)
+        self.genres = genres
+        self.musicians = musicians
+        self.composers = composers
+        self.guest_artists = guest_artists
+        self.countries_by_id: Dict[Any, List[dict]] = {}
+        for c in countries:
+            self.countries_by_id.setdefault(c.get("id"), []).append(c)
+        self.continents_by_id: Dict[Any, List[dict]] = {}
+        for c in continents:
+            self.continents_by_id.setdefault(c.get("id"), []).append(c)
+
+        # --- Albums ---
+        self.albums = albums
+        self.albums_by_id: Dict[Any, List[dict]] = {}
+        for a in albums:
+            self.albums_by_id.setdefault(a.get("id"), []).append(a)
+
+        # --- Tracks ---
+        self.tracks = tracks
+        self.track_by_id: Dict[Any, dict] = {}
+        for t in tracks:
+            self.track_by_id.setdefault(t.get("id"), t)
+        self.tracks_by_album: Dict[Any, List[int]] = {}
+        for i, t in enumerate(tracks):
+            self.tracks_by_album.setdefault(t.get("album_id"), []).append(i)
+
+        self.t_id = np.array([_int_or(t.get("id")) for t in tracks], dtype=np.int64)
+        self.t_studio = np.array([_get(t, "metadata.is_live") is False for t in tracks], dtype=bool)
+        self.t_title = [_get(t, "title") for t in tracks]
+        # Banderas de $cond evaluadas una sola vez por track
+        self.t_instrumental = np.array([_truthy(_get(t, "metadata.is_instrumental")) for t in tracks], dtype=bool)
+        self.t_love = np.array([_truthy(_get(t, "metadata.is_love_song")) for t in tracks], dtype=bool)
+        self.t_has_guests = np.array(
+            [isinstance(t.get("guest_artist_ids"), list) and len(t["guest_artist_ids"]) > 0 for t in tracks], dtype=bool
+        )
+
+        # genre_ids "desenrollados", codificados en orden de primera aparición (-> orden de empate del $group)
+        genre_index: Dict[Any, int] = {}
+        self.tg_genre = np.array(
+            [genre_index.setdefault(g, len(genre_index)) for t in tracks for g in _as_list(t.get("genre_ids", _MISSING))],
+            dtype=np.int64
+        )
+        self.genre_values = list(genre_index)
+        self.genres_by_id: Dict[Any, List[dict]] = {}
+        for g in genres:
+            self.genres_by_id.setdefault(g.get("id"), []).append(g)
+
+        # guest_artist_ids de cada track (fila dueña ordenada + código del id)
+        guest_index: Dict[Any, int] = {}
+        guest_owner, guest_codes = [], []
+        for i, t in enumerate(tracks):
+            ids = t.get("guest_artist_ids")
+            for gid in ids if isinstance(ids, list) else []:
+                guest_owner.append(i)
+                guest_codes.append(guest_index.setdefault(gid, len(guest_index)))
+        self.tga_owner = np.array(guest_owner, dtype=np.int64)
+        self.tga_guest = np.array(guest_codes, dtype=np.int64)
+        self.guest_id_values = list(guest_index)
+
+        # Pares (track, álbum) del $lookup + $unwind sobre album_id, con la década del álbum codificada
+        decade_index: Dict[Any, int] = {}
+        album_decade = []
+        for a in albums:
+            year = a.get("release_year")
+            decade = year - (year % 10) if isinstance(year, int) else None
+            album_decade.append(decade_index.setdefault(decade, len(decade_index)))
+        self.decade_values = list(decade_index)
+        album_pos = {}
+        for i, a in enumerate(albums):
+            album_pos.setdefault(a.get("id"), []).append(i)
+        pair_track, pair_album = [], []
+        for i, t in enumerate(tracks):
+            if t.get("album_id") is None:
+                continue
+            for a in album_pos.get(t.get("album_id"), []):
+                pair_track.append(i)
+                pair_album.append(a)
+        self.ta_track = np.array(pair_track, dtype=np.int64)
+        self.ta_decade = np.array(album_decade, dtype=np.int64)[np.array(pair_album, dtype=np.int64)] if pair_album else np.zeros(0, dtype=np.int64)
+
+        # Posición ordenada de los ids de track para codificar las llaves foráneas
+        order = np.argsort(self.t_id, kind="stable")
+        self._t_sorted_ids = self.t_id[order]
+        self._t_sorted_pos = order
+
+        # --- Concerts ---
+        self.c_id = np.array([_int_or(c.get("id")) for c in concerts], dtype=np.int64)
+        self.c_year = [c.get("concert_year") for c in concerts]
+        # Año codificado como entero (incluye el grupo null)
+        self.year_values = list(dict.fromkeys(self.c_year))
+        year_index = {y: i for i, y in enumerate(self.year_values)}
+        self.c_year_code = np.array([year_index[y] for y in self.c_year], dtype=np.int64)
+        self.c_country = [c.get("country_id") for c in concerts]
+        c_order = np.argsort(self.c_id, kind="stable")
+        self._c_sorted_ids = self.c_id[c_order]
+        self._c_sorted_pos = c_order
+
+        # --- Concert songs ---
+        n_songs = len(concert_songs)
+        self.cs_concert = np.array([_int_or(s.get("concert_id")) for s in concert_songs], dtype=np.int64)
+        self.cs_song_number = np.array([_int_or(s.get("song_number"), 0) for s in concert_songs], dtype=np.int64)
+        self.cs_song_name = [s.get("song_name") for s in concert_songs]
+        # song_name codificado como entero (-1 para null)
+        song_index: Dict[Any, int] = {}
+        self.cs_song_code = np.array(
+            [-1 if n is None else song_index.setdefault(n, len(song_index)) for n in self.cs_song_name],
+            dtype=np.int64
+        )
+        self.song_names = list(song_index)
+
+        # $first de track_ids[0] para los agrupamientos por song_name
+        self.cs_first_track = []
+        owners, flat_ids = [], []
+        for i, s in enumerate(concert_songs):
+            ids = _as_list(s.get("track_ids", _MISSING))
+            self.cs_first_track.append(ids[0] if isinstance(s.get("track_ids"), list) and ids else None)
+            for tid in ids:
+                owners.append(i)
+                flat_ids.append(_int_or(tid))
+
+        # track_ids "desenrollados" (equivalente a $unwind): fila dueña + posición del track
+        self.cs_flat_owner = np.array(owners, dtype=np.int64)
+        self.cs_flat_track_id = np.array(flat_ids, dtype=np.int64)
+        self.cs_flat_track = self._track_codes(self.cs_flat_track_id)
+
+        n_tracks = len(tracks)
+        known = self.cs_flat_track >= 0
+        # Ejecuciones por track (cuenta cada aparición, como $unwind + $group)
+        self.track_plays = np.bincount(self.cs_flat_track[known], minlength=n_tracks)
+        # Documentos de concert_songs que contienen el track (como $lookup sobre track_ids)
+        pairs = np.unique(self.cs_flat_owner[known] * max(n_tracks, 1) + self.cs_flat_track[known])
+        self.track_song_docs = np.bincount(pairs % max(n_tracks, 1), minlength=n_tracks) if pairs.size else np.zeros(n_tracks, dtype=np.int64)
+        # Ids que han sonado en vivo (distinct("track_ids"))
+        self.played_track_ids = set(np.unique(self.cs_flat_track_id).tolist())
+
+        # Año de cada canción a través de su concierto
+        c_pos = _codes(self._c_sorted_ids, self.cs_concert)
+        self.cs_concert_pos = np.where(c_pos >= 0, self._c_sorted_pos[np.clip(c_pos, 0, None)] if self.c_id.size else -1, -1)
+        self._n_songs = n_songs
+
+    def _track_codes(self, ids: np.ndarray) -> np.ndarray:
+        pos = _codes(self._t_sorted_ids, ids)
+        if self._t_sorted_pos.size == 0:
+            return pos
+        return np.where(pos >= 0, self._t_sorted_pos[np.clip(pos, 0, None)], -1)
+
+    # --- Resolución de $lookup en memoria ---
+
+    @staticmethod
+    def _lookup_names(docs: List[dict], ids: Any, field: str) -> list:
+        """"$<lookup>.<field>": documentos foráneos en orden natural que tengan el campo."""
+        wanted = set(v for v in _as_list(ids) if v is not None)
+        return [d[field] for d in docs if d.get("id") in wanted and field in d]
+
+    def _album(self, album_id: Any) -> Optional[dict]:
+        matches = self.albums_by_id.get(album_id)
+        return matches[0] if matches else None
+
+    # --- StatisticsConcertsRepository ---
+
+    def _track_with_album(self, track: dict, extra: dict) -> dict:
+        album = self._album(track.get("album_id")) if "album_id" in track else None
+        row = dict(extra)
+        _put(row, "track_number", _get(track, "track_number"))
+        _put(row, "title", _get(track, "title"))
+        _put(row, "duration", _get(track, "duration"))
+        _put(row, "duration_seconds", _get(track, "duration_seconds"))
+        _put(row, "metadata", _get(track, "metadata"))
+        row["genres"] = master_data.names_for("genres", _as_list(track.get("genre_ids")))
+        # Misma fuente que el pipeline del top 20: compositores e invitados desde musicians
+        row["composers"] = master_data.names_for("musicians", _as_list(track.get("composer_ids")))
+        row["guestArtists"] = master_data.names_for("musicians", _as_list(track.get("guest_artist_ids")))
+        _put(row, "album_id", _get(album, "id"))
+        _put(row, "album_title", _get(album, "title"))
+        _put(row, "album_release_year", _get(album, "release_year"))
+        _put(row, "album_release_date", _get(album, "release_date"))
+        _put(row, "album_cover", _get(album, "cover"))
+        return row
+
+    def top_20_most_played_songs(self) -> List[dict]:
+        # Como track_play_stats.total_plays: un track repetido dentro de la misma canción cuenta una vez
+        plays = self.track_song_docs
+        played = np.flatnonzero(plays > 0)
+        if played.size == 0:
+            return []
+        titles = np.array([str(self.t_title[i]) for i in played], dtype=object)
+        # Orden determinista: conteo descendente y luego título
+        title_rank = np.unique(titles, return_inverse=True)[1]
+        order = np.lexsort((title_rank, -plays[played]))[:20]
+
+        return [
+            self._track_with_album(self.tracks[played[i]], {"play_count": int(plays[played[i]])})
+            for i in order
+        ]
+
+    def most_played_studio_albums(self) -> List[dict]:
+        studio_played = np.flatnonzero((self.track_plays > 0) & self.t_studio)
+        plays_by_album: Dict[Any, int] = {}
+        for i in studio_played:
+            album_id = self.tracks[i].get("album_id")
+            plays_by_album[album_id] = plays_by_album.get(album_id, 0) + int(self.track_plays[i])
+
+        results = []
+        for album_id, plays in plays_by_album.items():
+            for album in self.albums_by_id.get(album_id, []) if album_id is not None else []:
+                if album.get("is_live", _MISSING) is not False:
+                    continue
+                row = self._album_fields(album)
+                row["played_songs_count"] = plays
+                row["total_tracks_count"] = 0
+                row["played_percentage"] = 0
+                row["duration"] = _sum_numbers(t.get("duration_seconds") for t in self._studio_tracks(album))
+                results.append(row)
+
+        results.sort(key=lambda r: -r["played_songs_count"])
+        return results
+
+    def _studio_tracks(self, album: dict) -> List[dict]:
+        if "id" not in album:
+            return []
+        return [self.tracks[i] for i in self.tracks_by_album.get(album["id"], []) if self.t_studio[i]]
+
+    @staticmethod
+    def _album_fields(album: dict) -> dict:
+        row = {}
+        for field in ("id", "title", "release_year", "release_date", "cover", "is_live"):
+            _put(row, field, _get(album, field))
+        return row
+
+    def most_explored_studio_albums(self) -> List[dict]:
+        results = []
+        for album in self.albums:
+            if album.get("is_live", _MISSING) is not False:
+                continue
+            studio_tracks = self._studio_tracks(album)
+            played = sum(1 for t in studio_tracks if t.get("id") in self.played_track_ids)
+            total = len(studio_tracks)
+            percentage = (played / total) * 100 if total > 0 else 0
+
+            row = self._album_fields(album)
+            row["played_songs_count"] = played
+            row["total_tracks_count"] = total
+            row["played_percentage"] = round(percentage, 2)
+            row["duration"] = _sum_numbers(t.get("duration_seconds") for t in studio_tracks)
+            # Llaves de orden (se retiran antes de devolver)
+            results.append((-percentage, -played, str(album.get("title", "")), row))
+
+        results.sort(key=lambda r: r[:3])
+        return [r[3] for r in results]
+
+    def concerts_stats_by_year(self) -> List[dict]:
+        n_years = len(self.year_values)
+        totals = np.bincount(self.c_year_code, minlength=n_years)
+
+        # Pares (año, canción) únicos: canciones distintas por año
+        valid = (self.cs_concert_pos >= 0) & (self.cs_song_code >= 0)
+        n_codes = max(len(self.song_names), 1)
+        pairs = np.unique(self.c_year_code[self.cs_concert_pos[valid]] * n_codes + self.cs_song_code[valid])
+        distinct = np.bincount(pairs // n_codes, minlength=n_years) if pairs.size else np.zeros(n_years, dtype=np.int64)
+
+        results = [
+            {
+                "_id": year,
+                "year": year,
+                "total_concerts": int(totals[code]),
+                "different_songs_count": int(distinct[code])
+            }
+            for code, year in enumerate(self.year_values)
+        ]
+        # Orden descendente; null queda al final como en Mongo
+        results.sort(key=lambda r: (r["year"] is not None, r["year"] or 0), reverse=True)
+        return results
+
+    def _concerts_by_country(self) -> Dict[Any, List[int]]:
+        by_country: Dict[Any, List[int]] = {}
+        for i, country_id in enumerate(self.c_country):
+            by_country.setdefault(country_id, []).append(i)
+        return by_country
+
+    def concert_counts_by_country(self) -> List[dict]:
+        results = []
+        for country_id, concerts in self._concerts_by_country().items():
+            for country in self.countries_by_id.get(country_id, []) if country_id is not None else []:
+                row = {"country_id": country_id}
+                _put(row, "country_name", _get(country, "name"))
+                row["concert_count"] = len(concerts)
+                results.append(row)
+
+        results.sort(key=lambda r: (-r["concert_count"], str(r.get("country_name", ""))))
+        return results
+
+    def geographic_conquest_milestones(self) -> List[dict]:
+        results = []
+        for country_id, concerts in self._concerts_by_country().items():
+            years = [self.c_year[i] for i in concerts if self.c_year[i] is not None]
+            first_year = min(years) if years else None
+            for country in self.countries_by_id.get(country_id, []) if country_id is not None else []:
+                for continent in self.continents_by_id.get(country.get("continent_id"), []) if country.get("continent_id") is not None else []:
+                    row = {"year": first_year}
+                    _put(row, "countryName", _get(country, "name"))
+                    _put(row, "countryCode", _get(country, "code"))
+                    _put(row, "continentName", _get(continent, "name"))
+                    row["totalShowsToDate"] = len(concerts)
+                    results.append(row)
+
+        results.sort(key=lambda r: (r["year"] is not None, r["year"] or 0))
+        return results
+
+    def _group_by_song_name(self, rows: np.ndarray) -> Dict[Any, dict]:
+        """$group por song_name con conteo y $first del primer track_id, en orden de aparición."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size == 0:
+            return {}
+        shifted = self.cs_song_code[rows] + 1  # 0 = song_name null
+        counts = np.bincount(shifted)
+        codes, first = np.unique(shifted, return_index=True)
+
+        groups: Dict[Any, dict] = {}
+        for k in np.argsort(first, kind="stable"):
+            code = codes[k]
+            name = None if code == 0 else self.song_names[code - 1]
+            groups[name] = {"count": int(counts[code]), "track_id": self.cs_first_track[rows[first[k]]]}
+        return groups
+
+    def top_20_concert_opener_tracks(self) -> List[dict]:
+        openers = self._group_by_song_name(np.flatnonzero(self.cs_song_number == 1))
+        # sort estable: a igual conteo se respeta el orden de aparición
+        ranked = sorted(openers.items(), key=lambda kv: -kv[1]["count"])[:20]
+
+        results = []
+        for song_name, group in ranked:
+            track = self.track_by_id.get(group["track_id"]) if group["track_id"] is not None else None
+            album = self._album(track.get("album_id")) if track is not None and "album_id" in track else None
+            results.append({
+                "play_count": group["count"],
+                "title": _if_null(_get(track, "title"), song_name),
+                "track_number": _if_null(_get(track, "track_number"), 0),
+                "duration": _if_null(_get(track, "duration"), "00:00:00"),
+                "duration_seconds": _if_null(_get(track, "duration_seconds"), 0),
+                "genres": master_data.names_for("genres", _as_list(track.get("genre_ids")) if track else None),
+                "composers": master_data.names_for("composers", _as_list(track.get("composer_ids")) if track else None),
+                "metadata": _if_null(_get(track, "metadata"), {
+                    "key": "N/A", "is_instrumental": False, "is_live": True, "is_love_song": False
+                }),
+                "guest_artists": _if_null(_get(track, "guest_artist_ids"), []),
+                "album_id": _if_null(_get(album, "id"), 0),
+                "album_title": _if_null(_get(album, "title"), "Non-Album Track"),
+                "album_release_year": _if_null(_get(album, "release_year"), 0),
+                "album_release_date": _if_null(_get(album, "release_date"), datetime(1900, 1, 1)),
+                "album_cover": _if_null(_get(album, "cover"), None)
+            })
+        return results
+
+    def non_album_songs(self) -> List[dict]:
+        groups = self._group_by_song_name(np.arange(self._n_songs))
+        results = [
+            {"title": song_name, "play_count": group["count"]}
+            for song_name, group in groups.items()
+            if group["track_id"] not in self.track_by_id
+        ]
+        results.sort(key=lambda r: -r["play_count"])
+        return results
+
+    def tracks_with_play_count_by_album(self, album_id: int) -> List[dict]:
+        results = []
+        for i in self.tracks_by_album.get(album_id, []):
+            track = self.tracks[i]
+            row = {}
+            for field in ("track_number", "title", "duration", "duration_seconds", "album_id"):
+                _put(row, field, _get(track, field))
+            row["play_count"] = int(self.track_song_docs[i])
+            results.append(row)
+
+        results.sort(key=lambda r: _int_or(r.get("track_number"), 0))
+        return results
+
+    # --- StatisticsDiscographyRepository ---
+
+    def _match_tracks(self, match_query: dict) -> Optional[List[int]]:
+        """Soporta los filtros que arman los servicios ({} o {"album_id": x})."""
+        if not match_query:
+            return list(range(len(self.tracks)))
+        if set(match_query) == {"album_id"}:
+            return list(self.tracks_by_album.get(match_query["album_id"], []))
+        return None
+
+    def supports_match(self, match_query: dict) -> bool:
+        return not match_query or set(match_query) == {"album_id"}
+
+    def instrumental_stats(self, match_query: dict, album_id: Optional[int]) -> List[dict]:
+        rows = self._match_tracks(match_query)
+        if not rows:
+            return []
+
+        instrumental = int(np.count_nonzero(self.t_instrumental[rows]))
+        group_id = self.tracks[rows[0]].get("album_id") if album_id else None
+        info = self._album(group_id) if group_id is not None else None
+        return [{
+            "album_id": _if_null(group_id, 0),
+            "album_name": "Full Discography" if album_id is None else _if_null(_get(info, "title"), "Unknown"),
+            "total_instrumental": instrumental,
+            "total_vocal": len(rows) - instrumental
+        }]
+
+    def key_stats(self, match_query: dict, album_id: Optional[int]) -> List[dict]:
+        counts: Dict[tuple, int] = {}
+        for i in self._match_tracks(match_query):
+            key = _get(self.tracks[i], "metadata.key")
+            group = (self.tracks[i].get("album_id"), None if key is _MISSING else key)
+            counts[group] = counts.get(group, 0) + 1
+
+        results = []
+        for (aid, key), count in counts.items():
+            info = self._album(aid) if aid is not None else None
+            if album_id is None and aid is None:
+                album_name = "Full Discography"
+            else:
+                album_name = _if_null(_get(info, "title"), "Unknown Album")
+            results.append({
+                "album_id": _if_null(aid, 0),
+                "key": key,
+                "count": count,
+                "album_name": album_name
+            })
+        results.sort(key=lambda r: -r["count"])
+        return results
+
+    def love_song_stats(self) -> List[dict]:
+        total = len(self.tracks)
+        if total == 0:
+            return []
+        love = int(np.count_nonzero(self.t_love))
+        return [{
+            "total_tracks": total,
+            "love_songs_count": love,
+            "non_love_songs_count": total - love,
+            "love_songs_percentage": (love / total) * 100,
+            "non_love_songs_percentage": ((total - love) / total) * 100
+        }]
+
+    def musical_genre_stats(self) -> List[dict]:
+        counts = np.bincount(self.tg_genre, minlength=len(self.genre_values))
+        total = int(counts.sum())
+
+        results = []
+        # Estable: los empates conservan el orden de primera aparición del género
+        for code in np.argsort(-counts, kind="stable"):
+            genre_id, count = self.genre_values[code], int(counts[code])
+            if genre_id is None:
+                continue
+            for genre in self.genres_by_id.get(genre_id, []):
+                row = {"genre_id": genre_id}
+                _put(row, "genre_name", _get(genre, "name"))
+                row["track_count"] = count
+                row["percentage"] = (count / total) * 100 if total > 0 else 0
+                results.append(row)
+        return results
+
+    def guest_artists_report(self) -> List[dict]:
+        n_decades = len(self.decade_values)
+        totals = np.bincount(self.ta_decade, minlength=n_decades)
+        guests = np.bincount(self.ta_decade, weights=self.t_has_guests[self.ta_track], minlength=n_decades).astype(np.int64)
+
+        # Invitados de cada par (track, álbum): rangos de tga_owner que pertenecen al track del par
+        starts = np.searchsorted(self.tga_owner, self.ta_track, side="left")
+        lengths = np.searchsorted(self.tga_owner, self.ta_track, side="right") - starts
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        guest_rows = np.arange(int(lengths.sum()), dtype=np.int64) + offsets
+        n_guests = max(len(self.guest_id_values), 1)
+        pairs = np.unique(np.repeat(self.ta_decade, lengths) * n_guests + self.tga_guest[guest_rows])
+        ids_by_decade: Dict[int, list] = {}
+        for decade_code, guest_code in zip((pairs // n_guests).tolist(), (pairs % n_guests).tolist()):
+            ids_by_decade.setdefault(decade_code, []).append(self.guest_id_values[guest_code])
+
+        results = []
+        for code in np.flatnonzero(totals):
+            decade, total, with_guests = self.decade_values[code], int(totals[code]), int(guests[code])
+            results.append({
+                "period": f"{decade}-{decade + 9}" if decade is not None else None,
+                "total_tracks": total,
+                "guest_artist_tracks": with_guests,
+                "guest_artist_percentage": round((with_guests / total) * 100, 1),
+                "guest_artists": self._lookup_names(self.guest_artists, ids_by_decade.get(code, []), "full_name")
+            })
+        results.sort(key=lambda r: (r["period"] is not None, r["period"] or ""))
+        return results
+
+    def instrumental_tracks_by_year(self) -> List[dict]:
+        counts: Dict[Any, int] = {}
+        for t in self.tracks:
+            if _get(t, "metadata.is_instrumental") is not True or t.get("album_id") is None:
+                continue
+            for album in self.albums_by_id.get(t.get("album_id"), []):
+                year = album.get("release_year")
+                counts[year] = counts.get(year, 0) + 1
+
+        results = [{"total_tracks": total, "year": year} for year, total in counts.items()]
+        results.sort(key=lambda r: (r["year"] is not None, r["year"] or 0), reverse=True)
+        return results
+
+# Instancia compartida por el proceso (se recarga al cambiar la versión de datos)
+columnar_engine = ColumnarAnalyticsEngine()
@@ -1,5 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations()
 class ConcertMastersRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
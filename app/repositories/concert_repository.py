@@ -1,10 +1,48 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple, AsyncIterator, Dict
 from datetime import datetime, time, timedelta
+import asyncio
+import base64
+import json
 from motor.motor_asyncio import AsyncIOMotorDatabase
-
+from app.repositories.master_data_registry import master_data
+from app.core.operation_labels import labelled_operations
+
+def encode_cursor(concert_date: datetime, concert_id: int) -> str:
+    """Token opaco con la llave de orden (concert_date, id) del último concierto de la página."""
+    raw = json.dumps({"d": concert_date.isoformat(), "i": concert_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["d"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+# Proyección "lean": los nombres de los maestros se resuelven con master_data
+CONCERT_PROJECTION = {
+    "_id": 0, "id": 1, "concert_date": 1, "venue_name": 1, "venue_type_id": 1,
+    "show_type_id": 1, "show_time": 1, "concert_type_id": 1, "tour_id": 1,
+    "city_id": 1, "state_id": 1, "country_id": 1, "continent_id": 1,
+    "concert_year": 1, "song_count": 1
+}
+
+@labelled_operations()
 class ConcertRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
+
+    @staticmethod
+    def _build_match(start_date: datetime, end_date: datetime, **filters: Optional[int]) -> dict:
+        """Filtro común de get_by_filter y stream_by_filter: días completos del rango más los *_id informados."""
+        query_start = datetime.combine(start_date.date(), time.min)
+        query_end = datetime.combine(end_date.date(), time.max)
+
+        match_query = {"concert_date": {"$gte": query_start, "$lte": query_end}}
+        for field, value in filters.items():
+            if value: match_query[field] = value
+        return match_query
         
     async def get_by_filter(
         self, 
@@ -18,242 +56,164 @@ class ConcertRepository:
         city_id: Optional[int] = None,
         state_id: Optional[int] = None,
         country_id: Optional[int] = None,
-        continent_id: Optional[int] = None
+        continent_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> dict: # Cambiamos a dict para incluir metadatos
         
         # 1. Validación de rango (máximo 1 año)
         if end_date - start_date > timedelta(days=366):
             raise ValueError("The date range cannot exceed 1 year.")
 
-        # 2. Ajuste de fechas
-        query_start = datetime.combine(start_date.date(), time.min)
-        query_end = datetime.combine(end_date.date(), time.max)
-
-        # 3. Construcción del Match Query dinámico
-        match_query = {"concert_date": {"$gte": query_start, "$lte": query_end}}
-        if concert_type_id: match_query["concert_type_id"] = concert_type_id
-        if venue_type_id: match_query["venue_type_id"] = venue_type_id
-        if tour_id: match_query["tour_id"] = tour_id
-        if city_id: match_query["city_id"] = city_id
-        if state_id: match_query["state_id"] = state_id
-        if country_id: match_query["country_id"] = country_id
-        if continent_id: match_query["continent_id"] = continent_id
-
-        # Cálculo de skip
-        skip = (max(1, page) - 1) * page_size
-
-        pipeline = [
-            {"$match": match_query},
-            {
-                "$facet": {
-                    # Rama 1: Metadatos (Conteo total)
-                    "metadata": [{"$count": "total"}],
-                    # Rama 2: Datos paginados y joins
-                    "data": [
-                        {"$sort": {"concert_date": -1}},
-                        {"$skip": skip},
-                        {"$limit": page_size},
-                        # --- Aquí van todos tus $lookup anteriores ---
-                        {"$lookup": {"from": "venue_types", "localField": "venue_type_id", "foreignField": "venue_type_id", "as": "v_type"}},
-                        {"$unwind": {"path": "$v_type", "preserveNullAndEmptyArrays": True}},
-                        {"$lookup": {"from": "show_types", "localField": "show_type_id", "foreignField": "show_type_id", "as": "s_type"}},
-                        {"$unwind": {"path": "$s_type", "preserveNullAndEmptyArrays": True}},
-                        {"$lookup": {"from": "concert_types", "localField": "concert_type_id", "foreignField": "concert_type_id", "as": "c_type"}},
-                        {"$unwind": {"path": "$c_type", "preserveNullAndEmptyArrays": True}},
-                        {"$lookup": {"from": "tours", "localField": "tour_id", "foreignField": "tour_id", "as": "tour"}},
-                        {"$unwind": {"path": "$tour", "preserveNullAndEmptyArrays": True}},
-                        {"$lookup": {"from": "cities", "localField": "city_id", "foreignField": "id", "as": "city"}},
-                        {"$unwind": {"path": "$city", "preserveNullAndEmptyArrays": True}},
-                        {"$lookup": {"from": "states", "localField": "state_id", "foreignField": "id", "as": "state"}},
-                        {"$unwind": {"path": "$state", "preserveNullAndEmptyArrays": True}},
-                        {"$lookup": {"from": "countries", "localField": "country_id", "foreignField": "id", "as": "country"}},
-                        {"$unwind": {"path": "$country", "preserveNullAndEmptyArrays": True}},
-                        {"$lookup": {"from": "continents", "localField": "continent_id", "foreignField": "id", "as": "continent"}},
-                        {"$unwind": {"path": "$continent", "preserveNullAndEmptyArrays": True}},
-                        # Proyección final
-                        {"$project": {
-                            "_id": 0,
-                            "id": "$id",
-                            "concert_date": 1,
-                            "venue_name": 1,
-                            "venue_type_id": 1,
-                            "venue_type_name": "$v_type.venue_type_name",
-                            "show_type_id": 1,
-                            "show_type_name": "$s_type.show_type_name",
-                            "show_time": 1,
-                            "concert_type_id": 1,
-                            "concert_type_name": "$c_type.concert_type_name",
-                            "tour_id": 1,
-                            "tour_name": "$tour.tour_name",
-                            "city_id": 1,
-                            "city_name": "$city.name",
-                            "state_id": 1,
-                            "state_name": "$state.name",
-                            "country_id": 1,
-                            "country_name": "$country.name",
-                            "continent_id": 1,
-                            "continent_name": "$continent.name",
-                            "concert_year": 1,
-                            "song_count": 1
-                        }}
-                    ]
-                }
-            },
-            # Limpieza de la salida del facet
-            {
-                "$project": {
-                    "total": {"$arrayElemAt": ["$metadata.total", 0]},
-                    "results": "$data"
-                }
-            }
+        # 2. Match Query dinámico (días completos + filtros informados)
+        match_query = self._build_match(
+            start_date, end_date,
+            concert_type_id=concert_type_id, venue_type_id=venue_type_id, tour_id=tour_id, city_id=city_id,
+            state_id=state_id, country_id=country_id, continent_id=continent_id
+        )
+
+        # 3. Posición de la página: keyset si viene cursor, $skip clásico si no
+        page_query = dict(match_query)
+        skip = 0
+        if cursor:
+            last_date, last_id = decode_cursor(cursor)
+            page_query["$or"] = [
+                {"concert_date": {"$lt": last_date}},
+                {"concert_date": last_date, "id": {"$lt": last_id}}
+            ]
+        else:
+            skip = (max(1, page) - 1) * page_size
+
+        # Orden alineado con el índice compuesto (concert_date, id);
+        # un registro extra para saber si existe una página siguiente
+        find_cursor = self.db.concerts.find(page_query, CONCERT_PROJECTION).sort(
+            [("concert_date", -1), ("id", -1)]
+        ).skip(skip).limit(page_size + 1)
+
+        # 4. El conteo total es opcional (includeTotal=false evita recalcularlo en cada página)
+        tasks = [
+            find_cursor.to_list(length=page_size + 1),
+            master_data.ensure_fresh(self.db)
         ]
-
-        result = await self.db.concerts.aggregate(pipeline).to_list(length=1)
-        
-        if not result:
-            return {"total": 0, "results": [], "page": page, "pageSize": page_size}
-
-        response = result[0]
-        response["total"] = response.get("total", 0)
-        response["page"] = page
-        response["pageSize"] = page_size
-        
-        return response
+        if include_total:
+            tasks.append(self.db.concerts.count_documents(match_query))
+        results, masters, *total = await asyncio.gather(*tasks)
+        # Joins con los maestros en memoria (solo sobre la página)
+        for concert in results:
+            masters.resolve_concert(concert, with_defaults=False)
+
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        next_cursor = None
+        if has_more and results:
+            last = results[-1]
+            next_cursor = encode_cursor(last["concert_date"], last["id"])
+
+        return {
+            "total": total[0] if include_total else None,
+            "results": results,
+            "page": page,
+            "pageSize": page_size,
+            "nextCursor": next_cursor,
+            "hasMore": has_more
+        }
+
+    async def stream_by_filter(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        concert_type_id: Optional[int] = None,
+        venue_type_id: Optional[int] = None,
+        tour_id: Optional[int] = None,
+        city_id: Optional[int] = None,
+        state_id: Optional[int] = None,
+        country_id: Optional[int] = None,
+        continent_id: Optional[int] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """
+        Recorre todo el catálogo filtrado (sin límite de 1 año) con un cursor del servidor.
+        Los nombres de los maestros se resuelven con master_data en lugar de 8 $lookup,
+        por lo que el consumo de memoria depende solo de batch_size.
+        """
+        match_query = self._build_match(
+            start_date, end_date,
+            concert_type_id=concert_type_id, venue_type_id=venue_type_id, tour_id=tour_id, city_id=city_id,
+            state_id=state_id, country_id=country_id, continent_id=continent_id
+        )
+
+        masters = await master_data.ensure_fresh(self.db)
+
+        # Orden cronológico (línea de tiempo de la carrera), alineado con el índice (concert_date, id)
+        cursor = self.db.concerts.find(match_query, CONCERT_PROJECTION).sort(
+            [("concert_date", 1), ("id", 1)]
+        ).batch_size(batch_size)
+
+        async for concert in cursor:
+            masters.resolve_concert(concert)
+            yield concert
 
     async def get_by_date(self, search_date) -> List[dict]:
-        # 1. Convertir el string 'yyyy-mm-dd' a objeto datetime (medianoche)
-        pipeline = [
-            # 2. Filtrar por la fecha exacta
-            {"$match": {"concert_date": search_date}},
-
-            # 3. Joins con Maestros Geográficos
-            {"$lookup": {
-                "from": "cities", 
-                "localField": "city_id", 
-                "foreignField": "id", 
-                "as": "city"
-            }},
-            {"$unwind": {"path": "$city", "preserveNullAndEmptyArrays": True}},
-
-            {"$lookup": {
-                "from": "states", 
-                "localField": "state_id", 
-                "foreignField": "id", 
-                "as": "state"
-            }},
-            {"$unwind": {"path": "$state", "preserveNullAndEmptyArrays": True}},
-
-            {"$lookup": {
-                "from": "countries", 
-                "localField": "country_id", 
-                "foreignField": "id", 
-                "as": "country"
-            }},
-            {"$unwind": {"path": "$country", "preserveNullAndEmptyArrays": True}},
-
-            {"$lookup": {
-                "from": "continents", 
-                "localField": "continent_id", 
-                "foreignField": "id", 
-                "as": "continent"
-            }},
-            {"$unwind": {"path": "$continent", "preserveNullAndEmptyArrays": True}},
-
-            # 4. Joins con Maestros de Tipos y Tours
-            {"$lookup": {
-                "from": "venue_types", 
-                "localField": "venue_type_id", 
-                "foreignField": "venue_type_id", 
-                "as": "v_type"
-            }},
-            {"$unwind": {"path": "$v_type", "preserveNullAndEmptyArrays": True}},
-
-            {"$lookup": {
-                "from": "show_types", 
-                "localField": "show_type_id", 
-                "foreignField": "show_type_id", 
-                "as": "s_type"
-            }},
-            {"$unwind": {"path": "$s_type", "preserveNullAndEmptyArrays": True}},
-
-            {"$lookup": {
-                "from": "concert_types", 
-                "localField": "concert_type_id", 
-                "foreignField": "concert_type_id", 
-                "as": "c_type"
-            }},
-            {"$unwind": {"path": "$c_type", "preserveNullAndEmptyArrays": True}},
-
-            {"$lookup": {
-                "from": "tours", 
-                "localField": "tour_id", 
-                "foreignField": "tour_id", 
-                "as": "tour"
-            }},
-            {"$unwind": {"path": "$tour", "preserveNullAndEmptyArrays": True}},
-
-            # 5. Proyección final con los nombres mapeados
-            {"$project": {
-                "_id": 0,
-                "id": "$id",
-                "concert_date": 1,
-                "venue_name": 1,
-                "venue_type_id": 1,
-                "venue_type_name": {"$ifNull": ["$v_type.venue_type_name", "N/A"]},
-                "show_type_id": 1,
-                "show_type_name": {"$ifNull": ["$s_type.show_type_name", "N/A"]},
-                "show_time": 1,
-                "concert_type_id": 1,
-                "concert_type_name": {"$ifNull": ["$c_type.concert_type_name", "N/A"]},
-                "tour_id": 1,
-                "tour_name": {"$ifNull": ["$tour.tour_name", "Non-Tour Concert"]},
-                "city_id": 1,
-                "city_name": {"$ifNull": ["$city.name", "Unknown"]},
-                "state_id": 1,
-                "state_name": {"$ifNull": ["$state.name", "N/A"]},
-                "country_id": 1,
-                "country_name": {"$ifNull": ["$country.name", "Unknown"]},
-                "continent_id": 1,
-                "continent_name": {"$ifNull": ["$continent.name", "Unknown"]},
-                "concert_year": 1,
-                "song_count": 1
-            }}
-        ]
-
-        cursor = self.db.concerts.aggregate(pipeline)
-        
-        results = await cursor.to_list(length=None)
-        if results:
-            print(f"DEBUG: First record keys: {results[0].keys()}")
+        # 1. Filtrar por la fecha exacta con proyección "lean"
+        cursor = self.db.concerts.find({"concert_date": search_date}, CONCERT_PROJECTION)
+        results, masters = await asyncio.gather(
+            cursor.to_list(length=None),
+            master_data.ensure_fresh(self.db)
+        )
+
+        # 2. Nombres de maestros geográficos, tipos y tours resueltos en memoria
+        for concert in results:
+            masters.resolve_concert(concert)
         return results
     
     async def get_concert_setlist(self, concert_id: int) -> List[dict]:
-        pipeline = [
-            # 1. Filtrar por el ID del concierto
-            {"$match": {"concert_id": concert_id}},
-
-            # 2. Ordenar por el número de canción
-            {"$sort": {"song_number": 1}},
-
-            # 3. Lookup para los nombres de los artistas invitados (resolución necesaria)
-            {"$lookup": {
-                "from": "guest_artists_concerts",
-                "localField": "guest_artist_ids",
-                "foreignField": "guest_artist_concert_id",
-                "as": "guests_data"
-            }},
+        # 1. Filtrar por el ID del concierto y ordenar por el número de canción
+        cursor = self.db.concert_songs.find(
+            {"concert_id": concert_id},
+            {"_id": 0, "concert_id": 1, "song_number": 1, "song_name": 1, "track_ids": 1, "guest_artist_ids": 1}
+        ).sort("song_number", 1)
+        songs, masters = await asyncio.gather(
+            cursor.to_list(length=None),
+            master_data.ensure_fresh(self.db)
+        )
+
+        # 2. Nombres de los artistas invitados resueltos en memoria
+        for song in songs:
+            song["guest_artists"] = masters.names_for("guest_artists_concerts", song.pop("guest_artist_ids", None))
+        return songs
+
+    async def get_concert_setlists(self, concert_ids: List[int]) -> Dict[int, List[dict]]:
+        """Setlists de varios conciertos en una sola consulta ($in), agrupados por concierto en el servidor."""
+        if not concert_ids:
+            return {}
 
-            # 4. Proyección final
-            {"$project": {
-                "_id": 0,
-                "concert_id": 1,
-                "song_number": 1,
-                "song_name": 1,
-                # Pasamos directamente el array de IDs numéricos que ya existe en el documento
-                "track_ids": "$track_ids", 
-                "guest_artists": "$guests_data.guest_artist_name"
+        pipeline = [
+            # 1. Todas las canciones de los conciertos solicitados (índice concert_songs.concert_id)
+            {"$match": {"concert_id": {"$in": list(concert_ids)}}},
+
+            # 2. Orden por concierto y número de canción para que $push conserve el orden
+            {"$sort": {"concert_id": 1, "song_number": 1}},
+
+            # 3. Un documento por concierto con su setlist
+            {"$group": {
+                "_id": "$concert_id",
+                "songs": {"$push": {
+                    "concert_id": "$concert_id",
+                    "song_number": "$song_number",
+                    "song_name": "$song_name",
+                    "track_ids": "$track_ids",
+                    "guest_artist_ids": "$guest_artist_ids"
+                }}
             }}
         ]
-
-        cursor = self.db.concert_songs.aggregate(pipeline)
-        return await cursor.to_list(length=None)
\ No newline at end of file
+        groups, masters = await asyncio.gather(
+            self.db.concert_songs.aggregate(pipeline).to_list(length=None),
+            master_data.ensure_fresh(self.db)
+        )
+
+        setlists = {concert_id: [] for concert_id in concert_ids}
+        for group in groups:
+            for song in group["songs"]:
+                song["guest_artists"] = masters.names_for("guest_artists_concerts", song.pop("guest_artist_ids", None))
+            setlists[group["_id"]] = group["songs"]
+        return setlists
@@ -1,10 +1,17 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import asyncio
+from app.database import get_data_version
+from app.repositories.track_id_sets import track_id_sets
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations()
 class ConcertsExecutiveSummaryRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
 
+    async def get_data_version(self) -> int:
+        return await get_data_version(self.db)
+
     async def get_executive_summary(self) -> dict:
         tasks = [
             self._get_total_concerts_count(),
@@ -266,36 +273,28 @@ class ConcertsExecutiveSummaryRepository:
         return result[0] if result else {"song_name": "N/A"}
     
     async def _get_total_non_album_songs(self) -> int:
-        # 1. Obtener IDs únicos de tracks vinculados a álbumes
-        # (Suponiendo que un track vinculado a un álbum tiene un album_id)
-        album_linked_track_ids = await self.db.tracks.distinct("id", {"album_id": {"$ne": None}})
-
-        # 2. Encontrar canciones en conciertos cuyo track_id NO esté en esa lista
-        # O canciones que no tengan track_ids en absoluto
+        # 1. Primer track de cada nombre de canción, y cuántos nombres comparten ese track
+        # (el resultado tiene a lo sumo una fila por track: no crece con la cantidad de conciertos)
         pipeline = [
             {"$group": {
                 "_id": "$song_name",
                 "track_id": {"$first": {"$arrayElemAt": ["$track_ids", 0]}}
             }},
-            {"$match": {
-                "$or": [
-                    {"track_id": {"$nin": album_linked_track_ids}},
-                    {"track_id": None}
-                ]
-            }},
-            {"$count": "total"}
+            {"$group": {
+                "_id": "$track_id",
+                "songs": {"$sum": 1}
+            }}
         ]
-        result = await self.db.concert_songs.aggregate(pipeline).to_list(length=1)
-        return result[0]["total"] if result else 0
+        rows, sets = await asyncio.gather(
+            self.db.concert_songs.aggregate(pipeline).to_list(length=None),
+            track_id_sets.ensure_fresh(self.db)
+        )
+
+        # 2. Canciones sin track o cuyo track no está vinculado a un álbum (conjunto en memoria)
+        linked = sets.album_linked.contains([row["_id"] for row in rows])
+        return sum(row["songs"] for row, is_linked in zip(rows, linked) if not is_linked)
     
     async def _get_total_studio_tracks_never_played(self) -> int:
-        # 1. Obtener lista de IDs de tracks que SÍ se han tocado
-        # Esto es rápido si track_ids está indexado
-        played_track_ids = await self.db.concert_songs.distinct("track_ids")
-
-        # 2. Contar tracks de estudio que no están en esa lista
-        count = await self.db.tracks.count_documents({
-            "metadata.is_live": False,
-            "id": {"$nin": played_track_ids}
-        })
-        return count
\ No newline at end of file
+        # Tracks de estudio menos los que sonaron en vivo, sin enviar la lista de ids a Mongo
+        sets = await track_id_sets.ensure_fresh(self.db)
+        return len(sets.studio.difference(sets.played)) + sets.studio_without_id
@@ -1,10 +1,16 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import asyncio
+from app.database import get_data_version
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations()
 class DiscographyExecutiveSummaryRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
 
+    async def get_data_version(self) -> int:
+        return await get_data_version(self.db)
+
     async def get_executive_summary(self) -> dict:
         _CARLOS_MUSICIAN_ID = 1
         _CARLOS_COMPOSER_ID = 11
@@ -1,7 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.models.geography import ContinentSchema, CountrySchema, StateSchema, CitySchema
 from typing import Optional
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations()
 class GeographyRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.database import get_data_version
+from app.core.operation_labels import labelled_operations
+
+# Segundos que se conservan los maestros antes de recargarlos desde Mongo
+MASTER_DATA_TTL = float(os.getenv("MASTER_DATA_TTL", "600"))
+
+# colección -> (campo id, campo nombre). Son colecciones pequeñas y casi estáticas.
+MASTER_COLLECTIONS = {
+    "venue_types": ("venue_type_id", "venue_type_name"),
+    "show_types": ("show_type_id", "show_type_name"),
+    "concert_types": ("concert_type_id", "concert_type_name"),
+    "tours": ("tour_id", "tour_name"),
+    "cities": ("id", "name"),
+    "states": ("id", "name"),
+    "countries": ("id", "name"),
+    "continents": ("id", "name"),
+    "genres": ("id", "name"),
+    "composers": ("id", "full_name"),
+    "guest_artists": ("id", "full_name"),
+    "guest_artists_concerts": ("guest_artist_concert_id", "guest_artist_name"),
+    # Fuentes históricas de invitados de /tracks (mismas que AlbumRepository.get_tracks_by_album)
+    "guests": ("id", "full_name"),
+    "collaborators": ("id", "full_name"),
+    "musicians": ("id", None),
+}
+
+# (campo id del concierto, campo nombre, colección, valor por defecto)
+CONCERT_MASTER_FIELDS = [
+    ("venue_type_id", "venue_type_name", "venue_types", "N/A"),
+    ("show_type_id", "show_type_name", "show_types", "N/A"),
+    ("concert_type_id", "concert_type_name", "concert_types", "N/A"),
+    ("tour_id", "tour_name", "tours", "Non-Tour Concert"),
+    ("city_id", "city_name", "cities", "Unknown"),
+    ("state_id", "state_name", "states", "N/A"),
+    ("country_id", "country_name", "countries", "Unknown"),
+    ("continent_id", "continent_name", "continents", "Unknown"),
+]
+
+def _musician_name(doc: dict) -> Optional[str]:
+    full_name = f"{doc.get('first_name') or ''} {doc.get('last_name') or ''}".strip()
+    return full_name or doc.get("apelativo")
+
+@labelled_operations()
+class MasterDataRegistry:
+    """
+    Diccionarios id -> nombre de los maestros, compartidos por todo el proceso.
+    Se cargan en el arranque (lifespan) y se recargan cuando cambia data_version (cada carga
+    de conciertos puede crear ciudades, tipos o invitados), al vencer el TTL o con invalidate(),
+    para que los repositorios resuelvan nombres en Python en lugar de hacer $lookup.
+    """
+
+    def __init__(self, ttl_seconds: float = MASTER_DATA_TTL):
+        self.ttl_seconds = ttl_seconds
+        self.names: Dict[str, Dict[int, str]] = {name: {} for name in MASTER_COLLECTIONS}
+        self.loaded_at: Optional[float] = None
+        self.version: Optional[int] = None
+        self.loads = 0
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, db: AsyncIOMotorDatabase) -> "MasterDataRegistry":
+        version = await get_data_version(db)
+        if self._is_fresh(version):
+            return self
+
+        async with self._lock:
+            # Otro request pudo haber recargado mientras esperábamos el lock
+            if not self._is_fresh(version):
+                await self.load(db, version)
+        return self
+
+    def _is_fresh(self, version: int) -> bool:
+        return (self.loaded_at is not None and self.version == version
+                and (time.monotonic() - self.loaded_at) < self.ttl_seconds)
+
+    def invalidate(self) -> None:
+        self.loaded_at = None
+        self.version = None
+
+    async def load(self, db: AsyncIOMotorDatabase, version: Optional[int] = None) -> None:
+        if version is None:
+            version = await get_data_version(db)
+        collections = list(MASTER_COLLECTIONS)
+        results = await asyncio.gather(*[
+            db[name].find({}, {"_id": 0}).to_list(length=None) for name in collections
+        ])
+
+        names = {}
+        for collection, docs in zip(collections, results):
+            id_field, name_field = MASTER_COLLECTIONS[collection]
+            mapping = {}
+            for doc in docs:
+                name = doc.get(name_field) if name_field else _musician_name(doc)
+                if doc.get(id_field) is not None and name is not None:
+                    mapping[doc[id_field]] = name
+            names[collection] = mapping
+
+        # Se reemplaza el diccionario completo: los lectores nunca ven una carga a medias
+        self.names = names
+        self.loaded_at = time.monotonic()
+        self.version = version
+        self.loads += 1
+
+    def name(self, collection: str, item_id, default: Optional[str] = None) -> Optional[str]:
+        return self.names[collection].get(item_id, default)
+
+    def names_for(self, collection: str, ids: Optional[Iterable]) -> List[str]:
+        """Nombres de una lista de ids (los ids desconocidos se omiten, igual que $lookup)."""
+        mapping = self.names[collection]
+        return [mapping[item_id] for item_id in (ids or []) if item_id in mapping]
+
+    def resolve_concert(self, concert: dict, with_defaults: bool = True) -> dict:
+        """Agrega los *_name del concierto a partir de sus *_id."""
+        for id_field, name_field, collection, default in CONCERT_MASTER_FIELDS:
+            name = self.names[collection].get(concert.get(id_field))
+            if name is None and with_defaults:
+                name = default
+            if name is not None:
+                concert[name_field] = name
+        return concert
+
+    def stats(self) -> dict:
+        return {
+            "collections": {name: len(mapping) for name, mapping in self.names.items()},
+            "ttl_seconds": self.ttl_seconds,
+            "data_version": self.version,
+            "age_seconds": None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 1),
+            "loads": self.loads
+        }
+
+# Instancia compartida por el proceso (se carga en el lifespan de la app)
+master_data = MasterDataRegistry()
@@ -1,6 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations()
 class MusicianRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -18,7 +20,7 @@ class MusicianRepository:
 
     # --- MUSICIANS ---
     async def get_all_musicians(self):
-        return await self.db.musicians.find({}, {"_id": 0}).to_list(length=100)
+        return await self.db.musicians.find({}, {"_id": 0}).to_list(length=None)
 
     async def create_musician(self, musician_data: dict):
         await self.db.musicians.insert_one(musician_data)
@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import os
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.database import get_data_version
+from app.repositories.master_data_registry import master_data
+from app.repositories.search_repository import SearchRepository, venue_subtitle
+from app.core.operation_labels import labelled_operations
+
+# Cada cuántos segundos se compara la versión de datos (counters.data_version) con la del índice
+SEARCH_VERSION_CHECK_SECONDS = float(os.getenv("SEARCH_VERSION_CHECK_SECONDS", "30"))
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+def normalize_text(text) -> str:
+    """Minúsculas, sin acentos ni signos: 'Estádio do Maracanã' -> 'estadio do maracana'."""
+    if text is None:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    without_accents = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_ALNUM.sub(" ", without_accents.lower()).split())
+
+@labelled_operations()
+class SearchIndex:
+    """
+    Índice invertido en memoria sobre tracks, álbumes, venues y músicos.
+    El vocabulario se guarda ordenado: las búsquedas por prefijo son un rango con bisect
+    (equivalente a recorrer un trie). Se reconstruye cuando cambia la versión de datos.
+    """
+
+    def __init__(self, check_seconds: float = SEARCH_VERSION_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self.docs: List[dict] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.vocabulary: List[str] = []
+        self.data_version: Optional[int] = None
+        self.checked_at: Optional[float] = None
+        self.build_ms: Optional[float] = None
+        self.builds = 0
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, db: AsyncIOMotorDatabase) -> "SearchIndex":
+        if self.checked_at is not None and (time.monotonic() - self.checked_at) < self.check_seconds:
+            return self
+
+        async with self._lock:
+            if self.checked_at is None or (time.monotonic() - self.checked_at) >= self.check_seconds:
+                version = await get_data_version(db)
+                if version != self.data_version or not self.docs:
+                    await self.build(db, version)
+                self.checked_at = time.monotonic()
+        return self
+
+    def invalidate(self) -> None:
+        self.checked_at = None
+        self.data_version = None
+
+    async def build(self, db: AsyncIOMotorDatabase, version: Optional[int] = None) -> None:
+        started = time.perf_counter()
+        repo = SearchRepository(db)
+        await master_data.ensure_fresh(db)
+        albums, tracks, musicians, venues = await asyncio.gather(
+            repo.get_albums(), repo.get_tracks(), repo.get_musicians(), repo.get_venues()
+        )
+
+        album_titles = {a.get("id"): a.get("title") for a in albums}
+        docs = []
+        for a in albums:
+            docs.append(self._doc("album", a.get("id"), a.get("title"),
+                                  str(a["release_year"]) if a.get("release_year") else None))
+        for t in tracks:
+            docs.append(self._doc("track", t.get("id"), t.get("title"), album_titles.get(t.get("album_id")),
+                                  rank=0.1 if t.get("metadata", {}).get("is_live") else 0.0))
+        for m in musicians:
+            name = f"{m.get('first_name') or ''} {m.get('last_name') or ''}".strip() or m.get("apelativo")
+            alias = m.get("apelativo")
+            docs.append(self._doc("musician", m.get("id"), name, alias if alias != name else None, extra=alias))
+        for v in venues:
+            # La ciudad también se indexa: "sao paulo" encuentra los venues de São Paulo
+            docs.append(self._doc("venue", None, v.get("venue_name"), venue_subtitle(v),
+                                  extra=master_data.name("cities", v.get("city_id")),
+                                  rank=-min(v.get("concert_count", 0), 100) / 1000))
+        docs = [d for d in docs if d["name"]]
+
+        postings: Dict[str, List[int]] = {}
+        for position, doc in enumerate(docs):
+            for token in set(doc["tokens"]):
+                postings.setdefault(token, []).append(position)
+
+        # Se reemplaza todo de una vez: las búsquedas en curso nunca ven un índice a medias
+        self.docs, self.postings, self.vocabulary = docs, postings, sorted(postings)
+        self.data_version = await get_data_version(db) if version is None else version
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.builds += 1
+
+    @staticmethod
+    def _doc(doc_type: str, doc_id, name, subtitle=None, extra=None, rank: float = 0.0) -> dict:
+        norm = normalize_text(name)
+        return {
+            "type": doc_type, "id": doc_id, "name": str(name).strip() if name else None, "subtitle": subtitle,
+            "norm": norm, "tokens": (norm + " " + normalize_text(extra)).split(), "rank": rank
+        }
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + "\uffff", start)
+        return self.vocabulary[start:end]
+
+    def search(self, q: str, types: Sequence[str], limit: int = 20) -> List[dict]:
+        """
+        Todas las palabras de la consulta deben aparecer (como palabra completa o prefijo).
+        Score: palabra exacta > prefijo, más bonus si el nombre empieza con la consulta o es igual.
+        """
+        query = normalize_text(q)
+        terms = query.split()
+        if not terms:
+            return []
+
+        scores: Optional[Dict[int, float]] = None
+        for term in dict.fromkeys(terms):
+            term_scores: Dict[int, float] = {}
+            for token in self._expand(term):
+                weight = 2.0 if token == term else 1.0 + len(term) / len(token)
+                for position in self.postings[token]:
+                    if weight > term_scores.get(position, 0.0):
+                        term_scores[position] = weight
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {p: s + term_scores[p] for p, s in scores.items() if p in term_scores}
+            if not scores:
+                return []
+
+        wanted = set(types)
+        results = []
+        for position, score in scores.items():
+            doc = self.docs[position]
+            if doc["type"] not in wanted:
+                continue
+            if doc["norm"] == query:
+                score += 5.0
+            elif doc["norm"].startswith(query):
+                score += 3.0
+            results.append((round(score - doc["rank"], 3), doc))
+
+        top = heapq.nsmallest(limit, results, key=lambda item: (-item[0], len(item[1]["norm"]), item[1]["norm"]))
+        return [
+            {"type": doc["type"], "id": doc["id"], "name": doc["name"], "subtitle": doc["subtitle"], "score": score}
+            for score, doc in top
+        ]
+
+    def stats(self) -> dict:
+        counts: Dict[str, int] = {}
+        for doc in self.docs:
+            counts[doc["type"]] = counts.get(doc["type"], 0) + 1
+        return {
+            "documents": counts,
+            "terms": len(self.vocabulary),
+            "data_version": self.data_version,
+            "build_ms": self.build_ms,
+            "builds": self.builds,
+            "check_seconds": self.check_seconds
+        }
+
+# Instancia compartida por el proceso (se construye en el primer /search, vía ensure_fresh)
+search_index = SearchIndex()
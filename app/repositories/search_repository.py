@@ -0,0 +1,95 @@
+from typing import List, Optional, Sequence
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.repositories.master_data_registry import master_data
+from app.core.operation_labels import labelled_operations
+
+SEARCH_TYPES = ("track", "album", "venue", "musician")
+
+@labelled_operations()
+class SearchRepository:
+    """
+    Fuente de datos de la búsqueda: documentos para el índice en memoria (search_index)
+    y el backend alternativo con los índices de texto de Mongo ($text).
+    """
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    async def get_albums(self) -> List[dict]:
+        return await self.db.albums.find({}, {"_id": 0, "id": 1, "title": 1, "release_year": 1}).to_list(length=None)
+
+    async def get_tracks(self) -> List[dict]:
+        return await self.db.tracks.find(
+            {"title": {"$exists": True}},
+            {"_id": 0, "id": 1, "title": 1, "album_id": 1, "metadata.is_live": 1}
+        ).to_list(length=None)
+
+    async def get_musicians(self) -> List[dict]:
+        return await self.db.musicians.find(
+            {}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "apelativo": 1}
+        ).to_list(length=None)
+
+    async def get_venues(self, match: Optional[dict] = None, limit: Optional[int] = None) -> List[dict]:
+        """Venues distintos (nombre + ciudad) a partir de los conciertos, con su cantidad de conciertos."""
+        pipeline = [
+            {"$match": {"venue_name": {"$nin": [None, ""]}, **(match or {})}},
+            {"$group": {
+                "_id": {"venue_name": "$venue_name", "city_id": "$city_id"},
+                "country_id": {"$first": "$country_id"},
+                "concert_count": {"$sum": 1}
+            }},
+            {"$project": {
+                "_id": 0,
+                "venue_name": "$_id.venue_name",
+                "city_id": "$_id.city_id",
+                "country_id": 1,
+                "concert_count": 1
+            }},
+            {"$sort": {"concert_count": -1}}
+        ]
+        if limit:
+            pipeline.append({"$limit": limit})
+        return await self.db.concerts.aggregate(pipeline).to_list(length=None)
+
+    async def text_search(self, q: str, types: Sequence[str], limit: int) -> List[dict]:
+        """
+        Backend Mongo: índices de texto (insensibles a acentos) de tracks, albums, musicians y concerts.
+        Devuelve filas con la misma forma que SearchIndex.search.
+        """
+        await master_data.ensure_fresh(self.db)
+        text = {"$text": {"$search": q}}
+        score = {"score": {"$meta": "textScore"}}
+        results = []
+
+        if "track" in types:
+            rows = await self.db.tracks.find(text, {"_id": 0, "id": 1, "title": 1, "album_id": 1, **score}) \
+                .sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(length=limit)
+            albums = {a["id"]: a["title"] for a in await self.get_albums()} if rows else {}
+            results += [{"type": "track", "id": r.get("id"), "name": r["title"],
+                         "subtitle": albums.get(r.get("album_id")), "score": r["score"]} for r in rows]
+
+        if "album" in types:
+            rows = await self.db.albums.find(text, {"_id": 0, "id": 1, "title": 1, "release_year": 1, **score}) \
+                .sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(length=limit)
+            results += [{"type": "album", "id": r.get("id"), "name": r["title"],
+                         "subtitle": str(r["release_year"]) if r.get("release_year") else None, "score": r["score"]} for r in rows]
+
+        if "musician" in types:
+            rows = await self.db.musicians.find(text, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "apelativo": 1, **score}) \
+                .sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(length=limit)
+            results += [{"type": "musician", "id": r.get("id"), "name": master_data.name("musicians", r.get("id"))
+                         or f"{r.get('first_name') or ''} {r.get('last_name') or ''}".strip(),
+                         "subtitle": r.get("apelativo"), "score": r["score"]} for r in rows]
+
+        if "venue" in types:
+            rows = await self.get_venues(match=text, limit=limit)
+            results += [{"type": "venue", "id": None, "name": r["venue_name"],
+                         "subtitle": venue_subtitle(r), "score": float(r["concert_count"])} for r in rows]
+
+        results.sort(key=lambda r: -r["score"])
+        return results[:limit]
+
+def venue_subtitle(venue: dict) -> str:
+    place = ", ".join(n for n in (master_data.name("cities", venue.get("city_id")),
+                                   master_data.name("countries", venue.get("country_id"))) if n)
+    count = venue.get("concert_count", 0)
+    return f"{place} · {count} concert{'s' if count != 1 else ''}" if place else f"{count} concert{'s' if count != 1 else ''}"
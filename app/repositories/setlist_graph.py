@@ -0,0 +1,282 @@
+from __future__ import annotations
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.lazy import lazy_import
+
+# numpy se carga en el primer uso (no en el arranque de la API)
+np = lazy_import("numpy")
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.database import get_data_version
+from app.repositories.search_index import normalize_text
+from app.core.operation_labels import labelled_operations
+
+# Conciertos modificados por cada carga: {_id: data_version, concert_ids: [...]} (scripts/maintenance/load_concerts.py)
+CONCERT_CHANGES = "concert_changes"
+# Sobre esta cantidad de conciertos modificados conviene reconstruir todo en lugar de aplicar el delta
+SETLIST_GRAPH_MAX_INCREMENTAL = int(os.getenv("SETLIST_GRAPH_MAX_INCREMENTAL", "5000"))
+
+_SHIFT = 32
+_LOW = (1 << _SHIFT) - 1
+
+def _pack(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Coordenada (fila, columna) de la matriz COO como una sola llave int64 ordenable."""
+    return (rows.astype(np.int64) << _SHIFT) | cols.astype(np.int64)
+
+def _unpack(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return keys >> _SHIFT, keys & _LOW
+
+def _merge(keys: np.ndarray, counts: np.ndarray, delta_keys: np.ndarray, delta_counts: np.ndarray):
+    """Suma un delta (+conciertos nuevos / -setlists reemplazados) a una matriz COO y descarta los ceros."""
+    if delta_keys.size == 0:
+        return keys, counts
+    all_keys = np.concatenate([keys, delta_keys])
+    unique, inverse = np.unique(all_keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=np.concatenate([counts, delta_counts]).astype(np.float64)).astype(np.int64)
+    keep = sums != 0
+    return unique[keep], sums[keep]
+
+def _empty() -> Tuple[np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+
+@labelled_operations()
+class SetlistGraph:
+    """
+    Matrices dispersas (COO, NumPy puro) sobre el orden de los setlists:
+      - transiciones: canción A seguida inmediatamente por canción B (segues),
+      - co-ocurrencia: A y B en el mismo concierto (triángulo superior, A < B).
+    Cada canción es un nodo: el track (track_ids[0]) o, si no tiene, el nombre normalizado.
+    Las llaves (fila << 32 | columna) se mantienen ordenadas, así una fila es un rango con searchsorted.
+    Cuando cambia la versión de datos se aplica el delta de los conciertos registrados en
+    concert_changes; si falta alguna versión intermedia se reconstruye desde concert_songs.
+    """
+
+    def __init__(self, max_incremental: int = SETLIST_GRAPH_MAX_INCREMENTAL):
+        self.max_incremental = max_incremental
+        self.version: Optional[int] = None
+        self.builds = 0
+        self.incremental_updates = 0
+        self.build_ms: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.node_index: Dict[tuple, int] = {}
+        self.labels: List[str] = []
+        self.track_ids: List[Optional[int]] = []
+        # Nombre normalizado (del setlist o del título del track) -> nodo, para buscar por canción
+        self.name_codes: Dict[str, int] = {}
+        self.setlists: Dict[int, np.ndarray] = {}
+        self.transition_keys, self.transition_counts = _empty()
+        self.pair_keys, self.pair_counts = _empty()
+        self.node_concerts = np.zeros(0, dtype=np.int64)
+        self.out_totals = np.zeros(0, dtype=np.int64)
+        self.concert_count = 0
+
+    async def ensure_fresh(self, db: AsyncIOMotorDatabase) -> "SetlistGraph":
+        version = await get_data_version(db)
+        if self.version == version:
+            return self
+
+        async with self._lock:
+            # Otro request pudo haber actualizado mientras esperábamos el lock
+            if self.version != version:
+                concert_ids = await self._changed_concerts(db, version)
+                if concert_ids is None:
+                    await self.load(db, version)
+                else:
+                    await self.apply_changes(db, concert_ids, version)
+        return self
+
+    def invalidate(self) -> None:
+        self.version = None
+
+    async def _changed_concerts(self, db: AsyncIOMotorDatabase, version: int) -> Optional[List[int]]:
+        """Conciertos modificados desde la versión cargada; None si el delta no está completo."""
+        if self.version is None or version < self.version:
+            return None
+        changes = await db[CONCERT_CHANGES].find(
+            {"_id": {"$gt": self.version, "$lte": version}}, {"_id": 1, "concert_ids": 1}
+        ).to_list(length=None)
+        # Otras escrituras (reset_concerts, rebuild_track_play_stats) suben la versión sin registrar cambios
+        if len(changes) != version - self.version:
+            return None
+        concert_ids = {cid for change in changes for cid in change.get("concert_ids", [])}
+        if len(concert_ids) > self.max_incremental:
+            return None
+        return sorted(concert_ids)
+
+    async def load(self, db: AsyncIOMotorDatabase, version: int) -> None:
+        started = time.perf_counter()
+        tracks, songs = await asyncio.gather(self._get_track_titles(db), self._get_songs(db))
+        self._reset()
+        self._apply(tracks, songs, replaced=[])
+        self.version = version
+        self.builds += 1
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    async def apply_changes(self, db: AsyncIOMotorDatabase, concert_ids: List[int], version: int) -> None:
+        if concert_ids:
+            tracks, songs = await asyncio.gather(
+                self._get_track_titles(db), self._get_songs(db, {"concert_id": {"$in": concert_ids}})
+            )
+            self._apply(tracks, songs, replaced=concert_ids)
+        self.version = version
+        self.incremental_updates += 1
+
+    @staticmethod
+    async def _get_track_titles(db: AsyncIOMotorDatabase) -> Dict[int, str]:
+        tracks = await db.tracks.find({}, {"_id": 0, "id": 1, "title": 1}).to_list(length=None)
+        return {t.get("id"): t.get("title") for t in tracks}
+
+    @staticmethod
+    async def _get_songs(db: AsyncIOMotorDatabase, match: Optional[dict] = None) -> List[dict]:
+        return await db.concert_songs.find(
+            match or {}, {"_id": 0, "concert_id": 1, "song_number": 1, "song_name": 1, "track_ids": 1}
+        ).to_list(length=None)
+
+    def _node(self, song: dict, track_titles: Dict[int, str]) -> Optional[int]:
+        track_ids = song.get("track_ids") or []
+        track_id = track_ids[0] if track_ids else None
+        name = normalize_text(song.get("song_name"))
+        if track_id is not None:
+            key = ("track", track_id)
+        elif name:
+            key = ("song", name)
+        else:
+            return None
+
+        code = self.node_index.get(key)
+        if code is None:
+            code = len(self.labels)
+            self.node_index[key] = code
+            self.labels.append(track_titles.get(track_id) or str(song.get("song_name")).strip())
+            self.track_ids.append(track_id)
+            if track_id is not None and track_titles.get(track_id):
+                self.name_codes.setdefault(normalize_text(track_titles[track_id]), code)
+        if name:
+            self.name_codes.setdefault(name, code)
+        return code
+
+    def _apply(self, track_titles: Dict[int, str], songs: List[dict], replaced: Iterable[int]) -> None:
+        """Resta la contribución de los setlists reemplazados y suma la de los nuevos."""
+        grouped: Dict[int, List[Tuple[int, int]]] = {}
+        for song in songs:
+            code = self._node(song, track_titles)
+            if code is not None:
+                grouped.setdefault(song.get("concert_id"), []).append((song.get("song_number") or 0, code))
+
+        old = [self.setlists.pop(cid) for cid in replaced if cid in self.setlists]
+        new = {}
+        for concert_id, numbered in grouped.items():
+            numbered.sort(key=lambda item: item[0])
+            new[concert_id] = np.fromiter((code for _, code in numbered), dtype=np.int64, count=len(numbered))
+        self.setlists.update(new)
+
+        n_nodes = len(self.labels)
+        if self.node_concerts.size < n_nodes:
+            self.node_concerts = np.concatenate([self.node_concerts, np.zeros(n_nodes - self.node_concerts.size, dtype=np.int64)])
+
+        parts = [(self._contributions(seq), 1) for seq in new.values()] + [(self._contributions(seq), -1) for seq in old]
+        if parts:
+            transitions = np.concatenate([t for (t, _, _), _ in parts])
+            transition_signs = np.concatenate([np.full(t.size, sign, dtype=np.int64) for (t, _, _), sign in parts])
+            pairs = np.concatenate([p for (_, p, _), _ in parts])
+            pair_signs = np.concatenate([np.full(p.size, sign, dtype=np.int64) for (_, p, _), sign in parts])
+            nodes = np.concatenate([u for (_, _, u), _ in parts])
+            node_signs = np.concatenate([np.full(u.size, sign, dtype=np.int64) for (_, _, u), sign in parts])
+
+            self.transition_keys, self.transition_counts = _merge(self.transition_keys, self.transition_counts, transitions, transition_signs)
+            self.pair_keys, self.pair_counts = _merge(self.pair_keys, self.pair_counts, pairs, pair_signs)
+            np.add.at(self.node_concerts, nodes, node_signs)
+
+        self.concert_count = sum(1 for seq in self.setlists.values() if seq.size)
+        rows, _ = _unpack(self.transition_keys)
+        self.out_totals = np.bincount(rows, weights=self.transition_counts, minlength=n_nodes).astype(np.int64)
+
+    @staticmethod
+    def _contributions(seq: np.ndarray):
+        """Transiciones consecutivas (sin repetir el mismo nodo), pares únicos A < B y nodos del setlist."""
+        a, b = seq[:-1], seq[1:]
+        moves = a != b
+        transitions = _pack(a[moves], b[moves])
+        unique = np.unique(seq)
+        i, j = np.triu_indices(unique.size, 1)
+        return transitions, _pack(unique[i], unique[j]), unique
+
+    # --- Consultas ---
+
+    def find(self, song: Optional[str] = None, track_id: Optional[int] = None) -> Optional[int]:
+        if track_id is not None:
+            return self.node_index.get(("track", track_id))
+        if song:
+            return self.name_codes.get(normalize_text(song))
+        return None
+
+    def _song(self, code: int, suffix: str) -> dict:
+        return {f"song_{suffix}": self.labels[code], f"track_id_{suffix}": self.track_ids[code]}
+
+    def _row(self, code: int) -> slice:
+        keys = self.transition_keys
+        return slice(int(np.searchsorted(keys, code << _SHIFT)), int(np.searchsorted(keys, (code + 1) << _SHIFT)))
+
+    def _transition(self, row: int, col: int, count: int) -> dict:
+        return {
+            **self._song(row, "from"), **self._song(col, "to"), "count": int(count),
+            "probability": round(float(count / self.out_totals[row]), 4) if self.out_totals[row] else 0.0
+        }
+
+    def next_songs(self, code: int, limit: int = 10) -> List[dict]:
+        """P(siguiente = B | actual = A): fila A de la matriz de transiciones normalizada."""
+        row = self._row(code)
+        keys, counts = self.transition_keys[row], self.transition_counts[row]
+        _, cols = _unpack(keys)
+        order = np.lexsort((cols, -counts))[:limit]
+        return [self._transition(code, int(cols[i]), int(counts[i])) for i in order]
+
+    def top_segues(self, limit: int = 20, min_count: int = 1) -> List[dict]:
+        keep = self.transition_counts >= min_count
+        keys, counts = self.transition_keys[keep], self.transition_counts[keep]
+        order = np.lexsort((keys, -counts))[:limit]
+        rows, cols = _unpack(keys[order])
+        return [self._transition(int(r), int(c), int(counts[i])) for r, c, i in zip(rows, cols, order)]
+
+    def co_occurrence(self, code: Optional[int] = None, limit: int = 20, min_support: int = 1) -> List[dict]:
+        """Pares que comparten concierto; lift = P(A y B) / (P(A) · P(B))."""
+        rows, cols = _unpack(self.pair_keys)
+        keep = self.pair_counts >= min_support
+        if code is not None:
+            keep &= (rows == code) | (cols == code)
+        rows, cols, counts = rows[keep], cols[keep], self.pair_counts[keep]
+        if counts.size == 0:
+            return []
+
+        lift = counts * float(self.concert_count) / (self.node_concerts[rows] * self.node_concerts[cols])
+        order = np.lexsort((-counts, -lift))[:limit]
+        results = []
+        for i in order:
+            a, b = int(rows[i]), int(cols[i])
+            if code is not None and b == code:
+                a, b = b, a
+            results.append({
+                **self._song(a, "a"), **self._song(b, "b"), "concerts": int(counts[i]),
+                "support": round(float(counts[i] / self.concert_count), 4), "lift": round(float(lift[i]), 3)
+            })
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "nodes": len(self.labels),
+            "concerts": self.concert_count,
+            "transitions_nnz": int(self.transition_keys.size),
+            "pairs_nnz": int(self.pair_keys.size),
+            "data_version": self.version,
+            "build_ms": self.build_ms,
+            "builds": self.builds,
+            "incremental_updates": self.incremental_updates
+        }
+
+# Instancia compartida por el proceso
+setlist_graph = SetlistGraph()
@@ -1,21 +1,146 @@
 from typing import Optional, List
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
-
+from app.repositories.stats_snapshot_repository import StatsSnapshotRepository
+from app.repositories.columnar_engine import columnar_engine, columnar_engine_enabled
+from app.repositories.master_data_registry import master_data
+from app.repositories.setlist_graph import setlist_graph
+from app.repositories.track_id_sets import track_id_sets
+from app.core.operation_labels import labelled_operations
+
+@labelled_operations(skip=("_read", "_read_play_stats"))
 class StatisticsConcertsRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
-        
+        self.snapshots = StatsSnapshotRepository(db)
+
+    # --- Lecturas desde snapshots materializados (stats_snapshots) ---
+    # Los pipelines _build_* solo se ejecutan cuando cambia la versión de datos.
+    # Con ANALYTICS_ENGINE=columnar se responde desde el motor NumPy en memoria.
+
+    async def _read(self, key: str, builder, compute):
+        if columnar_engine_enabled():
+            engine = await columnar_engine.ensure_fresh(self.db)
+            return compute(engine)
+        return await self.snapshots.get_or_build(key, builder)
+
+    async def _read_play_stats(self, builder, compute):
+        """Lecturas que salen directamente de track_play_stats (ya precalculada por el loader)."""
+        if columnar_engine_enabled():
+            engine = await columnar_engine.ensure_fresh(self.db)
+            return compute(engine)
+        return await builder()
+
+    async def _has_play_stats(self) -> bool:
+        """
+        track_play_stats vacía = base donde aún no se ejecutó rebuild_track_play_stats:
+        mientras tanto los conteos se calculan desde concert_songs como antes.
+        """
+        return await self.db.track_play_stats.find_one({}, {"_id": 1}) is not None
+
     async def get_top_20_most_played_songs(self) -> List[dict]:
-        pipeline = [
-            # 1. Agrupar y contar
-            {"$match": {"track_ids": {"$exists": True, "$not": {"$size": 0}}}},
-            {"$unwind": "$track_ids"},
-            {"$group": {
-                "_id": "$track_ids",
-                "play_count": {"$sum": 1} # Este es el contador
-            }},
+        return await self._read_play_stats(self._build_top_20_most_played_songs,
+                                           lambda engine: engine.top_20_most_played_songs())
+
+    async def get_most_played_studio_albums(self) -> List[dict]:
+        return await self._read("concerts:most_played_studio_albums", self._build_most_played_studio_albums,
+                                lambda engine: engine.most_played_studio_albums())
+
+    async def get_most_explored_studio_albums(self) -> List[dict]:
+        return await self._read("concerts:most_explored_studio_albums", self._build_most_explored_studio_albums,
+                                lambda engine: engine.most_explored_studio_albums())
+
+    async def get_concerts_stats_by_year(self) -> List[dict]:
+        return await self._read("concerts:stats_by_year", self._build_concerts_stats_by_year,
+                                lambda engine: engine.concerts_stats_by_year())
+
+    async def get_concert_counts_by_country(self) -> List[dict]:
+        return await self._read("concerts:counts_by_country", self._build_concert_counts_by_country,
+                                lambda engine: engine.concert_counts_by_country())
+
+    async def get_top_20_concert_opener_tracks(self) -> List[dict]:
+        return await self._read("concerts:top_20_opener_tracks", self._build_top_20_concert_opener_tracks,
+                                lambda engine: engine.top_20_concert_opener_tracks())
 
+    async def get_non_album_songs(self) -> List[dict]:
+        return await self._read("concerts:non_album_songs", self._build_non_album_songs,
+                                lambda engine: engine.non_album_songs())
+
+    async def get_geographic_conquest_milestones(self) -> List[dict]:
+        return await self._read("concerts:geographic_conquest_milestones", self._build_geographic_conquest_milestones,
+                                lambda engine: engine.geographic_conquest_milestones())
+
+    async def get_tracks_with_play_count_by_album(self, album_id: int) -> List[dict]:
+        return await self._read_play_stats(
+            lambda: self._build_tracks_with_play_count_by_album(album_id),
+            lambda engine: engine.tracks_with_play_count_by_album(album_id)
+        )
+
+    # --- Secuencia de los setlists (matrices dispersas en memoria, app/repositories/setlist_graph.py) ---
+
+    async def get_setlist_transitions(self, song: Optional[str], track_id: Optional[int], limit: int) -> Optional[List[dict]]:
+        """Canciones que siguen a la indicada; None si la canción no aparece en ningún setlist."""
+        graph = await setlist_graph.ensure_fresh(self.db)
+        code = graph.find(song=song, track_id=track_id)
+        return None if code is None else graph.next_songs(code, limit)
+
+    async def get_top_segues(self, limit: int, min_count: int) -> List[dict]:
+        graph = await setlist_graph.ensure_fresh(self.db)
+        return graph.top_segues(limit, min_count)
+
+    async def get_song_co_occurrence(self, song: Optional[str], track_id: Optional[int], limit: int, min_concerts: int) -> Optional[List[dict]]:
+        """Pares con mayor lift; con canción o track, solo los pares que la incluyen."""
+        graph = await setlist_graph.ensure_fresh(self.db)
+        if song is None and track_id is None:
+            return graph.co_occurrence(None, limit, min_concerts)
+        code = graph.find(song=song, track_id=track_id)
+        return None if code is None else graph.co_occurrence(code, limit, min_concerts)
+
+    async def refresh_snapshots(self) -> dict:
+        """
+        Precalcula los snapshots globales para la versión de datos actual y purga los obsoletos.
+        Lo llama el loader al terminar (scripts/maintenance/refresh_stats_snapshots.py); siempre
+        usa los pipelines, también con ANALYTICS_ENGINE=columnar.
+        """
+        builders = {
+            "concerts:most_played_studio_albums": self._build_most_played_studio_albums,
+            "concerts:most_explored_studio_albums": self._build_most_explored_studio_albums,
+            "concerts:stats_by_year": self._build_concerts_stats_by_year,
+            "concerts:counts_by_country": self._build_concert_counts_by_country,
+            "concerts:top_20_opener_tracks": self._build_top_20_concert_opener_tracks,
+            "concerts:non_album_songs": self._build_non_album_songs,
+            "concerts:geographic_conquest_milestones": self._build_geographic_conquest_milestones,
+        }
+        await asyncio.gather(*(self.snapshots.get_or_build(key, builder) for key, builder in builders.items()))
+        return {"built": sorted(builders), "purged": await self.snapshots.purge_stale()}
+
+    # --- Pipelines de agregación (fuente de los snapshots) ---
+
+    async def _build_top_20_most_played_songs(self) -> List[dict]:
+        if await self._has_play_stats():
+            # 1. Conteos ya agregados por el loader (track_play_stats)
+            source = self.db.track_play_stats
+            pipeline = [
+                {"$project": {
+                    "_id": "$track_id",
+                    "play_count": "$total_plays" # Este es el contador
+                }}
+            ]
+        else:
+            # 1. Agrupar y contar en concert_songs (un track repetido en la misma canción cuenta una vez)
+            source = self.db.concert_songs
+            pipeline = [
+                {"$match": {"track_ids": {"$exists": True, "$not": {"$size": 0}}}},
+                {"$project": {"track_id": {"$setUnion": ["$track_ids", []]}}},
+                {"$unwind": "$track_id"},
+                {"$group": {
+                    "_id": "$track_id",
+                    "play_count": {"$sum": 1}
+                }}
+            ]
+
+        pipeline += [
             # 2. Join con Tracks para obtener info básica
             {"$lookup": {
                 "from": "tracks",
@@ -41,11 +166,7 @@ class StatisticsConcertsRepository:
             }},
             {"$unwind": {"path": "$album", "preserveNullAndEmptyArrays": True}},
 
-            # Joins para obtener nombres de IDs (Músicos, Géneros, etc.)
-            {"$lookup": {"from": "genres", "localField": "track.genre_ids", "foreignField": "id", "as": "genre_docs"}},
-            {"$lookup": {"from": "musicians", "localField": "track.composer_ids", "foreignField": "id", "as": "composer_docs"}},
-            {"$lookup": {"from": "musicians", "localField": "track.guest_artist_ids", "foreignField": "id", "as": "guest_docs"}},
-
+            # Los nombres de géneros, compositores e invitados se resuelven con master_data
             # 5. Proyección Final
             {"$project": {
                 "_id": 0,
@@ -55,9 +176,9 @@ class StatisticsConcertsRepository:
                 "duration": "$track.duration",
                 "duration_seconds": "$track.duration_seconds",
                 "metadata": "$track.metadata",
-                "genres": "$genre_docs.name",
-                "composers": "$composer_docs.name",
-                "guestArtists": "$guest_docs.name",
+                "genre_ids": "$track.genre_ids",
+                "composer_ids": "$track.composer_ids",
+                "guest_artist_ids": "$track.guest_artist_ids",
                 # Album fields
                 "album_id": "$album.id",
                 "album_title": "$album.title",
@@ -67,10 +188,18 @@ class StatisticsConcertsRepository:
             }}
         ]
 
-        cursor = self.db.concert_songs.aggregate(pipeline)
-        return await cursor.to_list(length=20)
+        results, masters = await asyncio.gather(
+            source.aggregate(pipeline).to_list(length=20),
+            master_data.ensure_fresh(self.db)
+        )
+        for row in results:
+            row["genres"] = masters.names_for("genres", row.pop("genre_ids", None))
+            # Compositores e invitados del top 20 salen de musicians (la misma fuente que el $lookup original)
+            row["composers"] = masters.names_for("musicians", row.pop("composer_ids", None))
+            row["guestArtists"] = masters.names_for("musicians", row.pop("guest_artist_ids", None))
+        return results
     
-    async def get_most_played_studio_albums(self) -> List[dict]:
+    async def _build_most_played_studio_albums(self) -> List[dict]:
         pipeline = [
             # 1. Agrupación inicial rápida: Contar ejecuciones por ID de track
             {"$match": {"track_ids": {"$exists": True, "$not": {"$size": 0}}}},
@@ -140,10 +269,7 @@ class StatisticsConcertsRepository:
         cursor = self.db.concert_songs.aggregate(pipeline)
         return await cursor.to_list(length=None)
     
-    async def get_most_explored_studio_albums(self) -> List[dict]:
-        # 1. Obtener solo los IDs de tracks que han sonado en vivo (Desde la colección de conciertos)
-        played_track_ids = await self.db.concert_songs.distinct("track_ids")
-
+    async def _build_most_explored_studio_albums(self) -> List[dict]:
         pipeline = [
             # 1. Filtro de Álbum: Solo álbumes que no sean 'Live'
             {"$match": {"is_live": False}},
@@ -162,46 +288,13 @@ class StatisticsConcertsRepository:
                                 ]
                             }
                         }
-                    }
+                    },
+                    {"$project": {"_id": 0, "id": 1, "duration_seconds": 1}}
                 ],
                 "as": "studio_tracks"
             }},
 
-            # 3. Identificar cuáles de esos tracks de estudio han sonado en vivo
-            {"$addFields": {
-                "played_studio_songs": {
-                    "$filter": {
-                        "input": "$studio_tracks",
-                        "as": "st",
-                        "cond": {"$in": ["$$st.id", played_track_ids]}
-                    }
-                }
-            }},
-
-            # 4. Cálculos de métricas basados estrictamente en material de estudio
-            {"$addFields": {
-                "played_songs_count": {"$size": "$played_studio_songs"},
-                "total_tracks_count": {"$size": "$studio_tracks"},
-                "played_percentage": {
-                    "$cond": [
-                        {"$gt": [{"$size": "$studio_tracks"}, 0]},
-                        {"$multiply": [
-                            {"$divide": [{"$size": "$played_studio_songs"}, {"$size": "$studio_tracks"}]},
-                            100
-                        ]},
-                        0
-                    ]
-                }
-            }},
-
-            # 5. Ordenamiento: Prioridad Porcentaje -> Volumen -> Título
-            {"$sort": {
-                "played_percentage": -1, 
-                "played_songs_count": -1, 
-                "title": 1
-            }},
-
-            # 6. Proyección final con todas tus columnas
+            # 3. Proyección con los ids de estudio; cuáles sonaron en vivo se resuelve en memoria
             {"$project": {
                 "_id": 0,
                 "id": 1,
@@ -210,17 +303,42 @@ class StatisticsConcertsRepository:
                 "release_date": 1,
                 "cover": 1,
                 "is_live": 1,
-                "played_songs_count": 1, 
-                "total_tracks_count": 1,
-                "played_percentage": {"$round": ["$played_percentage", 2]},
+                "studio_track_ids": "$studio_tracks.id",
+                "total_tracks_count": {"$size": "$studio_tracks"},
                 "duration": {"$sum": "$studio_tracks.duration_seconds"}
             }}
         ]
 
-        cursor = self.db.albums.aggregate(pipeline)
-        return await cursor.to_list(length=None)
+        albums, sets = await asyncio.gather(
+            self.db.albums.aggregate(pipeline).to_list(length=None),
+            track_id_sets.ensure_fresh(self.db)
+        )
+
+        # 4. Métricas basadas estrictamente en material de estudio (intersección con los tracks tocados)
+        for album in albums:
+            played = int(sets.played.contains(album.pop("studio_track_ids", [])).sum())
+            total = album["total_tracks_count"]
+            album["played_songs_count"] = played
+            album["played_percentage"] = played / total * 100 if total > 0 else 0
+
+        # 5. Ordenamiento: Prioridad Porcentaje -> Volumen -> Título (null primero, como en Mongo)
+        albums.sort(key=lambda a: (-a["played_percentage"], -a["played_songs_count"],
+                                   a.get("title") is not None, a.get("title") or ""))
+
+        # 6. Proyección final con todas tus columnas
+        fields = ("id", "title", "release_year", "release_date", "cover", "is_live")
+        return [
+            {
+                **{field: album[field] for field in fields if field in album},
+                "played_songs_count": album["played_songs_count"],
+                "total_tracks_count": album["total_tracks_count"],
+                "played_percentage": round(album["played_percentage"], 2),
+                "duration": album.get("duration", 0)
+            }
+            for album in albums
+        ]
 
-    async def get_concerts_stats_by_year(self) -> List[dict]:
+    async def _build_concerts_stats_by_year(self) -> List[dict]:
         pipeline = [
             # 1. Agrupar conciertos por el campo concert_year directamente
             {"$group": {
@@ -264,7 +382,7 @@ class StatisticsConcertsRepository:
         return await cursor.to_list(length=None)
     
     
-    async def get_concert_counts_by_country(self) -> List[dict]:
+    async def _build_concert_counts_by_country(self) -> List[dict]:
         """
         Obtiene un listado de todos los países con su respectiva 
         cantidad de conciertos realizados.
@@ -276,37 +394,33 @@ class StatisticsConcertsRepository:
                 "count": {"$sum": 1}
             }},
 
-            # 2. Relacionar con la colección de países para obtener el nombre
-            {"$lookup": {
-                "from": "countries",
-                "localField": "_id",
-                "foreignField": "id",
-                "as": "country_info"
-            }},
-
-            # 3. Aplanar el array resultante del lookup
-            {"$unwind": "$country_info"},
-
-            # 4. Proyectar campos limpios para el DTO
+            # 2. Proyectar campos limpios para el DTO
             {"$project": {
                 "_id": 0,
                 "country_id": "$_id",
-                "country_name": "$country_info.name",
                 "concert_count": "$count"
-            }},
-
-            # 5. Ordenar por cantidad de conciertos (desc) y luego alfabéticamente
-            {"$sort": {
-                "concert_count": -1,
-                "country_name": 1
             }}
         ]
 
-        cursor = self.db.concerts.aggregate(pipeline)
-        return await cursor.to_list(length=None)
+        results, masters = await asyncio.gather(
+            self.db.concerts.aggregate(pipeline).to_list(length=None),
+            master_data.ensure_fresh(self.db)
+        )
+
+        # 3. Nombre del país en memoria (los países inexistentes se descartan, como con $unwind)
+        counts = []
+        for row in results:
+            country_name = masters.name("countries", row["country_id"])
+            if country_name is not None:
+                row["country_name"] = country_name
+                counts.append(row)
+
+        # 4. Ordenar por cantidad de conciertos (desc) y luego alfabéticamente
+        counts.sort(key=lambda r: (-r["concert_count"], r["country_name"]))
+        return counts
     
     
-    async def get_top_20_concert_opener_tracks(self) -> List[dict]:
+    async def _build_top_20_concert_opener_tracks(self) -> List[dict]:
         pipeline = [
             {"$match": {"song_number": 1}},
             {"$group": {
@@ -325,7 +439,7 @@ class StatisticsConcertsRepository:
                 "as": "all_performances"
             }},
             
-            # Joins de metadata (Tracks, Genres, Composers, Albums)
+            # Joins de metadata (Tracks, Albums); géneros y compositores con master_data
             {"$lookup": {
                 "from": "tracks",
                 "localField": "track_id",
@@ -334,18 +448,6 @@ class StatisticsConcertsRepository:
             }},
             {"$unwind": {"path": "$track_info", "preserveNullAndEmptyArrays": True}},
             
-            {"$lookup": {
-                "from": "genres",
-                "localField": "track_info.genre_ids",
-                "foreignField": "id",
-                "as": "genres_data"
-            }},
-            {"$lookup": {
-                "from": "composers",
-                "localField": "track_info.composer_ids",
-                "foreignField": "id",
-                "as": "composers_data"
-            }},
             {"$lookup": {
                 "from": "albums",
                 "localField": "track_info.album_id",
@@ -361,8 +463,8 @@ class StatisticsConcertsRepository:
                 "track_number": {"$ifNull": ["$track_info.track_number", 0]},
                 "duration": {"$ifNull": ["$track_info.duration", "00:00:00"]},
                 "duration_seconds": {"$ifNull": ["$track_info.duration_seconds", 0]},
-                "genres": {"$ifNull": ["$genres_data.name", []]}, 
-                "composers": {"$ifNull": ["$composers_data.name", []]},
+                "genre_ids": {"$ifNull": ["$track_info.genre_ids", []]},
+                "composer_ids": {"$ifNull": ["$track_info.composer_ids", []]},
                 "metadata": {"$ifNull": ["$track_info.metadata", {
                     "key": "N/A", "is_instrumental": False, "is_live": True, "is_love_song": False
                 }]},
@@ -375,10 +477,16 @@ class StatisticsConcertsRepository:
             }}
         ]
 
-        cursor = self.db.concert_songs.aggregate(pipeline)
-        return await cursor.to_list(length=20)
+        results, masters = await asyncio.gather(
+            self.db.concert_songs.aggregate(pipeline).to_list(length=20),
+            master_data.ensure_fresh(self.db)
+        )
+        for row in results:
+            row["genres"] = masters.names_for("genres", row.pop("genre_ids", None))
+            row["composers"] = masters.names_for("composers", row.pop("composer_ids", None))
+        return results
     
-    async def get_non_album_songs(self) -> List[dict]:
+    async def _build_non_album_songs(self) -> List[dict]:
         """
         Obtiene el listado de canciones que se han tocado en vivo 
         pero no existen en la colección de tracks/álbumes.
@@ -418,7 +526,7 @@ class StatisticsConcertsRepository:
         cursor = self.db.concert_songs.aggregate(pipeline)
         return await cursor.to_list(length=None)
     
-    async def get_geographic_conquest_milestones(self) -> List[dict]:
+    async def _build_geographic_conquest_milestones(self) -> List[dict]:
         pipeline = [
             # 1. Agrupamos por país para encontrar el año de la primera visita
             {"$group": {
@@ -462,18 +570,22 @@ class StatisticsConcertsRepository:
         cursor = self.db.concerts.aggregate(pipeline)
         return await cursor.to_list(length=None)
     
-    async def get_tracks_with_play_count_by_album(self, album_id: int) -> List[dict]:
+    async def _build_tracks_with_play_count_by_album(self, album_id: int) -> List[dict]:
+        if await self._has_play_stats():
+            # Conteo precalculado (una fila por track en track_play_stats)
+            lookup = {"from": "track_play_stats", "localField": "id", "foreignField": "track_id", "as": "play_stats"}
+            play_count = {"$ifNull": [{"$arrayElemAt": ["$play_stats.total_plays", 0]}, 0]}
+        else:
+            # Sin track_play_stats: apariciones directamente en concert_songs
+            lookup = {"from": "concert_songs", "localField": "id", "foreignField": "track_ids", "as": "performances"}
+            play_count = {"$size": "$performances"}
+
         pipeline = [
             # 1. Filtramos los tracks pertenecientes al álbum solicitado
             {"$match": {"album_id": album_id}},
 
-            # 2. Contamos las apariciones directamente en concert_songs
-            {"$lookup": {
-                "from": "concert_songs",
-                "localField": "id",
-                "foreignField": "track_ids",
-                "as": "performances"
-            }},
+            # 2. Conteo por track
+            {"$lookup": lookup},
 
             # 3. Proyección simplificada: solo datos del track y el conteo
             {"$project": {
@@ -483,7 +595,7 @@ class StatisticsConcertsRepository:
                 "duration": 1,
                 "duration_seconds": 1,
                 "album_id": 1,
-                "play_count": {"$size": "$performances"}
+                "play_count": play_count
             }},
 
             # 4. Ordenar por número de track para mantener el orden del disco
@@ -1,11 +1,24 @@
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.repositories.columnar_engine import columnar_engine, columnar_engine_enabled
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations(skip=("_engine",))
 class StatisticsDiscographyRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
 
+    async def _engine(self):
+        """Motor columnar en memoria, o None si se usan los pipelines de Mongo."""
+        if not columnar_engine_enabled():
+            return None
+        return await columnar_engine.ensure_fresh(self.db)
+
     async def get_instrumental_stats(self, match_query: dict, album_id: Optional[int]) -> List[dict]:
+        engine = await self._engine()
+        if engine and engine.supports_match(match_query):
+            return engine.instrumental_stats(match_query, album_id)
+
         pipeline = [
             {"$match": match_query},
             {"$group": {
@@ -28,6 +41,10 @@ class StatisticsDiscographyRepository:
         return await self.db.tracks.aggregate(pipeline).to_list(1)
 
     async def get_key_stats(self, match_query: dict, album_id: Optional[int]) -> List[dict]:
+        engine = await self._engine()
+        if engine and engine.supports_match(match_query):
+            return engine.key_stats(match_query, album_id)
+
         pipeline = [
                 {"$match": match_query},
                 {"$group": {"_id": {"aid": "$album_id", "k": "$metadata.key"}, "count": {"$sum": 1}}},
@@ -56,6 +73,10 @@ class StatisticsDiscographyRepository:
         return await self.db.tracks.aggregate(pipeline).to_list(None)
 
     async def get_love_song_stats(self) -> List[dict]:
+        engine = await self._engine()
+        if engine:
+            return engine.love_song_stats()
+
         pipeline = [
             {
                 "$group": {
@@ -84,6 +105,10 @@ class StatisticsDiscographyRepository:
         return await self.db.tracks.aggregate(pipeline).to_list(1)
 
     async def get_musical_genre_stats(self) -> List[dict]:
+        engine = await self._engine()
+        if engine:
+            return engine.musical_genre_stats()
+
         pipeline = [
             {"$unwind": "$genre_ids"},
             {
@@ -122,6 +147,10 @@ class StatisticsDiscographyRepository:
         return await self.db.tracks.aggregate(pipeline).to_list(None)
 
     async def get_guest_artists_report(self) -> List[dict]:
+        engine = await self._engine()
+        if engine:
+            return engine.guest_artists_report()
+
         pipeline = [
             {"$lookup": {"from": "albums", "localField": "album_id", "foreignField": "id", "as": "album_info"}},
             {"$unwind": "$album_info"},
@@ -170,6 +199,10 @@ class StatisticsDiscographyRepository:
         return await self.db.tracks.aggregate(pipeline).to_list(None)
     
     async def get_instrumental_tracks_by_year(self) -> List[dict]:
+        engine = await self._engine()
+        if engine:
+            return engine.instrumental_tracks_by_year()
+
         pipeline = [
             # 1. Filtramos solo tracks instrumentales
             {
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from datetime import datetime, timezone
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.database import get_data_version
+
+# Reconstrucciones en curso por (llave, versión) en este proceso: single-flight
+_building: Dict[Tuple[str, int], asyncio.Future] = {}
+
+class StatsSnapshotRepository:
+    """
+    Materializa resultados de estadísticas en la colección stats_snapshots.
+    Cada snapshot queda marcado con la versión de datos vigente; el loader de conciertos
+    los precalcula al subir la versión (StatisticsConcertsRepository.refresh_snapshots) y,
+    si falta alguno, el siguiente request lo reconstruye una sola vez aunque lleguen varios.
+    """
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    async def get_or_build(self, key: str, builder: Callable[[], Awaitable[Any]]) -> Any:
+        version = await get_data_version(self.db)
+
+        # 1. Lectura de un único documento si el snapshot está vigente
+        snapshot = await self.db.stats_snapshots.find_one(
+            {"_id": key, "data_version": version},
+            {"_id": 0, "data": 1}
+        )
+        if snapshot is not None:
+            return snapshot["data"]
+
+        # 2. Snapshot ausente u obsoleto: un solo pipeline por (llave, versión), los demás esperan
+        flight = (key, version)
+        task = _building.get(flight)
+        if task is None:
+            task = asyncio.ensure_future(self._build(key, version, builder))
+            _building[flight] = task
+            task.add_done_callback(lambda _: _building.pop(flight, None))
+        # shield: si un cliente cancela, la reconstrucción sigue para los demás
+        return await asyncio.shield(task)
+
+    async def _build(self, key: str, version: int, builder: Callable[[], Awaitable[Any]]) -> Any:
+        data = await builder()
+        await self.db.stats_snapshots.replace_one(
+            {"_id": key},
+            {
+                "data_version": version,
+                "built_at": datetime.now(timezone.utc),
+                "data": data
+            },
+            upsert=True
+        )
+        return data
+
+    async def purge_stale(self) -> int:
+        """Elimina los snapshots que no corresponden a la versión de datos actual."""
+        version = await get_data_version(self.db)
+        result = await self.db.stats_snapshots.delete_many({"data_version": {"$ne": version}})
+        return result.deleted_count
@@ -0,0 +1,142 @@
+from __future__ import annotations
+import asyncio
+import os
+import time
+from typing import Iterable, Optional
+from app.core.lazy import lazy_import
+
+# numpy se carga en el primer uso (no en el arranque de la API)
+np = lazy_import("numpy")
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.database import get_data_version
+from app.core.operation_labels import labelled_operations
+
+# Edad máxima de los conjuntos: los scripts de discografía (tracks) no incrementan la versión de datos
+TRACK_ID_SETS_MAX_AGE = float(os.getenv("TRACK_ID_SETS_MAX_AGE", "3600"))
+# Sobre este id la pertenencia se resuelve con searchsorted en lugar de un bitmap denso
+_BITMAP_MAX_ID = 1 << 24
+
+def _as_ids(values: Iterable) -> np.ndarray:
+    """Ids enteros como int64; lo que no es entero (None, ausente) queda en -1 y nunca pertenece."""
+    return np.fromiter(
+        (v if isinstance(v, int) and not isinstance(v, bool) and v >= 0 else -1 for v in values),
+        dtype=np.int64
+    )
+
+
+class IdSet:
+    """
+    Conjunto de ids enteros como arreglo ordenado sin duplicados.
+    La pertenencia usa un bitmap (ids densos y pequeños, como los de tracks), así
+    diferencia e intersección con otro conjunto son O(n) sin enviar listas a Mongo.
+    """
+    __slots__ = ("ids", "_bitmap")
+
+    def __init__(self, ids: Optional[np.ndarray] = None):
+        self.ids = np.empty(0, dtype=np.int64) if ids is None else ids
+        self._bitmap = None
+        if self.ids.size and self.ids[-1] < _BITMAP_MAX_ID:
+            self._bitmap = np.zeros(int(self.ids[-1]) + 1, dtype=bool)
+            self._bitmap[self.ids] = True
+
+    @classmethod
+    def from_values(cls, values: Iterable) -> "IdSet":
+        ids = _as_ids(values)
+        return cls(np.unique(ids[ids >= 0]))
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    def contains(self, values) -> np.ndarray:
+        """Máscara booleana: qué valores pertenecen al conjunto."""
+        values = values if isinstance(values, np.ndarray) else _as_ids(values)
+        if self.ids.size == 0 or values.size == 0:
+            return np.zeros(values.shape, dtype=bool)
+        if self._bitmap is not None:
+            inside = (values >= 0) & (values < self._bitmap.size)
+            mask = np.zeros(values.shape, dtype=bool)
+            mask[inside] = self._bitmap[values[inside]]
+            return mask
+        pos = np.clip(np.searchsorted(self.ids, values), 0, self.ids.size - 1)
+        return self.ids[pos] == values
+
+    def difference(self, other: "IdSet") -> "IdSet":
+        return IdSet(self.ids[~other.contains(self.ids)])
+
+    def intersection(self, other: "IdSet") -> "IdSet":
+        return IdSet(self.ids[other.contains(self.ids)])
+
+
+@labelled_operations()
+class TrackIdSets:
+    """
+    Conjuntos de ids de tracks que antes viajaban a Mongo como listas $in/$nin:
+      - played: tracks que sonaron en vivo (concert_songs.track_ids),
+      - album_linked: tracks con album_id,
+      - studio: tracks con metadata.is_live == False.
+    Se recargan cuando cambia la versión de datos o vence TRACK_ID_SETS_MAX_AGE.
+    """
+
+    def __init__(self, max_age: float = TRACK_ID_SETS_MAX_AGE):
+        self.max_age = max_age
+        self.played = IdSet()
+        self.album_linked = IdSet()
+        self.studio = IdSet()
+        # Tracks de estudio sin id entero: nunca coinciden con concert_songs.track_ids
+        self.studio_without_id = 0
+        self.version: Optional[int] = None
+        self.loaded_at = 0.0
+        self.load_ms: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, db: AsyncIOMotorDatabase) -> "TrackIdSets":
+        version = await get_data_version(db)
+        if self._is_fresh(version):
+            return self
+
+        async with self._lock:
+            # Otro request pudo haber recargado mientras esperábamos el lock
+            if not self._is_fresh(version):
+                await self.load(db, version)
+        return self
+
+    def _is_fresh(self, version: int) -> bool:
+        return self.version == version and (time.monotonic() - self.loaded_at) < self.max_age
+
+    def invalidate(self) -> None:
+        self.version = None
+
+    async def load(self, db: AsyncIOMotorDatabase, version: int) -> None:
+        started = time.perf_counter()
+        # $group en el servidor y lectura por cursor: sin el límite de 16 MB de distinct()
+        played_cursor = db.concert_songs.aggregate([
+            {"$unwind": "$track_ids"},
+            {"$group": {"_id": "$track_ids"}}
+        ])
+        played, tracks = await asyncio.gather(
+            played_cursor.to_list(length=None),
+            db.tracks.find({}, {"_id": 0, "id": 1, "album_id": 1, "metadata.is_live": 1}).to_list(length=None)
+        )
+
+        self.played = IdSet.from_values(row["_id"] for row in played)
+        self.album_linked = IdSet.from_values(t.get("id") for t in tracks if t.get("album_id") is not None)
+        studio_ids = _as_ids(t.get("id") for t in tracks if (t.get("metadata") or {}).get("is_live", None) is False)
+        self.studio = IdSet(np.unique(studio_ids[studio_ids >= 0]))
+        self.studio_without_id = int((studio_ids < 0).sum())
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def stats(self) -> dict:
+        return {
+            "played": len(self.played),
+            "album_linked": len(self.album_linked),
+            "studio": len(self.studio),
+            "studio_without_id": self.studio_without_id,
+            "data_version": self.version,
+            "load_ms": self.load_ms,
+            "max_age": self.max_age
+        }
+
+# Instancia compartida por el proceso
+track_id_sets = TrackIdSets()
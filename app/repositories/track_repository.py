@@ -1,10 +1,28 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List, Optional
+import asyncio
+from app.repositories.master_data_registry import master_data
+from app.core.operation_labels import labelled_operations
 
+@labelled_operations(skip=("_resolve_names",))
 class TrackRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
 
+    async def _resolve_names(self, pipeline: list, length: Optional[int] = None, **fields) -> List[dict]:
+        """
+        Ejecuta el pipeline y reemplaza las listas de ids por nombres con master_data.
+        fields: campo_destino=(campo_ids, colección)
+        """
+        results, masters = await asyncio.gather(
+            self.db.tracks.aggregate(pipeline).to_list(length=length),
+            master_data.ensure_fresh(self.db)
+        )
+        for doc in results:
+            for target, (ids_field, collection) in fields.items():
+                doc[target] = masters.names_for(collection, doc.pop(ids_field, None))
+        return results
+
     async def get_genre_by_id(self, genre_id: int):
         return await self.db.genres.find_one({"id": genre_id})
 
@@ -20,9 +38,7 @@ class TrackRepository:
                         }
                     },
                     {"$unwind": {"path": "$album_info", "preserveNullAndEmptyArrays": True}},
-                    {"$lookup": {"from": "genres", "localField": "genre_ids", "foreignField": "id", "as": "genres_info"}},
-                    {"$lookup": {"from": "composers", "localField": "composer_ids", "foreignField": "id", "as": "composers_info"}},
-                    {"$lookup": {"from": "guests", "localField": "guest_ids", "foreignField": "id", "as": "guests_info"}},
+                    # Géneros, compositores e invitados se resuelven con master_data
                     {
                         "$project": {
                             "_id": 0,
@@ -32,15 +48,21 @@ class TrackRepository:
                             "duration_seconds": 1,
                             "album": {"$ifNull": ["$album_info.title", "Unknown Album"]},
                             "year": {"$ifNull": ["$album_info.release_year", 0]},
-                            "genres": "$genres_info.name",
-                            "composers": "$composers_info.full_name",
-                            "guest_artists": {"$ifNull": ["$guests_info.full_name", []]},
+                            "genre_ids": 1,
+                            "composer_ids": 1,
+                            "guest_ids": 1,
                             "metadata": 1 
                         }
                     }
                 ]
         
-        return await self.db.tracks.aggregate(pipeline).to_list(length=100)
+        return await self._resolve_names(
+            pipeline,
+            length=100,
+            genres=("genre_ids", "genres"),
+            composers=("composer_ids", "composers"),
+            guest_artists=("guest_ids", "guests")
+        )
 
     async def get_by_guest_artists_range(self, start_year: int, end_year: int):
         pipeline = [
@@ -61,9 +83,7 @@ class TrackRepository:
                     },
                     {"$unwind": {"path": "$album_info", "preserveNullAndEmptyArrays": True}},
                     
-                    {"$lookup": {"from": "genres", "localField": "genre_ids", "foreignField": "id", "as": "genres_info"}},
-                    {"$lookup": {"from": "composers", "localField": "composer_ids", "foreignField": "id", "as": "composers_info"}},
-                    {"$lookup": {"from": "collaborators", "localField": "guest_artist_ids", "foreignField": "id", "as": "guests_info"}},
+                    # Géneros, compositores e invitados se resuelven con master_data
 
                     # 3. Filtro por año (ahora que tenemos album_info)
                     {
@@ -86,14 +106,19 @@ class TrackRepository:
                             "album_release_date": "$album_info.release_date",
                             "album_cover": "$album_info.cover",
                             "metadata": 1,
-                            "genres": "$genres_info.name", 
-                            "composers": "$composers_info.full_name",
-                            "guestArtists": "$guests_info.full_name" # O el campo donde guardes el nombre del invitado
+                            "genre_ids": 1,
+                            "composer_ids": 1,
+                            "guest_artist_ids": 1
                         }
                     },
                     {"$sort": {"album_release_year": 1}}
                 ]
-        return await self.db.tracks.aggregate(pipeline).to_list(length=None)
+        return await self._resolve_names(
+            pipeline,
+            genres=("genre_ids", "genres"),
+            composers=("composer_ids", "composers"),
+            guestArtists=("guest_artist_ids", "collaborators")
+        )
 
     async def get_by_top_duration(
             self, 
@@ -274,17 +299,7 @@ class TrackRepository:
             },
             {"$unwind": "$album_info"},
             
-            # 3. Join con la colección de composers para obtener los nombres
-            {
-                "$lookup": {
-                    "from": "composers",
-                    "localField": "composer_ids",
-                    "foreignField": "id",
-                    "as": "composers_details"
-                }
-            },
-            
-            # 4. Proyección final (formateo de salida)
+            # 3. Proyección final (los nombres de compositores se resuelven con master_data)
             {
                 "$project": {
                     "_id": 0,
@@ -297,12 +312,11 @@ class TrackRepository:
                     "album_release_year": "$album_info.release_year",
                     "album_release_date": "$album_info.release_date",
                     "album_cover": "$album_info.cover",
-                    # Retorna la lista de nombres como strings: ["Name 1", "Name 2"]
-                    "composers": "$composers_details.full_name",
+                    "composer_ids": 1,
                     "lead_vocal_ids": 1
                 }
             },
-            # 5. Ordenamos por año (descendente) y número de track
+            # 4. Ordenamos por año (descendente) y número de track
             {
                 "$sort": {
                     "album_release_year": -1,
@@ -311,5 +325,5 @@ class TrackRepository:
             }
         ]
 
-        cursor = self.db.tracks.aggregate(pipeline)
-        return await cursor.to_list(length=None)
\ No newline at end of file
+        # Retorna la lista de nombres como strings: ["Name 1", "Name 2"]
+        return await self._resolve_names(pipeline, composers=("composer_ids", "composers"))
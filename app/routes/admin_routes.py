@@ -0,0 +1,95 @@
+from fastapi import APIRouter, Depends
+from app.core.container import ServiceContainer, get_container
+from app.core.cache import executive_summary_cache
+from app.core.slow_queries import SLOW_QUERY_COLLECTION, slow_query_log
+from app.core.security import validate_admin_token
+from app.database import db_instance, get_db
+from app.repositories.master_data_registry import master_data
+from app.repositories.search_index import search_index
+from app.repositories.setlist_graph import setlist_graph
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(validate_admin_token)])
+
+@router.get("/cache/executive-summary")
+async def get_executive_summary_cache_stats():
+    """
+    Contadores de hits/misses de la caché de resúmenes ejecutivos para dimensionarla.
+    """
+    return executive_summary_cache.stats()
+
+@router.post("/cache/executive-summary/invalidate")
+async def invalidate_executive_summary_cache():
+    removed = executive_summary_cache.invalidate()
+    return {"invalidated": removed, **executive_summary_cache.stats()}
+
+@router.get("/services")
+async def get_service_container_stats(container: ServiceContainer = Depends(get_container)):
+    """
+    Servicios instanciados en el contenedor de la aplicación y cuántas veces se resolvieron.
+    """
+    return container.stats()
+
+@router.get("/mongo-pool")
+async def get_mongo_pool_stats():
+    """
+    Configuración efectiva del cliente de Mongo y saturación del pool de conexiones por servidor.
+    """
+    settings = db_instance.settings
+    return {
+        "settings": settings.public() if settings else None,
+        "pool": db_instance.pool_metrics.stats() if db_instance.pool_metrics else None
+    }
+
+@router.post("/mongo-pool/reset-peaks")
+async def reset_mongo_pool_peaks():
+    if db_instance.pool_metrics:
+        db_instance.pool_metrics.reset_peaks()
+    return await get_mongo_pool_stats()
+
+@router.get("/master-data")
+async def get_master_data_stats():
+    """
+    Tamaño y antigüedad de los diccionarios de maestros en memoria.
+    """
+    return master_data.stats()
+
+@router.post("/master-data/refresh")
+async def refresh_master_data(db=Depends(get_db)):
+    await master_data.load(db)
+    return master_data.stats()
+
+@router.get("/search-index")
+async def get_search_index_stats():
+    """
+    Documentos, términos y versión de datos del índice de búsqueda en memoria.
+    """
+    return search_index.stats()
+
+@router.post("/search-index/refresh")
+async def refresh_search_index(db=Depends(get_db)):
+    await search_index.build(db)
+    return search_index.stats()
+
+@router.get("/setlist-graph")
+async def get_setlist_graph_stats():
+    """
+    Nodos, celdas no nulas y versión de datos de las matrices de transiciones y co-ocurrencia de setlists.
+    """
+    return setlist_graph.stats()
+
+@router.post("/setlist-graph/refresh")
+async def refresh_setlist_graph(db=Depends(get_db)):
+    setlist_graph.invalidate()
+    await setlist_graph.ensure_fresh(db)
+    return setlist_graph.stats()
+
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = 20, db=Depends(get_db)):
+    """
+    Estado del slow-query log (SLOW_QUERY_LOG=true) y las últimas consultas lentas registradas.
+    Para el ranking de los peores: python -m scripts.maintenance.slow_queries_report
+    """
+    recent = await db[SLOW_QUERY_COLLECTION].find(
+        {}, {"_id": 0, "query": 0, "summary.stages": 0, "summary.plan": 0}
+    ).sort("$natural", -1).limit(max(1, min(limit, 200))).to_list(length=None)
+    return {"log": slow_query_log.stats(), "recent": recent}
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from datetime import datetime
 from app.services.concert_service import ConcertService
 from app.dtos.concert_dto import ConcertDto, ConcertWithSetlistDto
-from app.dtos.concert_song_dto import ConcertSongDto
+from app.dtos.concert_song_dto import ConcertSongDto, ConcertSetlistDto
 from app.dtos.paginated_response import PaginatedResponse
 from app.core.dependencies import get_concert_service
+from app.core.fast_json import json_response
 
 router = APIRouter(prefix="/concerts", tags=["Concerts"])
 
@@ -27,13 +29,17 @@ async def get_concerts(
     state_id: Optional[int] = Query(None, alias="stateId"),
     country_id: Optional[int] = Query(None, alias="countryId"),
     continent_id: Optional[int] = Query(None, alias="continentId"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page (keyset pagination)"),
+    include_total: bool = Query(True, alias="includeTotal"),
     service: ConcertService = Depends(get_concert_service)
 ):
     """
     Get a list of concerts filtered by a date range (max 1 year) 
     and optional geographical or tour parameters.
+    Pass the returned nextCursor as `cursor` to fetch the next page at constant cost;
+    includeTotal=false skips the total count.
     """
-    return await service.get_by_filter(
+    result = await service.get_by_filter(
         start_date,
         end_date,
         page,
@@ -44,8 +50,47 @@ async def get_concerts(
         city_id,
         state_id,
         country_id,
+        continent_id,
+        cursor,
+        include_total
+    )
+    return json_response(result, PaginatedResponse[ConcertDto])
+
+@router.get(
+    "/stream",
+    status_code=status.HTTP_200_OK
+)
+async def stream_concerts(
+    start_date: datetime = Query(datetime(1966, 1, 1), description="Start date (YYYY-MM-DD)", alias="startDate"),
+    end_date: Optional[datetime] = Query(None, description="End date (YYYY-MM-DD), defaults to today", alias="endDate"),
+    output_format: str = Query("ndjson", pattern="^(ndjson|json)$", alias="format"),
+    concert_type_id: Optional[int] = Query(None, alias="concertTypeId"),
+    venue_type_id: Optional[int] = Query(None, alias="venueTypeId"),
+    tour_id: Optional[int] = Query(None, alias="tourId"),
+    city_id: Optional[int] = Query(None, alias="cityId"),
+    state_id: Optional[int] = Query(None, alias="stateId"),
+    country_id: Optional[int] = Query(None, alias="countryId"),
+    continent_id: Optional[int] = Query(None, alias="continentId"),
+    service: ConcertService = Depends(get_concert_service)
+):
+    """
+    Stream the whole filtered concert catalog (no 1-year limit) in chronological order,
+    as NDJSON (one concert per line) or as a chunked JSON array.
+    """
+    body = await service.stream_by_filter(
+        start_date,
+        end_date or datetime.now(),
+        output_format,
+        concert_type_id,
+        venue_type_id,
+        tour_id,
+        city_id,
+        state_id,
+        country_id,
         continent_id
     )
+    media_type = "application/x-ndjson" if output_format == "ndjson" else "application/json"
+    return StreamingResponse(body, media_type=media_type)
 
 @router.get(
     "/get-by-date", 
@@ -73,6 +118,27 @@ async def get_concert_setlist(
 ):
     return await service.get_concert_setlist(concertId)
 
+@router.get(
+    "/setlists",
+    response_model=List[ConcertSetlistDto],
+    response_model_by_alias=True,
+    status_code=status.HTTP_200_OK
+)
+async def get_concert_setlists(
+    ids: str = Query(..., description="Comma-separated concert IDs (max 100)", examples=["1,2,3"]),
+    service: ConcertService = Depends(get_concert_service)
+):
+    """
+    Setlists of several concerts in a single round trip.
+    """
+    try:
+        concert_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not concert_ids or len(concert_ids) > 100:
+        raise HTTPException(status_code=400, detail="Between 1 and 100 concert ids are required")
+    return await service.get_concert_setlists(concert_ids)
+
 @router.get(
     "/get-concert-details-by-date", 
     response_model=List[ConcertWithSetlistDto],
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import authorized, registry
+
+# Fuera de /api/v1: Prometheus hace scrape con su propio token (METRICS_TOKEN), no con X-Santana-App-Token
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str = Header(None)):
+    if not authorized(authorization):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from app.services.search_service import SearchService
+from app.dtos.search_dto import SearchResponseDto
+from app.core.dependencies import get_search_service
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+@router.get(
+    "/",
+    response_model=SearchResponseDto,
+    response_model_by_alias=True
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=100, description="Words or word prefixes (accent-insensitive)"),
+    types: Optional[str] = Query(None, description="Comma-separated: track,album,venue,musician (default: all)"),
+    limit: int = Query(20, ge=1, le=100),
+    service: SearchService = Depends(get_search_service)
+):
+    """
+    Ranked search over tracks, albums, venues and musicians.
+    Every word must match a whole word or the start of one ("black mag" finds "Black Magic Woman");
+    exact words rank above prefixes and names starting with the query rank first.
+    """
+    return await service.search(q, types, limit)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
+from app.core.fast_json import json_response
 from typing import List, Optional
 from app.services.statistics_discography_service import StatisticsDiscographyService
 from app.dtos.statistics.discography.executive_summary_dto import DiscographyExecutiveSummaryDto
@@ -19,6 +20,7 @@ from app.dtos.album_dto import AlbumForConcertDto
 from app.dtos.statistics.concerts.concert_year_dto import ConcertYearDto
 from app.dtos.statistics.concerts.concert_country_dto import ConcertCountryDto
 from app.dtos.statistics.concerts.conquest_milestone_dto import ConquestMilestoneDto
+from app.dtos.statistics.concerts.setlist_graph_dto import SongTransitionDto, SongCoOccurrenceDto
 
 router = APIRouter(prefix="/statistics", tags=["Statistics"])
 
@@ -125,7 +127,7 @@ async def get_executive_summary(
 async def get_top_20_most_played_songs(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_top_20_most_played_songs()
+    return json_response(await service.get_top_20_most_played_songs(), List[TrackWithAlbumDetailsForConcertDto])
 
 @router.get(
     "/concerts/get-most-played-albums", 
@@ -135,7 +137,7 @@ async def get_top_20_most_played_songs(
 async def get_most_played_studio_albums(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_most_played_studio_albums()
+    return json_response(await service.get_most_played_studio_albums(), List[AlbumForConcertDto])
 
 @router.get(
     "/concerts/get-most-explored-albums", 
@@ -145,7 +147,7 @@ async def get_most_played_studio_albums(
 async def get_most_explored_studio_albums(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_most_explored_studio_albums()
+    return json_response(await service.get_most_explored_studio_albums(), List[AlbumForConcertDto])
 
 @router.get(
     "/concerts/get-concerts-stats-by-year", 
@@ -155,7 +157,7 @@ async def get_most_explored_studio_albums(
 async def get_concerts_stats_by_year(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_concerts_stats_by_year()
+    return json_response(await service.get_concerts_stats_by_year(), List[ConcertYearDto])
 
 @router.get(
     "/concerts/get-concert-counts-by-country", 
@@ -165,7 +167,7 @@ async def get_concerts_stats_by_year(
 async def get_concert_counts_by_country(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_concert_counts_by_country()
+    return json_response(await service.get_concert_counts_by_country(), List[ConcertCountryDto])
 
 @router.get(
     "/concerts/get-top-20-concert-opener-tracks", 
@@ -175,7 +177,7 @@ async def get_concert_counts_by_country(
 async def get_top_20_concert_opener_tracks(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_top_20_concert_opener_tracks()
+    return json_response(await service.get_top_20_concert_opener_tracks(), List[TrackWithAlbumDetailsForConcertDto])
 
 @router.get(
     "/concerts/get-non-album-songs", 
@@ -185,7 +187,7 @@ async def get_top_20_concert_opener_tracks(
 async def get_non_album_songs(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_non_album_songs()
+    return json_response(await service.get_non_album_songs(), List[NonAlbumTrackDto])
 
 @router.get(
     "/concerts/get-geographic-conquest-milestones", 
@@ -195,7 +197,7 @@ async def get_non_album_songs(
 async def get_geographic_conquest_milestones(
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_geographic_conquest_milestones()
+    return json_response(await service.get_geographic_conquest_milestones(), List[ConquestMilestoneDto])
 
 @router.get(
     "/concerts/get-tracks-with-play-count-by-album", 
@@ -206,4 +208,60 @@ async def get_tracks_with_play_count_by_album(
     albumId: int = Query(None),
     service: StatisticsConcertsService = Depends(get_stats_concerts_service)
 ):
-    return await service.get_tracks_with_play_count_by_album(albumId)
\ No newline at end of file
+    return json_response(await service.get_tracks_with_play_count_by_album(albumId), List[TrackForConcertDto])
+
+@router.get(
+    "/concerts/get-setlist-transitions", 
+    response_model=List[SongTransitionDto],
+    response_model_by_alias=True
+)
+async def get_setlist_transitions(
+    song: Optional[str] = Query(None, description="Song name as played (accents and case are ignored)"),
+    trackId: Optional[int] = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    service: StatisticsConcertsService = Depends(get_stats_concerts_service)
+):
+    """
+    Next-song transition probabilities: which songs were played right after the given one.
+    """
+    if song is None and trackId is None:
+        raise HTTPException(status_code=400, detail="Provide song or trackId")
+    data = await service.get_setlist_transitions(song, trackId, limit)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Song not found in any setlist")
+    return json_response(data, List[SongTransitionDto])
+
+@router.get(
+    "/concerts/get-top-segues", 
+    response_model=List[SongTransitionDto],
+    response_model_by_alias=True
+)
+async def get_top_segues(
+    limit: int = Query(20, ge=1, le=200),
+    minCount: int = Query(1, ge=1),
+    service: StatisticsConcertsService = Depends(get_stats_concerts_service)
+):
+    """
+    Most common consecutive song pairs across all setlists (e.g. Black Magic Woman -> Oye Como Va).
+    """
+    return json_response(await service.get_top_segues(limit, minCount), List[SongTransitionDto])
+
+@router.get(
+    "/concerts/get-song-co-occurrence", 
+    response_model=List[SongCoOccurrenceDto],
+    response_model_by_alias=True
+)
+async def get_song_co_occurrence(
+    song: Optional[str] = Query(None, description="Only pairs that include this song"),
+    trackId: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    minConcerts: int = Query(5, ge=1, description="Minimum concerts shared by both songs"),
+    service: StatisticsConcertsService = Depends(get_stats_concerts_service)
+):
+    """
+    Song pairs played in the same concert, ranked by lift (how much more often than by chance).
+    """
+    data = await service.get_song_co_occurrence(song, trackId, limit, minConcerts)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Song not found in any setlist")
+    return json_response(data, List[SongCoOccurrenceDto])
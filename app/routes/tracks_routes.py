@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Query
+from app.core.fast_json import json_response
 from app.services.track_service import TrackService
 from app.dtos.track_dto import TrackDto, GenreFilterDto, TrackWithAlbumDetailsDto
 from typing import List, Optional
@@ -19,7 +20,7 @@ async def get_by_album(
     Obtiene la lista de canciones, opcionalmente filtradas por álbum.
     Incluye metadatos (tonalidad, instrumental, etc.) en camelCase.
     """
-    return await service.get_by_album(album_id)
+    return json_response(await service.get_by_album(album_id), List[TrackDto])
 
 @router.get(
     "/genre/{genre_id}", 
@@ -33,7 +34,7 @@ async def get_by_genre(
     """
     Obtiene todas las canciones de un género específico.
     """
-    return await service.get_by_genre(genre_id)
+    return json_response(await service.get_by_genre(genre_id), GenreFilterDto)
 
 @router.get(
     "/by-guest-artists-range", 
@@ -48,7 +49,7 @@ async def get_by_guest_artists_range(
     """
     Filtra colaboraciones por un rango de años (ej. 1970 a 1980).
     """
-    return await service.get_by_guest_artists_range(start, end)
+    return json_response(await service.get_by_guest_artists_range(start, end), List[TrackWithAlbumDetailsDto])
 
 @router.get(
     "/by-top-duration", 
@@ -60,7 +61,7 @@ async def get_by_top_duration(
     isLive: bool | None = Query(None), 
     service: TrackService = Depends(get_track_service)
 ):
-    return await service.get_by_top_duration(isLive, sort)
+    return json_response(await service.get_by_top_duration(isLive, sort), List[TrackWithAlbumDetailsDto])
 
 @router.get(
     "/by-lead-vocal", 
@@ -71,7 +72,7 @@ async def get_by_lead_vocal(
     musicianId: int = Query(0), 
     service: TrackService = Depends(get_track_service)
 ):
-    return await service.get_by_lead_vocal(musicianId)
+    return json_response(await service.get_by_lead_vocal(musicianId), List[TrackWithAlbumDetailsDto])
 
 @router.get(
     "/by-live-in-studio-albums", 
@@ -81,7 +82,7 @@ async def get_by_lead_vocal(
 async def get_by_live_in_studio_albums(
     service: TrackService = Depends(get_track_service)
 ):
-    return await service.get_by_live_in_studio_albums()
+    return json_response(await service.get_by_live_in_studio_albums(), List[TrackWithAlbumDetailsDto])
 
 @router.get(
     "/by-composer", 
@@ -92,4 +93,4 @@ async def get_by_composer_id(
     composerId: int = Query(0), 
     service: TrackService = Depends(get_track_service)
 ):
-    return await service.get_by_composer_id(composerId)
\ No newline at end of file
+    return json_response(await service.get_by_composer_id(composerId), List[TrackWithAlbumDetailsDto])
\ No newline at end of file
@@ -0,0 +1,136 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+# Incrementar SCHEMA_VERSION cada vez que cambie INDEXES: el arranque solo compara este número
+# con el documento schema_meta y los índices se aplican con scripts/migrations/apply_schema.py.
+SCHEMA_VERSION = 4
+SCHEMA_META_ID = "indexes"
+# Por defecto el arranque solo avisa si la base está desactualizada: los índices (incluidos los de texto)
+# se crean con scripts/migrations/apply_schema.py fuera del cold start. true = intentar aplicarlos una vez.
+SCHEMA_AUTO_APPLY = os.getenv("SCHEMA_AUTO_APPLY", "false").strip().lower() in ("1", "true", "yes")
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "concert_songs": [
+        IndexModel([("track_ids", ASCENDING)]),
+        IndexModel([("song_number", ASCENDING), ("song_name", ASCENDING)]),
+        # Setlists (get_concert_setlist / get_concert_setlists) y borrado por concierto en el loader
+        IndexModel([("concert_id", ASCENDING), ("song_number", ASCENDING)]),
+        # Agrupaciones y búsquedas por nombre de canción (aperturas, canciones sin álbum)
+        IndexModel([("song_name", ASCENDING)]),
+    ],
+    "concerts": [
+        IndexModel([("id", ASCENDING)]),
+        IndexModel([("concert_year", DESCENDING)]),
+        IndexModel([("concert_date", ASCENDING)]),
+        # Orden de get_by_filter y paginación por cursor (keyset)
+        IndexModel([("concert_date", DESCENDING), ("id", DESCENDING)]),
+        # Filtros de get_by_filter: igualdad + rango/orden por fecha
+        IndexModel([("country_id", ASCENDING), ("concert_date", DESCENDING)]),
+        IndexModel([("city_id", ASCENDING), ("concert_date", DESCENDING)]),
+        IndexModel([("tour_id", ASCENDING), ("concert_date", DESCENDING)]),
+        IndexModel([("concert_type_id", ASCENDING), ("concert_date", DESCENDING)]),
+        # Backend SEARCH_BACKEND=mongo de /search (los índices de texto ignoran acentos)
+        IndexModel([("venue_name", TEXT)], default_language="none"),
+    ],
+    "tracks": [
+        IndexModel([("id", ASCENDING)]),
+        IndexModel([("metadata.is_live", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("album_id", ASCENDING)]),
+        # Para _get_top_lead_singer y _get_general_track_stats
+        IndexModel([("lead_vocal_ids", ASCENDING)]),
+        # Para get_total_guest_artists
+        IndexModel([("guest_artist_ids", ASCENDING)]),
+        # Para get_total_by_composer
+        IndexModel([("composer_ids", ASCENDING)]),
+        IndexModel([("genre_ids", ASCENDING)]),
+        IndexModel([("title", TEXT)], default_language="none"),
+    ],
+    "albums": [
+        IndexModel([("id", ASCENDING)]),
+        IndexModel([("title", TEXT)], default_language="none"),
+    ],
+    "musicians": [
+        # El apodo se guarda como "apelativo" (alias de MusicianSchema.nickname)
+        IndexModel([("first_name", TEXT), ("last_name", TEXT), ("apelativo", TEXT)], default_language="none"),
+    ],
+    "track_play_stats": [
+        # Una fila por track; top-20 ordena por total_plays
+        IndexModel([("track_id", ASCENDING)], unique=True),
+        IndexModel([("total_plays", DESCENDING)]),
+    ],
+    "track_title_aliases": [
+        # Alias de títulos del loader de conciertos (scripts/common/title_matching.py)
+        IndexModel([("alias", ASCENDING)], unique=True),
+    ],
+    "stats_snapshots": [
+        # Para purgar snapshots de versiones anteriores
+        IndexModel([("data_version", ASCENDING)]),
+    ],
+}
+
+# Índices reemplazados por el registro: se eliminan antes de crear los nuevos
+# (una colección admite un solo índice de texto)
+DROPPED_INDEXES: Dict[str, List[str]] = {
+    "musicians": ["first_name_text_last_name_text_nickname_text"],
+}
+
+async def get_schema_version(db) -> int:
+    meta = await db.schema_meta.find_one({"_id": SCHEMA_META_ID}, {"version": 1})
+    return meta["version"] if meta else 0
+
+async def apply_schema(db) -> Dict[str, List[str]]:
+    """
+    Crea los índices del registro (un create_indexes por colección) y registra la versión en schema_meta.
+    create_indexes es idempotente: los índices que ya existen no se reconstruyen.
+    """
+    for collection, names in DROPPED_INDEXES.items():
+        existing = {info["name"] for info in await db[collection].list_indexes().to_list(length=None)}
+        for name in names:
+            if name in existing:
+                await db[collection].drop_index(name)
+
+    created = {}
+    for collection, models in INDEXES.items():
+        created[collection] = await db[collection].create_indexes(models)
+
+    await db.schema_meta.replace_one(
+        {"_id": SCHEMA_META_ID},
+        {"version": SCHEMA_VERSION, "applied_at": datetime.utcnow(), "indexes": created},
+        upsert=True
+    )
+    return created
+
+async def ensure_schema(db, auto_apply: Optional[bool] = None) -> int:
+    """
+    Chequeo de arranque: una sola lectura de schema_meta.
+    Si la versión guardada es menor a SCHEMA_VERSION se avisa; con SCHEMA_AUTO_APPLY se aplican
+    los índices, con un solo intento por versión (si falla, los arranques siguientes solo avisan).
+    """
+    auto_apply = SCHEMA_AUTO_APPLY if auto_apply is None else auto_apply
+    meta = await db.schema_meta.find_one({"_id": SCHEMA_META_ID}, {"version": 1, "failed_version": 1}) or {}
+    version = meta.get("version", 0)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    if not auto_apply or meta.get("failed_version") == SCHEMA_VERSION:
+        print(f"⚠️ Esquema de índices v{version} < v{SCHEMA_VERSION}. Ejecuta: python -m scripts.migrations.apply_schema --apply")
+        return version
+
+    print(f"Applying index schema v{SCHEMA_VERSION} (was v{version})...")
+    try:
+        await apply_schema(db)
+        print("✅ All indexes ensured successfully.")
+        return SCHEMA_VERSION
+    except Exception as e:
+        print(f"❌ Error creating indexes: {e}")
+        try:
+            await db.schema_meta.update_one(
+                {"_id": SCHEMA_META_ID},
+                {"$set": {"failed_version": SCHEMA_VERSION, "failed_at": datetime.utcnow(), "error": str(e)}},
+                upsert=True
+            )
+        except Exception:
+            pass
+        return version
@@ -1,9 +1,11 @@
-from typing import Optional, List
+from fastapi import HTTPException
+from typing import Optional, List, AsyncIterator
 from datetime import datetime
 from app.repositories.concert_repository import ConcertRepository
 from app.dtos.concert_dto import ConcertDto, ConcertWithSetlistDto
-from app.dtos.concert_song_dto import ConcertSongDto
+from app.dtos.concert_song_dto import ConcertSongDto, ConcertSetlistDto
 from app.dtos.paginated_response import PaginatedResponse
+from app.core.fast_json import validate_list
 
 class ConcertService:
     def __init__(self, repository: ConcertRepository):
@@ -21,15 +23,65 @@ class ConcertService:
         city_id: Optional[int] = None,
         state_id: Optional[int] = None,
         country_id: Optional[int] = None,
-        continent_id: Optional[int] = None
+        continent_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> PaginatedResponse[ConcertDto]:
-        # La validación del rango de 1 año ya está en el repositorio, 
+        # La validación del rango de 1 año (y del cursor) ya está en el repositorio, 
         # pero la capturamos aquí para lanzar la excepción HTTP correcta.
-        repo_response = await self.repo.get_by_filter(
+        try:
+            repo_response = await self.repo.get_by_filter(
+                start_date,
+                end_date,
+                page,
+                page_size,
+                concert_type_id,
+                venue_type_id,
+                tour_id,
+                city_id,
+                state_id,
+                country_id,
+                continent_id,
+                cursor,
+                include_total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        concerts_dtos = validate_list(ConcertDto, repo_response.get("results", []))
+        
+        return PaginatedResponse(
+            total=repo_response.get("total"),
+            page=repo_response.get("page", page),
+            pageSize=repo_response.get("pageSize", page_size),
+            results=concerts_dtos,
+            nextCursor=repo_response.get("nextCursor"),
+            hasMore=repo_response.get("hasMore", False)
+        )
+    
+    async def stream_by_filter(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        output_format: str = "ndjson",
+        concert_type_id: Optional[int] = None,
+        venue_type_id: Optional[int] = None,
+        tour_id: Optional[int] = None,
+        city_id: Optional[int] = None,
+        state_id: Optional[int] = None,
+        country_id: Optional[int] = None,
+        continent_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Serializa cada concierto a medida que llega del cursor:
+        NDJSON (una línea por concierto) o un arreglo JSON enviado por partes.
+        """
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="Start date cannot be greater than end date")
+
+        concerts = self.repo.stream_by_filter(
             start_date,
             end_date,
-            page,
-            page_size,
             concert_type_id,
             venue_type_id,
             tour_id,
@@ -38,19 +90,21 @@ class ConcertService:
             country_id,
             continent_id
         )
-        
-        concerts_dtos = [
-            ConcertDto.model_validate(v) 
-            for v in repo_response.get("results", [])
-        ]
-        
-        return PaginatedResponse(
-            total=repo_response.get("total", 0),
-            page=repo_response.get("page", page),
-            pageSize=repo_response.get("pageSize", page_size),
-            results=concerts_dtos
-        )
-    
+
+        async def ndjson():
+            async for concert in concerts:
+                yield ConcertDto.model_validate(concert).model_dump_json(by_alias=True) + "\n"
+
+        async def json_array():
+            yield "["
+            first = True
+            async for concert in concerts:
+                yield ("" if first else ",") + ConcertDto.model_validate(concert).model_dump_json(by_alias=True)
+                first = False
+            yield "]"
+
+        return ndjson() if output_format == "ndjson" else json_array()
+
     async def get_by_date(self, search_date: datetime) -> List[ConcertDto]:
         data = await self.repo.get_by_date(search_date)
         
@@ -61,6 +115,14 @@ class ConcertService:
         
         return [ConcertSongDto(**item) for item in data]
     
+    async def get_concert_setlists(self, concert_ids: List[int]) -> List[ConcertSetlistDto]:
+        setlists = await self.repo.get_concert_setlists(concert_ids)
+
+        return [
+            ConcertSetlistDto(concert_id=concert_id, setlist=[ConcertSongDto(**song) for song in songs])
+            for concert_id, songs in setlists.items()
+        ]
+
     async def get_concert_details_by_date(self, search_date: datetime) -> List[ConcertWithSetlistDto]:
         # 1. Obtener los conciertos de la fecha
         concerts_data = await self.repo.get_by_date(search_date)
@@ -68,19 +130,14 @@ class ConcertService:
         if not concerts_data:
             return []
 
+        # 2. Traer los setlists de todos los conciertos en una sola consulta
+        setlists = await self.repo.get_concert_setlists([c["id"] for c in concerts_data])
+
         results = []
-        
-        # 2. Iterar por cada concierto encontrado para traer sus canciones
         for concert_dict in concerts_data:
-            # Convertimos el diccionario base a DTO
+            # 3. Convertimos el diccionario base a DTO y le asignamos sus canciones
             concert_dto = ConcertWithSetlistDto(**concert_dict)
-            
-            # 3. Llamamos al método del repo para obtener las canciones
-            songs_data = await self.repo.get_concert_setlist(concert_dto.id)
-            
-            # 4. Mapeamos las canciones a su DTO y las asignamos al concierto
-            concert_dto.setlist = [ConcertSongDto(**song) for song in songs_data]
-            
+            concert_dto.setlist = [ConcertSongDto(**song) for song in setlists.get(concert_dto.id, [])]
             results.append(concert_dto)
             
-        return results
\ No newline at end of file
+        return results
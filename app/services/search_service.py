@@ -0,0 +1,47 @@
+import os
+import time
+from typing import List, Optional
+from fastapi import HTTPException
+from app.dtos.search_dto import SearchResponseDto
+from app.repositories.search_index import SearchIndex
+from app.repositories.search_repository import SEARCH_TYPES, SearchRepository
+
+# memory: índice invertido en proceso (por defecto); mongo: índices de texto de Mongo ($text)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory").strip().lower()
+
+class SearchService:
+    def __init__(self, repository: SearchRepository, index: SearchIndex, backend: str = SEARCH_BACKEND):
+        self.repo = repository
+        self.index = index
+        self.backend = backend
+
+    async def search(self, q: str, types: Optional[str], limit: int) -> SearchResponseDto:
+        """
+        Búsqueda por palabras y prefijos sobre tracks, álbumes, venues y músicos.
+        types: lista separada por comas (track,album,venue,musician); vacío = todos.
+        """
+        wanted = self._parse_types(types)
+        started = time.perf_counter()
+        if self.backend == "mongo":
+            results = await self.repo.text_search(q, wanted, limit)
+        else:
+            await self.index.ensure_fresh(self.repo.db)
+            results = self.index.search(q, wanted, limit)
+
+        return SearchResponseDto.model_validate({
+            "query": q,
+            "backend": self.backend,
+            "total": len(results),
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+            "results": results
+        })
+
+    @staticmethod
+    def _parse_types(types: Optional[str]) -> List[str]:
+        if not types:
+            return list(SEARCH_TYPES)
+        wanted = [t.strip().lower() for t in types.split(",") if t.strip()]
+        invalid = [t for t in wanted if t not in SEARCH_TYPES]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid types: {', '.join(invalid)}. Allowed: {', '.join(SEARCH_TYPES)}")
+        return wanted
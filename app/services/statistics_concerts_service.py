@@ -7,13 +7,23 @@ from app.dtos.track_dto import TrackWithAlbumDetailsForConcertDto, NonAlbumTrack
 from app.dtos.album_dto import AlbumForConcertDto
 from app.dtos.statistics.concerts.concert_country_dto import ConcertCountryDto
 from app.dtos.statistics.concerts.conquest_milestone_dto import ConquestMilestoneDto
+from app.dtos.statistics.concerts.setlist_graph_dto import SongTransitionDto, SongCoOccurrenceDto
+from app.core.cache import ResponseCache
+from app.core.fast_json import validate_list
 
 class StatisticsConcertsService:
-    def __init__(self, repository: StatisticsConcertsRepository, concertsExecutiveSummaryRepository: ConcertsExecutiveSummaryRepository):
+    def __init__(self, repository: StatisticsConcertsRepository, concertsExecutiveSummaryRepository: ConcertsExecutiveSummaryRepository, cache: ResponseCache):
         self.repo = repository
         self.concertsExecutiveSummaryRepository = concertsExecutiveSummaryRepository
+        self.cache = cache
 
     async def get_executive_summary(self) -> Optional[ConcertExecutiveSummaryDto]:
+        # La llave incluye la versión de datos: una nueva carga de conciertos invalida la entrada
+        version = await self.concertsExecutiveSummaryRepository.get_data_version()
+        
+        return await self.cache.get_or_compute(("concerts:executive_summary", version), self._build_executive_summary)
+
+    async def _build_executive_summary(self) -> ConcertExecutiveSummaryDto:
         results = await self.concertsExecutiveSummaryRepository.get_executive_summary()
             
         return ConcertExecutiveSummaryDto.model_validate(results)
@@ -21,45 +31,59 @@ class StatisticsConcertsService:
     async def get_top_20_most_played_songs(self) -> List[TrackWithAlbumDetailsForConcertDto]:
         results_db = await self.repo.get_top_20_most_played_songs()
         
-        return [TrackWithAlbumDetailsForConcertDto.model_validate(report) for report in results_db]
+        return validate_list(TrackWithAlbumDetailsForConcertDto, results_db)
     
     async def get_most_played_studio_albums(self) -> List[AlbumForConcertDto]:
         results_db = await self.repo.get_most_played_studio_albums()
         
-        return [AlbumForConcertDto.model_validate(report) for report in results_db]
+        return validate_list(AlbumForConcertDto, results_db)
     
     async def get_most_explored_studio_albums(self) -> List[AlbumForConcertDto]:
         results_db = await self.repo.get_most_explored_studio_albums()
         
-        return [AlbumForConcertDto.model_validate(report) for report in results_db]
+        return validate_list(AlbumForConcertDto, results_db)
     
     async def get_concerts_stats_by_year(self) -> List[ConcertYearDto]:
         results_db = await self.repo.get_concerts_stats_by_year()
         
-        return [ConcertYearDto.model_validate(report) for report in results_db]
+        return validate_list(ConcertYearDto, results_db)
     
     async def get_concert_counts_by_country(self) -> List[ConcertCountryDto]:
         results_db = await self.repo.get_concert_counts_by_country()
         
-        return [ConcertCountryDto.model_validate(report) for report in results_db]
+        return validate_list(ConcertCountryDto, results_db)
     
     async def get_top_20_concert_opener_tracks(self) -> List[TrackWithAlbumDetailsForConcertDto]:
         results_db = await self.repo.get_top_20_concert_opener_tracks()
         
-        return [TrackWithAlbumDetailsForConcertDto.model_validate(report) for report in results_db]
+        return validate_list(TrackWithAlbumDetailsForConcertDto, results_db)
     
     async def get_non_album_songs(self) -> List[NonAlbumTrackDto]:
         results_db = await self.repo.get_non_album_songs()
         
-        return [NonAlbumTrackDto.model_validate(report) for report in results_db]
+        return validate_list(NonAlbumTrackDto, results_db)
     
     async def get_geographic_conquest_milestones(self) -> List[ConquestMilestoneDto]:
         results_db = await self.repo.get_geographic_conquest_milestones()
         
-        return [ConquestMilestoneDto.model_validate(report) for report in results_db]
+        return validate_list(ConquestMilestoneDto, results_db)
     
     async def get_tracks_with_play_count_by_album(self, album_id: int) -> List[TrackForConcertDto]:
         results_db = await self.repo.get_tracks_with_play_count_by_album(album_id)
         
-        return [TrackForConcertDto.model_validate(report) for report in results_db]
-    
\ No newline at end of file
+        return validate_list(TrackForConcertDto, results_db)
+
+    async def get_setlist_transitions(self, song: Optional[str], track_id: Optional[int], limit: int) -> Optional[List[SongTransitionDto]]:
+        results_db = await self.repo.get_setlist_transitions(song, track_id, limit)
+        
+        return None if results_db is None else validate_list(SongTransitionDto, results_db)
+    
+    async def get_top_segues(self, limit: int, min_count: int) -> List[SongTransitionDto]:
+        results_db = await self.repo.get_top_segues(limit, min_count)
+        
+        return validate_list(SongTransitionDto, results_db)
+    
+    async def get_song_co_occurrence(self, song: Optional[str], track_id: Optional[int], limit: int, min_concerts: int) -> Optional[List[SongCoOccurrenceDto]]:
+        results_db = await self.repo.get_song_co_occurrence(song, track_id, limit, min_concerts)
+        
+        return None if results_db is None else validate_list(SongCoOccurrenceDto, results_db)
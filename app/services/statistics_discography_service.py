@@ -10,10 +10,13 @@ from app.dtos.statistics.discography_dto import (
     GuestArtistReportDto,
     InstrumentalTrackByYearDto
     )
+from app.core.cache import ResponseCache
+
 class StatisticsDiscographyService:
-    def __init__(self, repository: StatisticsDiscographyRepository, discographyExecutiveSummaryRepository: DiscographyExecutiveSummaryRepository):
+    def __init__(self, repository: StatisticsDiscographyRepository, discographyExecutiveSummaryRepository: DiscographyExecutiveSummaryRepository, cache: ResponseCache):
         self.repo = repository
         self.discographyExecutiveSummaryRepository = discographyExecutiveSummaryRepository
+        self.cache = cache
 
     async def get_instrumental_logic(self, album_id: Optional[int] = None) -> Optional[InstrumentalStatsDto]:
         # Business Logic: Determine the filter scope
@@ -56,6 +59,11 @@ class StatisticsDiscographyService:
         return [GuestArtistReportDto.model_validate(report) for report in results_db]
 
     async def get_executive_summary(self) -> Optional[DiscographyExecutiveSummaryDto]:
+        version = await self.discographyExecutiveSummaryRepository.get_data_version()
+        
+        return await self.cache.get_or_compute(("discography:executive_summary", version), self._build_executive_summary)
+
+    async def _build_executive_summary(self) -> DiscographyExecutiveSummaryDto:
         results = await self.discographyExecutiveSummaryRepository.get_executive_summary()
             
         return DiscographyExecutiveSummaryDto.model_validate(results)
@@ -2,6 +2,7 @@ from fastapi import HTTPException
 from typing import List, Optional
 from app.repositories.track_repository import TrackRepository
 from app.dtos.track_dto import TrackDto, GenreFilterDto, TrackWithAlbumDetailsDto
+from app.core.fast_json import validate_list
 
 class TrackService:
     def __init__(self, repository: TrackRepository):
@@ -15,7 +16,7 @@ class TrackService:
         tracks_db = await self.repo.get_by_album(match_stage)
         
         # Mapeo masivo de modelos de BD a DTOs de la API
-        return [TrackDto.model_validate(t) for t in tracks_db]
+        return validate_list(TrackDto, tracks_db)
 
     async def get_by_genre(self, genre_id: int) -> GenreFilterDto:
         """
@@ -49,26 +50,26 @@ class TrackService:
             
         guest_artists_db = await self.repo.get_by_guest_artists_range(start, end)
         
-        return [TrackWithAlbumDetailsDto.model_validate(t) for t in guest_artists_db]
+        return validate_list(TrackWithAlbumDetailsDto, guest_artists_db)
 
     async def get_by_top_duration(self, isLive: bool | None, order: str = "desc") -> List[TrackWithAlbumDetailsDto]:
         tracks_db = await self.repo.get_by_top_duration(order, isLive)
         
-        return [TrackWithAlbumDetailsDto.model_validate(t) for t in tracks_db]
+        return validate_list(TrackWithAlbumDetailsDto, tracks_db)
 
     async def get_by_lead_vocal(self, musicianId: int) -> List[TrackWithAlbumDetailsDto]:
         tracks_db = await self.repo.get_by_lead_vocal(musicianId)
         
-        return [TrackWithAlbumDetailsDto.model_validate(t) for t in tracks_db]
+        return validate_list(TrackWithAlbumDetailsDto, tracks_db)
 
     async def get_by_live_in_studio_albums(self) -> List[TrackWithAlbumDetailsDto]:
         tracks_db = await self.repo.get_by_live_in_studio_albums()
         
-        return [TrackWithAlbumDetailsDto.model_validate(t) for t in tracks_db]
+        return validate_list(TrackWithAlbumDetailsDto, tracks_db)
 
     async def get_by_composer_id(self, composerId: int) -> List[TrackWithAlbumDetailsDto]:
         tracks_db = await self.repo.get_by_composer_id(composerId)
         
-        return [TrackWithAlbumDetailsDto.model_validate(t) for t in tracks_db]
+        return validate_list(TrackWithAlbumDetailsDto, tracks_db)
     
     
\ No newline at end of file
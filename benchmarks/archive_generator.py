@@ -0,0 +1,272 @@
+#Archivo sintético con los esquemas de scripts/colecciones.txt (más maestros de discografía) para los benchmarks.
+#La escala 1 aproxima el tamaño real; 10 y 100 multiplican conciertos, canciones, catálogo y geografía.
+#Las canciones siguen una distribución tipo Zipf (pocas canciones concentran la mayoría de las ejecuciones),
+#así los $group/$sort y las matrices de setlists trabajan con la misma asimetría que la base real.
+
+# python -m benchmarks.archive_generator --scale 1      -> cuenta de documentos por colección
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+GENERATOR_VERSION = 1
+BATCH_SIZE = 5000
+
+# Tamaño aproximado del archivo real (escala 1)
+BASE_SIZES = {
+    "concerts": 2500,
+    "albums": 90,
+    "cities": 900,
+    "states": 150,
+    "countries": 80,
+    "tours": 120,
+    "venues": 1200,
+    "guest_artists_concerts": 300,
+    "guest_artists": 250,
+    "musicians": 150,
+    "composers": 400,
+}
+# Por álbum (±3): el catálogo crece con la cantidad de álbumes
+TRACKS_PER_ALBUM = 12
+# Catálogos cerrados: no crecen con la escala
+GENRES = 60
+ROLES = ["Guitar", "Vocals", "Bass", "Drums", "Keyboards", "Percussion", "Timbales", "Congas", "Trumpet", "Saxophone"]
+CONCERT_TYPES = ["Concert", "Festival", "Private", "TV Show", "Rehearsal"]
+SHOW_TYPES = ["Unique", "Early", "Late", "Matinee"]
+VENUE_TYPES = ["Theater", "Arena", "Stadium", "Club", "Amphitheater", "Park", "Hall"]
+CONTINENTS = [("AM", "America"), ("EU", "Europe"), ("AF", "Africa"), ("AS", "Asia"), ("OC", "Oceania"), ("AN", "Antarctic")]
+KEYS = ["Am", "Dm", "Gm", "Em", "Cm", "C", "G", "D", "F", "Bb", "E", "A"]
+# Las más tocadas (rango bajo en la Zipf) llevan títulos reales para que las búsquedas tengan sentido
+FAMOUS_TITLES = [
+    "Black Magic Woman", "Oye Como Va", "Soul Sacrifice", "Evil Ways", "Europa", "Samba Pa Ti", "Jingo",
+    "Smooth", "Maria Maria", "Corazón Espinado", "Persuasion", "Incident at Neshabur", "Toussaint L'Overture",
+    "Everybody's Everything", "No One to Depend On", "She's Not There", "Savor", "Waiting", "Gypsy Queen",
+    "Put Your Lights On", "Love of My Life", "Hope You're Feeling Better", "Batuka", "Guajira", "Open Invitation"
+]
+FIRST_YEAR, LAST_YEAR = 1966, 2025
+COLLECTIONS = ("continents", "countries", "states", "cities", "concert_types", "show_types", "venue_types", "tours",
+               "guest_artists_concerts", "genres", "roles", "composers", "guest_artists", "musicians", "albums",
+               "tracks", "concerts", "concert_songs")
+
+def scaled_sizes(scale: float) -> Dict[str, int]:
+    return {name: max(1, int(round(size * scale))) for name, size in BASE_SIZES.items()}
+
+def _zipf_cum_weights(n: int, exponent: float = 1.1) -> List[float]:
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+def _duration(seconds: int) -> str:
+    return f"00:{seconds // 60:02d}:{seconds % 60:02d}"
+
+def _batches(docs: Iterator[dict]) -> Iterator[List[dict]]:
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class ArchiveGenerator:
+    """
+    Genera el archivo colección por colección, en lotes (a escala 100 concert_songs pasa los
+    cuatro millones de documentos y no conviene tenerlos en memoria a la vez).
+    Con la misma escala y semilla el resultado es idéntico.
+    """
+
+    def __init__(self, scale: float = 1.0, seed: int = 42):
+        self.scale = scale
+        self.seed = seed
+        self.sizes = scaled_sizes(scale)
+        self.rng = random.Random(seed)
+        self._plan()
+
+    def _plan(self) -> None:
+        """Catálogo y geografía (pequeños); los conciertos se generan después, en streaming."""
+        rng, sizes = self.rng, self.sizes
+        n_albums = sizes["albums"]
+        self.albums = []
+        for album_id in range(1, n_albums + 1):
+            year = FIRST_YEAR + 3 + (album_id * (LAST_YEAR - FIRST_YEAR - 3)) // n_albums
+            release_date = datetime(year, rng.randint(1, 12), rng.randint(1, 28))
+            title = "Santana" if album_id == 1 else f"Album {album_id}"
+            self.albums.append({
+                "id": album_id, "title": title, "release_year": year,
+                "cover": f"santana-album-{album_id}.jpg", "release_date": release_date,
+                # Uno de cada cinco álbumes es en vivo
+                "is_live": album_id % 5 == 0
+            })
+
+        self.tracks = []
+        track_id = 0
+        for album in self.albums:
+            for number in range(1, TRACKS_PER_ALBUM + rng.randint(-3, 3) + 1):
+                track_id += 1
+                seconds = rng.randint(150, 720)
+                title = FAMOUS_TITLES[track_id - 1] if track_id <= len(FAMOUS_TITLES) else f"Track {track_id}"
+                if album["is_live"]:
+                    # Versiones en vivo de canciones de estudio (mismo título)
+                    title = self.tracks[rng.randrange(len(self.tracks))]["title"] if self.tracks else title
+                self.tracks.append({
+                    "album_id": album["id"], "title": title,
+                    "composer_ids": rng.sample(range(1, sizes["composers"] + 1), k=min(rng.randint(1, 3), sizes["composers"])),
+                    "duration": _duration(seconds),
+                    "genre_ids": rng.sample(range(1, GENRES + 1), k=rng.randint(1, 3)),
+                    "metadata": {
+                        "key": rng.choice(KEYS), "is_instrumental": rng.random() < 0.35,
+                        "is_live": album["is_live"], "is_love_song": rng.random() < 0.2
+                    },
+                    "side": "A" if number <= 6 else "B", "track_number": number,
+                    "guest_artist_ids": rng.sample(range(1, sizes["guest_artists"] + 1), k=1) if rng.random() < 0.15 else [],
+                    "guest_lead_vocal_ids": [],
+                    "lead_vocal_ids": [rng.randint(1, min(sizes["musicians"], 20))] if rng.random() < 0.6 else [],
+                    "duration_seconds": seconds, "id": track_id
+                })
+
+        # Repertorio en vivo: títulos de estudio por popularidad + canciones sin álbum (covers, jams)
+        studio = [t for t in self.tracks if not t["metadata"]["is_live"]]
+        titles = {}
+        for track in studio:
+            titles.setdefault(track["title"], []).append(track["id"])
+        self.repertoire: List[Tuple[str, List[int]]] = [(title, ids[:1]) for title, ids in titles.items()]
+        n_non_album = max(1, len(self.repertoire) // 8)
+        self.repertoire += [(f"Jam {i}", []) for i in range(1, n_non_album + 1)]
+        head = self.repertoire[:len(FAMOUS_TITLES)]
+        tail = self.repertoire[len(FAMOUS_TITLES):]
+        rng.shuffle(tail)
+        self.repertoire = head + tail
+        self.repertoire_weights = _zipf_cum_weights(len(self.repertoire))
+        # Aperturas: distribución más concentrada que el resto del setlist
+        self.opener_weights = _zipf_cum_weights(len(self.repertoire), exponent=1.6)
+
+        self.countries = []
+        for country_id in range(1, sizes["countries"] + 1):
+            self.countries.append({"id": country_id, "code": f"C{country_id:03d}",
+                                   "continent_id": 1 + (country_id - 1) % 5, "name": f"Country {country_id}"})
+        self.states = [{"id": state_id, "country_id": 1 + (state_id - 1) % min(5, sizes["countries"]),
+                        "code": f"S{state_id}", "name": f"State {state_id}"}
+                       for state_id in range(1, sizes["states"] + 1)]
+        self.cities = []
+        for city_id in range(1, sizes["cities"] + 1):
+            # Primeras ciudades en países con estados (EE.UU., México...): con state_id
+            if city_id % 3 == 0:
+                state = self.states[city_id % len(self.states)]
+                country_id, state_id = state["country_id"], state["id"]
+            else:
+                country_id, state_id = rng.randint(1, sizes["countries"]), None
+            self.cities.append({"id": city_id, "name": f"City {city_id}", "country_id": country_id,
+                                "state_id": state_id, "code": None})
+        self.city_weights = _zipf_cum_weights(len(self.cities), exponent=0.8)
+        self.country_continent = {c["id"]: c["continent_id"] for c in self.countries}
+
+    # --- Colecciones ---
+
+    def masters(self) -> Dict[str, List[dict]]:
+        rng, sizes = self.rng, self.sizes
+        return {
+            "continents": [{"id": i, "code": code, "name": name} for i, (code, name) in enumerate(CONTINENTS, start=1)],
+            "countries": self.countries,
+            "states": self.states,
+            "cities": self.cities,
+            "concert_types": [{"concert_type_id": i, "concert_type_name": n} for i, n in enumerate(CONCERT_TYPES, start=1)],
+            "show_types": [{"show_type_id": i, "show_type_name": n} for i, n in enumerate(SHOW_TYPES, start=1)],
+            "venue_types": [{"venue_type_id": i, "venue_type_name": n} for i, n in enumerate(VENUE_TYPES, start=1)],
+            "tours": [{"tour_id": i, "tour_name": f"Tour {i}"} for i in range(1, sizes["tours"] + 1)],
+            "guest_artists_concerts": [{"guest_artist_concert_id": i, "guest_artist_name": f"Guest {i}"}
+                                       for i in range(1, sizes["guest_artists_concerts"] + 1)],
+            "genres": [{"id": i, "name": f"Genre {i}"} for i in range(1, GENRES + 1)],
+            "roles": [{"id": i, "name": n} for i, n in enumerate(ROLES, start=1)],
+            "composers": [{"id": i, "full_name": f"Composer {i}", "country_id": rng.randint(1, sizes["countries"])}
+                          for i in range(1, sizes["composers"] + 1)],
+            "guest_artists": [{"id": i, "full_name": f"Guest Artist {i}"} for i in range(1, sizes["guest_artists"] + 1)],
+            "musicians": [{
+                "id": i, "first_name": "Carlos" if i == 1 else f"First {i}", "last_name": "Santana" if i == 1 else f"Last {i}",
+                "apelativo": None, "country_id": rng.randint(1, sizes["countries"]),
+                "active_from": datetime(FIRST_YEAR + i % 50, 1, 1), "active_to": None,
+                "roles": rng.sample(range(1, len(ROLES) + 1), k=rng.randint(1, 2)), "bio": f"Musician {i}"
+            } for i in range(1, sizes["musicians"] + 1)],
+            "albums": self.albums,
+            "tracks": self.tracks,
+        }
+
+    def concerts(self) -> Iterator[Tuple[dict, List[dict]]]:
+        """(concierto, canciones) en orden cronológico."""
+        rng, sizes = self.rng, self.sizes
+        n_concerts = sizes["concerts"]
+        span = (datetime(LAST_YEAR, 12, 31) - datetime(FIRST_YEAR, 1, 1)).total_seconds()
+        n_tours = sizes["tours"]
+        for concert_id in range(1, n_concerts + 1):
+            concert_date = datetime(FIRST_YEAR, 1, 1) + timedelta(seconds=int(span * (concert_id - 1) / n_concerts))
+            concert_date = concert_date.replace(hour=0, minute=0, second=0)
+            city = rng.choices(self.cities, cum_weights=self.city_weights)[0]
+            song_count = rng.randint(8, 24)
+            concert = {
+                "id": concert_id, "concert_date": concert_date,
+                "concert_date_str": concert_date.strftime("%Y/%m/%d %H:%M:%S"),
+                "venue_name": f"Venue {rng.randint(1, sizes['venues'])}",
+                "venue_type_id": rng.randint(1, len(VENUE_TYPES)), "show_type_id": rng.choice([1, 1, 1, 2, 3, 4]),
+                "show_time": None, "concert_type_id": rng.choice([1, 1, 1, 1, 2, 3, 4, 5]),
+                "tour_id": 1 + (concert_id - 1) * n_tours // n_concerts if rng.random() < 0.8 else None,
+                "city_id": city["id"], "state_id": city["state_id"], "country_id": city["country_id"],
+                "continent_id": self.country_continent[city["country_id"]],
+                "concert_year": concert_date.year, "song_count": song_count
+            }
+            picks = rng.choices(self.repertoire, cum_weights=self.repertoire_weights, k=song_count)
+            picks[0] = rng.choices(self.repertoire, cum_weights=self.opener_weights)[0]
+            songs = [{
+                "concert_id": concert_id, "song_number": number, "song_name": name,
+                "guest_artist_ids": [rng.randint(1, sizes["guest_artists_concerts"])] if rng.random() < 0.03 else [],
+                "track_ids": list(track_ids), "is_cover": not track_ids and rng.random() < 0.5
+            } for number, (name, track_ids) in enumerate(picks, start=1)]
+            yield concert, songs
+
+    def collections(self) -> Iterator[Tuple[str, List[dict]]]:
+        """(colección, lote de documentos) para todo el archivo."""
+        for name, docs in self.masters().items():
+            for batch in _batches(iter(docs)):
+                yield name, batch
+
+        concerts, songs = [], []
+        for concert, concert_songs in self.concerts():
+            concerts.append(concert)
+            songs += concert_songs
+            if len(songs) >= BATCH_SIZE:
+                yield "concerts", concerts
+                yield "concert_songs", songs
+                concerts, songs = [], []
+        if concerts:
+            yield "concerts", concerts
+            yield "concert_songs", songs
+
+    def sample_ids(self) -> dict:
+        """Argumentos representativos para los métodos de los repositorios."""
+        first, last = self.albums[0], self.albums[-1]
+        # get_by_filter acepta como máximo un año de rango
+        start_date = datetime(1977, 1, 1)
+        return {
+            "album_id": first["id"], "live_album_id": 5, "track_id": 1, "composer_id": 1, "musician_id": 1,
+            "genre_id": 1, "role_id": 1, "concert_id": 1, "concert_ids": list(range(1, 51)),
+            "song": FAMOUS_TITLES[0], "country_id": self.states[0]["country_id"], "state_id": self.states[0]["id"],
+            "continent_id": 1, "start_date": start_date, "end_date": start_date + timedelta(days=364),
+            "search_date": datetime(FIRST_YEAR, 1, 1), "start_year": first["release_year"], "end_year": last["release_year"]
+        }
+
+def main(scale: float, seed: int):
+    generator = ArchiveGenerator(scale, seed)
+    counts: Dict[str, int] = {}
+    for name, batch in generator.collections():
+        counts[name] = counts.get(name, 0) + len(batch)
+    print(f"📦 Archivo sintético x{scale:g} (semilla {seed}, generador v{GENERATOR_VERSION})")
+    for name, count in counts.items():
+        print(f"   {name:<24}{count:>10,}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivo sintético para los benchmarks de repositorios")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.scale, args.seed)
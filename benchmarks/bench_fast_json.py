@@ -0,0 +1,101 @@
+#Compara el costo de CPU por request de los endpoints de listas /concerts/ y /tracks/album/{id}
+#con el camino habitual (model_validate + response_model) y con FAST_JSON (TypeAdapter + dump_json).
+#Los repositorios se reemplazan por datos sintéticos en memoria: solo se mide validación y serialización.
+
+# python -m benchmarks.bench_fast_json --rows 100 --requests 300
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+import httpx
+from fastapi import FastAPI
+from app.core import fast_json
+from app.core.dependencies import get_concert_service, get_track_service
+from app.routes.concert_routes import router as concert_router
+from app.routes.tracks_routes import router as track_router
+from app.services.concert_service import ConcertService
+from app.services.track_service import TrackService
+
+def make_concerts(n: int) -> list:
+    start = datetime(1970, 1, 1)
+    return [{
+        "id": i, "concert_date": start + timedelta(days=i), "venue_name": f"Venue {i}",
+        "venue_type_id": 1, "venue_type_name": "Arena", "show_type_id": 1, "show_type_name": "Unique",
+        "show_time": "20:00", "concert_type_id": 1, "concert_type_name": "Concert",
+        "tour_id": 3, "tour_name": "Supernatural Tour", "city_id": 10, "city_name": "San Francisco",
+        "state_id": 5, "state_name": "California", "country_id": 1, "country_name": "United States",
+        "continent_id": 1, "continent_name": "America", "concert_year": 1970 + i % 50, "song_count": 18
+    } for i in range(n)]
+
+def make_tracks(n: int) -> list:
+    return [{
+        "track_number": i + 1, "title": f"Track {i}", "duration": "00:04:07", "duration_seconds": 247,
+        "album": "Santana", "year": 1969, "genres": ["Latin Rock", "Jazz"], "composers": ["Carlos Santana"],
+        "guest_artists": [],
+        "metadata": {"key": "Gm", "is_instrumental": True, "is_live": False, "is_love_song": False}
+    } for i in range(n)]
+
+class StubConcertRepository:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_by_filter(self, *args, **kwargs):
+        return {"total": len(self.rows), "results": self.rows, "page": 1, "pageSize": len(self.rows),
+                "nextCursor": None, "hasMore": False}
+
+class StubTrackRepository:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_by_album(self, match_stage):
+        return self.rows
+
+def build_app(rows: int) -> FastAPI:
+    app = FastAPI(default_response_class=fast_json.default_response_class())
+    app.include_router(concert_router)
+    app.include_router(track_router)
+    concerts, tracks = make_concerts(rows), make_tracks(rows)
+    app.dependency_overrides[get_concert_service] = lambda: ConcertService(StubConcertRepository(concerts))
+    app.dependency_overrides[get_track_service] = lambda: TrackService(StubTrackRepository(tracks))
+    return app
+
+async def measure(client: httpx.AsyncClient, url: str, requests: int) -> dict:
+    for _ in range(10):  # calentamiento (TypeAdapter, caches de FastAPI)
+        await client.get(url)
+
+    body = None
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(url)
+        response.raise_for_status()
+        body = response.content
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return {"cpu_ms": cpu * 1000 / requests, "wall_ms": wall * 1000 / requests, "body": body}
+
+async def main(rows: int, requests: int):
+    endpoints = {
+        "/concerts/": f"/concerts/?startDate=1970-01-01&endDate=1970-12-31&pageSize={min(rows, 100)}",
+        "/tracks/album/{id}": "/tracks/album/1",
+    }
+    print(f"rows={rows} requests={requests}")
+    print(f"{'endpoint':<22}{'default cpu ms':>16}{'fast cpu ms':>14}{'saved':>9}{'same body':>11}")
+
+    for name, url in endpoints.items():
+        results = {}
+        for enabled in (False, True):
+            fast_json.FAST_JSON = enabled
+            transport = httpx.ASGITransport(app=build_app(rows))
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                results[enabled] = await measure(client, url, requests)
+
+        default, fast = results[False], results[True]
+        saved = 1 - fast["cpu_ms"] / default["cpu_ms"] if default["cpu_ms"] else 0.0
+        same = httpx.Response(200, content=default["body"]).json() == httpx.Response(200, content=fast["body"]).json()
+        print(f"{name:<22}{default['cpu_ms']:>16.3f}{fast['cpu_ms']:>14.3f}{saved:>8.0%}{str(same):>11}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del camino FAST_JSON")
+    parser.add_argument("--rows", type=int, default=100, help="Filas por respuesta")
+    parser.add_argument("--requests", type=int, default=300, help="Requests medidos por endpoint y modo")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.requests))
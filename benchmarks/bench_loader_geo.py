@@ -0,0 +1,93 @@
+#Micro-benchmark de ConcertsLoader: preprocess + prepare_concert (maestros, estados y ciudades) sobre N filas.
+#El catálogo de ciudades crece con las filas (como en la base real), así que un costo por fila constante
+#indica que la resolución geográfica es O(filas) y no O(filas × ciudades).
+#Mongo se reemplaza por un stub en memoria: solo se mide el trabajo del loader.
+
+# python -m benchmarks.bench_loader_geo --sizes 1000 4000 16000
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from scripts.maintenance.load_concerts import ConcertsLoader
+
+class StubCollection:
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+class StubDb:
+    def __init__(self):
+        self.collections = {}
+        self.counters = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, StubCollection())
+
+    async def next_counter(self, name):
+        self.counters[name] = self.counters.get(name, 0) + 1
+        return self.counters[name]
+
+def make_loader(n_cities: int) -> ConcertsLoader:
+    loader = ConcertsLoader()
+    loader.db = StubDb()
+    loader.get_next_id = loader.db.next_counter
+    loader.cache = {coll: {} for coll in ['show_types', 'concert_types', 'venue_types', 'tours', 'continents',
+                                          'countries', 'states', 'state_codes', 'cities', 'guest_artists_concerts',
+                                          'concerts']}
+    # Mitad del catálogo ya existe en caché; la otra mitad se crea durante la carga
+    for i in range(n_cities // 2):
+        loader.cache['cities'][(f"city {i}", 1 + i % 20)] = i + 1
+    return loader
+
+def make_frame(rows: int, n_cities: int) -> pd.DataFrame:
+    start = datetime(1970, 1, 1)
+    return pd.DataFrame([{
+        'Fecha': start + timedelta(days=i), 'Venue': f"Venue {i % 500}", 'Tipo de Función': "Unique",
+        'Tipo de Concierto': "Concert", 'Tipo de Lugar': "Arena", 'Ciudad': f"City {i % n_cities}",
+        'País': f"Country {1 + i % 20}", 'Continente': "America", 'Código Estado': f"S{i % 50}",
+        'Nombre Estado': f"State {i % 50}", 'Hora Función': "20:00", 'Tour': None,
+        'Canción': "Jingo", 'Artista Invitado': None, 'Es Cover?': "FALSO"
+    } for i in range(rows)])
+
+async def measure(rows: int) -> float:
+    n_cities = max(rows // 5, 1)
+    loader = make_loader(n_cities)
+    # Los países se crean en orden (ids 1..20) para que coincidan con el catálogo de ciudades precargado
+    for i in range(20):
+        await loader.get_or_create_master('countries', f"Country {i + 1}", 'country_id', 'name')
+    df = make_frame(rows, n_cities)
+
+    started = time.perf_counter()
+    concerts, songs = loader.preprocess(df)
+    setlists = {}
+    for song in songs.to_dict('records'):
+        setlists.setdefault(song['concert_idx'], []).append(song)
+    for concert_idx, first_row in concerts.iterrows():
+        await loader.prepare_concert(first_row, setlists.get(concert_idx, []))
+    return time.perf_counter() - started
+
+async def main(sizes, max_ratio: float):
+    print(f"{'rows':>8}{'cities':>8}{'total s':>10}{'us/row':>10}")
+    per_row = []
+    for rows in sizes:
+        elapsed = await measure(rows)
+        per_row.append(elapsed / rows * 1e6)
+        print(f"{rows:>8}{rows // 5:>8}{elapsed:>10.3f}{per_row[-1]:>10.1f}")
+
+    ratio = per_row[-1] / per_row[0]
+    print(f"costo por fila {sizes[-1]} vs {sizes[0]} filas: x{ratio:.2f}")
+    if ratio > max_ratio:
+        print(f"❌ El costo por fila crece con el tamaño (x{ratio:.2f} > x{max_ratio}): la carga no es lineal")
+        sys.exit(1)
+    print("✅ Escala lineal con la cantidad de filas")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escalamiento de la resolución geográfica del loader de conciertos")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="Máximo crecimiento aceptado del costo por fila")
+    args = parser.parse_args()
+    asyncio.run(main(sorted(args.sizes), args.max_ratio))
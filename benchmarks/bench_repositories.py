@@ -0,0 +1,329 @@
+#Benchmark de todos los métodos públicos de lectura de los repositorios (app/repositories) sobre un archivo
+#sintético (benchmarks/archive_generator.py) a varias escalas. Por cada método mide la primera llamada con
+#los cachés del proceso vacíos (cold: snapshots, motor columnar, grafo de setlists, maestros) y luego
+#--repeat llamadas en caliente (warm). Escribe un JSON en benchmarks/results/ para comparar entre commits.
+#
+#Backends: "mongod" (por defecto, BENCH_MONGODB_URL o mongodb://localhost:27017; una base por escala
+#que se reutiliza si ya tiene el mismo archivo) o "memory" (mongomock, solo para validar la suite).
+
+# python -m benchmarks.bench_repositories --scales 1 10 100 --repeat 5
+# python -m benchmarks.bench_repositories --scales 1 --engine columnar --only StatisticsConcerts
+# python -m benchmarks.bench_repositories --backend memory --scales 1 --repeat 2
+# python -m benchmarks.bench_repositories --diff benchmarks/results/repositories-abc1234.json benchmarks/results/repositories-def5678.json
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.archive_generator import COLLECTIONS, GENERATOR_VERSION, ArchiveGenerator
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+BENCH_META = "bench_meta"
+
+# Escrituras y utilidades internas: no son lecturas de endpoints
+SKIP_PREFIXES = ("create_", "update_", "delete_", "insert_")
+SKIP_METHODS = {"refresh_snapshots", "purge_stale", "get_or_build"}
+
+def argument_values(ids: dict) -> Dict[str, Any]:
+    """Valor de muestra por nombre de parámetro (los mismos nombres que usan los repositorios)."""
+    from app.repositories.search_repository import SEARCH_TYPES
+    return {
+        "album_id": ids["album_id"], "composer_id": ids["composer_id"], "musician_id": ids["musician_id"],
+        "genre_id": ids["genre_id"], "role_id": ids["role_id"], "role_ids": [1, 2],
+        "concert_id": ids["concert_id"], "concert_ids": ids["concert_ids"], "search_date": ids["search_date"],
+        "start_date": ids["start_date"], "end_date": ids["end_date"],
+        "start_year": ids["start_year"], "end_year": ids["end_year"],
+        "country_id": ids["country_id"], "state_id": ids["state_id"], "continent_id": ids["continent_id"],
+        "continentId": ids["continent_id"],
+        "song": ids["song"], "track_id": None, "limit": 20, "min_count": 1, "min_concerts": 1,
+        "match_query": {}, "match_stage": {"album_id": ids["album_id"]},
+        "q": "black magic", "types": SEARCH_TYPES
+    }
+
+def extra_cases(ids: dict) -> List[Tuple[str, str, dict]]:
+    """Variantes con filtros que cambian el plan de ejecución: (clase, método, kwargs)."""
+    return [
+        ("ConcertRepository", "get_by_filter", {"start_date": ids["start_date"], "end_date": ids["end_date"],
+                                                "country_id": ids["country_id"]}),
+        ("ConcertRepository", "get_by_filter", {"start_date": ids["start_date"], "end_date": ids["end_date"],
+                                                "include_total": False, "page_size": 200}),
+        ("StatisticsDiscographyRepository", "get_key_stats", {"match_query": {"album_id": ids["album_id"]},
+                                                              "album_id": ids["album_id"]}),
+        ("TrackRepository", "get_by_top_duration", {"order": "asc", "is_live": True}),
+    ]
+
+def discover_repositories() -> List[type]:
+    """Clases *Repository de app/repositories (todas reciben la base en el constructor)."""
+    import app.repositories as package
+    classes = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        module = importlib.import_module(f"app.repositories.{module_info.name}")
+        classes += [cls for name, cls in inspect.getmembers(module, inspect.isclass)
+                    if cls.__module__ == module.__name__ and name.endswith("Repository")]
+    return sorted(classes, key=lambda cls: cls.__name__)
+
+def build_cases(db, ids: dict) -> Tuple[List[Tuple[str, Callable]], List[str]]:
+    """(nombre, llamada) por método público; los que no se pueden invocar quedan en skipped."""
+    values = argument_values(ids)
+    cases, skipped = [], []
+    instances = {}
+    for cls in discover_repositories():
+        instance = instances[cls.__name__] = cls(db)
+        for name, function in inspect.getmembers(cls, inspect.isfunction):
+            if name.startswith("_") or name.startswith(SKIP_PREFIXES) or name in SKIP_METHODS:
+                continue
+            kwargs, missing = {}, []
+            for param in list(inspect.signature(function).parameters.values())[1:]:
+                if param.name in values and (param.default is inspect.Parameter.empty or param.default is None):
+                    kwargs[param.name] = values[param.name]
+                elif param.default is inspect.Parameter.empty:
+                    missing.append(param.name)
+            if missing:
+                skipped.append(f"{cls.__name__}.{name} (sin valor para {', '.join(missing)})")
+                continue
+            cases.append((f"{cls.__name__}.{name}", _bind(getattr(instance, name), kwargs)))
+
+    for class_name, method, kwargs in extra_cases(ids):
+        if class_name in instances:
+            # El rango de fechas es el mismo en todas las variantes: solo se nombran los filtros
+            label = ",".join(f"{k}={v}" for k, v in kwargs.items() if not isinstance(v, datetime))
+            cases.append((f"{class_name}.{method}[{label}]", _bind(getattr(instances[class_name], method), kwargs)))
+    return cases, skipped
+
+def _bind(method, kwargs: dict) -> Callable:
+    async def call():
+        result = method(**kwargs)
+        if hasattr(result, "__aiter__"):
+            # stream_by_filter: se consume completo
+            return [row async for row in result]
+        return await result
+    return call
+
+def in_memory_cases(db) -> List[Tuple[str, Callable]]:
+    """Cargas completas de los índices en memoria que viven en app/repositories (instancias nuevas)."""
+    from app.database import get_data_version
+    from app.repositories.columnar_engine import ColumnarAnalyticsEngine
+    from app.repositories.master_data_registry import MasterDataRegistry
+    from app.repositories.search_index import SearchIndex
+    from app.repositories.setlist_graph import SetlistGraph
+    from app.repositories.track_id_sets import TrackIdSets
+
+    async def load(factory, with_version: bool = True):
+        version = await get_data_version(db)
+        target = factory()
+        if isinstance(target, SearchIndex):
+            await target.build(db, version)
+        elif with_version:
+            await target.load(db, version)
+        else:
+            await target.load(db)
+        return None
+
+    return [
+        ("ColumnarAnalyticsEngine.load", lambda: load(ColumnarAnalyticsEngine)),
+        ("MasterDataRegistry.load", lambda: load(MasterDataRegistry, with_version=False)),
+        ("SearchIndex.build", lambda: load(SearchIndex)),
+        ("SetlistGraph.load", lambda: load(SetlistGraph)),
+        ("TrackIdSets.load", lambda: load(TrackIdSets)),
+    ]
+
+async def reset_process_caches(db) -> None:
+    """Estado de un proceso recién iniciado sobre datos ya cargados (cold)."""
+    from app.repositories.columnar_engine import columnar_engine
+    from app.repositories.master_data_registry import master_data
+    from app.repositories.search_index import search_index
+    from app.repositories.setlist_graph import setlist_graph
+    from app.repositories.track_id_sets import track_id_sets
+    for singleton in (columnar_engine, master_data, search_index, setlist_graph, track_id_sets):
+        singleton.invalidate()
+    await db.stats_snapshots.delete_many({})
+
+def _size(result) -> Optional[int]:
+    return len(result) if isinstance(result, list) else None
+
+def _summary_ms(samples: List[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "min": round(ordered[0], 3),
+        "median": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 3),
+        "mean": round(statistics.fmean(ordered), 3)
+    }
+
+async def time_case(db, name: str, call: Callable, repeat: int) -> dict:
+    await reset_process_caches(db)
+    try:
+        started = time.perf_counter()
+        result = await call()
+        cold_ms = (time.perf_counter() - started) * 1000
+        warm = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await call()
+            warm.append((time.perf_counter() - started) * 1000)
+    except Exception as e:
+        return {"name": name, "status": "error", "error": f"{type(e).__name__}: {e}"[:300]}
+    return {"name": name, "status": "ok", "cold_ms": round(cold_ms, 3),
+            "warm_ms": _summary_ms(warm) if warm else None, "rows": _size(result)}
+
+# --- Datos ---
+
+async def seed(db, generator: ArchiveGenerator, force: bool) -> Tuple[dict, float]:
+    """Carga el archivo si la base no tiene ya el mismo (escala, semilla, versión del generador)."""
+    from app.database import DATA_VERSION_COUNTER
+    from app.schema_registry import apply_schema
+    from scripts.common.track_play_stats import refresh_track_play_stats
+
+    fingerprint = {"scale": generator.scale, "seed": generator.seed, "generator_version": GENERATOR_VERSION}
+    meta = await db[BENCH_META].find_one({"_id": "archive"})
+    if meta and not force and all(meta.get(k) == v for k, v in fingerprint.items()):
+        print(f"♻️  Archivo x{generator.scale:g} ya cargado en la base, se reutiliza")
+        return meta["counts"], meta["seed_s"]
+
+    started = time.perf_counter()
+    # Derivadas incluidas: track_play_stats se recalcula abajo, los snapshots y el historial se descartan
+    for name in COLLECTIONS + ("track_play_stats", "stats_snapshots", "counters", "concert_changes", BENCH_META):
+        await db.drop_collection(name)
+
+    counts: Dict[str, int] = {}
+    for name, batch in generator.collections():
+        await db[name].insert_many(batch, ordered=False)
+        counts[name] = counts.get(name, 0) + len(batch)
+
+    try:
+        await apply_schema(db)
+    except Exception as e:
+        print(f"⚠️ Índices no aplicados en este backend: {e}")
+    await db.counters.replace_one({"_id": DATA_VERSION_COUNTER}, {"sequence_value": 1}, upsert=True)
+    counts["track_play_stats"] = await refresh_track_play_stats(db)
+
+    seed_s = round(time.perf_counter() - started, 2)
+    await db[BENCH_META].replace_one({"_id": "archive"}, {**fingerprint, "counts": counts, "seed_s": seed_s}, upsert=True)
+    print(f"🌱 Archivo x{generator.scale:g} cargado en {seed_s} s ({counts.get('concert_songs', 0):,} canciones de conciertos)")
+    return counts, seed_s
+
+def open_database(backend: str, uri: str, scale: float):
+    name = f"santana_bench_x{scale:g}".replace(".", "_")
+    if backend == "memory":
+        from benchmarks.mongo_stand_in import StandInDatabase
+        return StandInDatabase(name), None
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
+    return client[name], client
+
+# --- Resultados ---
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+def print_header() -> None:
+    print(f"   {'método':<72}{'cold ms':>10}{'warm p50':>10}{'warm p95':>10}{'filas':>8}")
+
+def print_row(row: dict) -> None:
+    if row["status"] != "ok":
+        print(f"   {row['name'][:71]:<72}  ❌ {row['error'][:60]}")
+        return
+    warm = row["warm_ms"] or {}
+    print(f"   {row['name'][:71]:<72}{row['cold_ms']:>10.1f}{warm.get('median', 0):>10.1f}"
+          f"{warm.get('p95', 0):>10.1f}{row['rows'] if row['rows'] is not None else '-':>8}")
+
+def diff(old_path: str, new_path: str, max_regression: float) -> int:
+    """Compara la mediana en caliente (y el cold) método a método; código 1 si algo empeora más del umbral."""
+    old, new = json.loads(Path(old_path).read_text()), json.loads(Path(new_path).read_text())
+    print(f"📊 {old.get('commit')} -> {new.get('commit')} (backend {new.get('backend')}, motor {new.get('engine')})")
+    regressions = 0
+    old_scales = {s["scale"]: s for s in old["scales"]}
+    for scale in new["scales"]:
+        base = old_scales.get(scale["scale"])
+        if not base:
+            continue
+        print(f"\n x{scale['scale']:g}")
+        print(f"   {'método':<72}{'warm antes':>11}{'warm ahora':>11}{'ratio':>8}{'cold ratio':>11}")
+        before = {r["name"]: r for r in base["results"] if r["status"] == "ok"}
+        for row in scale["results"]:
+            prev = before.get(row["name"])
+            if row["status"] != "ok" or not prev or not row.get("warm_ms") or not prev.get("warm_ms"):
+                continue
+            was, now = prev["warm_ms"]["median"], row["warm_ms"]["median"]
+            ratio = now / was if was else 1.0
+            cold_ratio = row["cold_ms"] / prev["cold_ms"] if prev["cold_ms"] else 1.0
+            flag = "  ⚠️" if ratio > max_regression else ("  ✅" if ratio < 1 / max_regression else "")
+            regressions += ratio > max_regression
+            print(f"   {row['name'][:71]:<72}{was:>11.1f}{now:>11.1f}{ratio:>8.2f}{cold_ratio:>11.2f}{flag}")
+    if regressions:
+        print(f"\n❌ {regressions} métodos más lentos que x{max_regression}")
+        return 1
+    print("\n✅ Sin regresiones sobre el umbral")
+    return 0
+
+async def run(args) -> Path:
+    # El motor de analítica se elige al importar app.repositories.columnar_engine
+    os.environ["ANALYTICS_ENGINE"] = args.engine
+    report = {
+        "commit": git_commit(), "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "backend": args.backend, "engine": args.engine,
+        "repeat": args.repeat, "seed": args.seed, "generator_version": GENERATOR_VERSION, "scales": []
+    }
+    for scale in sorted(args.scales):
+        db, client = open_database(args.backend, args.uri, scale)
+        generator = ArchiveGenerator(scale, args.seed)
+        counts, seed_s = await seed(db, generator, args.reseed)
+
+        cases, skipped = build_cases(db, generator.sample_ids())
+        cases += in_memory_cases(db)
+        if args.only:
+            cases = [(name, call) for name, call in cases if any(f in name for f in args.only)]
+
+        print(f"\n⏱️  x{scale:g}: {len(cases)} métodos, {args.repeat} repeticiones en caliente")
+        print_header()
+        results = []
+        for name, call in cases:
+            results.append(await time_case(db, name, call, args.repeat))
+            print_row(results[-1])
+        for name in skipped:
+            print(f"   ⏭️  {name}")
+
+        report["scales"].append({"scale": scale, "counts": counts, "seed_s": seed_s,
+                                 "skipped": skipped, "results": results})
+        if client:
+            client.close()
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"repositories-{report['commit']}-{args.engine}.json"
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\n💾 Resultados en {output}")
+    return output
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los métodos de lectura de los repositorios")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100], help="Múltiplos del tamaño real")
+    parser.add_argument("--repeat", type=int, default=5, help="Llamadas en caliente por método")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backend", choices=["mongod", "memory"], default="mongod")
+    parser.add_argument("--uri", default=os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--engine", choices=["mongo", "columnar"], default=os.getenv("ANALYTICS_ENGINE", "mongo"))
+    parser.add_argument("--only", nargs="+", help="Solo los métodos cuyo nombre contenga alguno de estos textos")
+    parser.add_argument("--reseed", action="store_true", help="Vuelve a cargar el archivo aunque ya exista")
+    parser.add_argument("--output", help="Ruta del JSON (por defecto benchmarks/results/repositories-<commit>-<motor>.json)")
+    parser.add_argument("--diff", nargs=2, metavar=("ANTES", "AHORA"), help="Solo compara dos JSON de resultados")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="Ratio de la mediana que cuenta como regresión")
+    args = parser.parse_args()
+
+    if args.diff:
+        sys.exit(diff(args.diff[0], args.diff[1], args.max_regression))
+    asyncio.run(run(args))
@@ -0,0 +1,105 @@
+#Perfil de importación del arranque (python -X importtime -c "import app.main") y control de presupuesto.
+#Guarda el log crudo y un resumen JSON en benchmarks/results/ y termina con código 1 si la mediana
+#del tiempo acumulado de app.main supera el presupuesto (para usarlo como paso de CI).
+#Presupuesto por defecto: 900 ms en modo lazy (mediana actual ~575 ms; en eager ~950 ms, así que volver a
+#importar los routers al arranque rompe el control). IMPORT_TIME_BUDGET_MS lo ajusta por máquina; 0 lo desactiva.
+
+# python -m benchmarks.import_time --mode lazy --runs 7              -> paso de CI (código 1 sobre el presupuesto)
+# python -m benchmarks.import_time --mode both --runs 7 --budget-ms 0 -> solo perfil, lazy vs eager
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+# Mediana de app.main en modo lazy que el paso de CI no debe superar
+DEFAULT_BUDGET_MS = "900"
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def run_importtime(lazy: bool) -> str:
+    env = dict(os.environ)
+    env.setdefault("ALLOWED_ORIGINS", "http://localhost")
+    env["LAZY_ROUTERS"] = "true" if lazy else "false"
+    env["PYTHONPATH"] = str(ROOT)
+    # Sin .pyc previos se mediría la compilación, no la importación
+    subprocess.run([sys.executable, "-m", "compileall", "-q", str(ROOT / "app")], check=True)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import app.main falló:\n{result.stderr[-2000:]}")
+    return result.stderr
+
+def parse(log: str) -> dict:
+    """módulo -> (self_us, cumulative_us)"""
+    modules = {}
+    for match in LINE.finditer(log):
+        self_us, cumulative_us, _, name = match.groups()
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+def profile(lazy: bool, runs: int, top: int) -> dict:
+    mode = "lazy" if lazy else "eager"
+    totals, logs = [], []
+    for _ in range(runs):
+        log = run_importtime(lazy)
+        logs.append(log)
+        totals.append(parse(log)["app.main"][1] / 1000)
+
+    # El log guardado es el de la corrida mediana
+    median_ms = statistics.median(totals)
+    median_log = logs[min(range(runs), key=lambda i: abs(totals[i] - median_ms))]
+    modules = parse(median_log)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    (RESULTS_DIR / f"importtime-{mode}.log").write_text(median_log)
+
+    app_modules = sorted(
+        ((name, cum) for name, (_, cum) in modules.items() if name.startswith("app.")),
+        key=lambda item: item[1], reverse=True
+    )
+    heaviest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "mode": mode,
+        "runs_ms": [round(t, 1) for t in totals],
+        "median_ms": round(median_ms, 1),
+        "min_ms": round(min(totals), 1),
+        "top_app_modules_ms": [{"module": n, "cumulative_ms": round(c / 1000, 1)} for n, c in app_modules[:top]],
+        "top_self_ms": [{"module": n, "self_ms": round(s / 1000, 1)} for n, (s, _) in heaviest[:top]],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de import time del arranque de la API")
+    parser.add_argument("--mode", choices=["lazy", "eager", "both"], default="both")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", DEFAULT_BUDGET_MS)),
+                        help="Presupuesto para la mediana de app.main en modo lazy (0 = sin control)")
+    args = parser.parse_args()
+
+    modes = {"lazy": [True], "eager": [False], "both": [False, True]}[args.mode]
+    report = {"python": sys.version.split()[0], "budget_ms": args.budget_ms or None, "profiles": []}
+    for lazy in modes:
+        result = profile(lazy, args.runs, args.top)
+        report["profiles"].append(result)
+        print(f"{result['mode']:<6} median {result['median_ms']:>8.1f} ms  min {result['min_ms']:>8.1f} ms  runs {result['runs_ms']}")
+        for item in result["top_app_modules_ms"][:5]:
+            print(f"         {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+
+    (RESULTS_DIR / "importtime.json").write_text(json.dumps(report, indent=2))
+    print(f"📄 Reporte: {RESULTS_DIR / 'importtime.json'}")
+
+    if args.budget_ms:
+        checked = next((p for p in report["profiles"] if p["mode"] == "lazy"), report["profiles"][0])
+        if checked["median_ms"] > args.budget_ms:
+            print(f"❌ Import time {checked['median_ms']} ms supera el presupuesto de {args.budget_ms} ms ({checked['mode']})")
+            sys.exit(1)
+        print(f"✅ Import time dentro del presupuesto ({checked['median_ms']} <= {args.budget_ms} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#Prueba de carga de la API completa, en proceso: httpx.AsyncClient contra la app ASGI (con lifespan:
+#contenedor, maestros e índice de búsqueda) sobre la base sintética de benchmarks/bench_repositories.py.
+#N trabajadores en lazo cerrado envían una mezcla ponderada de requests (resúmenes del dashboard, búsquedas
+#de conciertos por rango, setlists, tracks de álbumes, búsqueda) con X-Santana-App-Token válido y se reporta
+#throughput y latencias p50/p95/p99 por nivel de concurrencia y por tipo de request.
+#Cliente y servidor comparten el event loop: la latencia incluye al cliente y no hay red de por medio;
+#sirve para comparar commits y encontrar el punto de saturación, no como latencia absoluta de producción.
+
+# python -m benchmarks.load_test --scale 1 --concurrency 1 8 32 --duration 30
+# python -m benchmarks.load_test --scale 10 --concurrency 64 --requests 5000 --groups dashboard setlists
+# python -m benchmarks.load_test --backend memory --scale 0.1 --concurrency 4 --duration 10
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from benchmarks.archive_generator import FAMOUS_TITLES, FIRST_YEAR, LAST_YEAR, ArchiveGenerator
+from benchmarks.bench_repositories import RESULTS_DIR, git_commit, open_database, seed
+
+API = "/api/v1"
+TOKEN_HEADER = "X-Santana-App-Token"
+
+class Ids:
+    """Rangos de ids del archivo sembrado, para que cada request pida un recurso distinto."""
+
+    def __init__(self, counts: dict):
+        self.concerts = counts.get("concerts", 1)
+        self.albums = counts.get("albums", 1)
+        self.countries = counts.get("countries", 1)
+
+# (grupo, nombre, peso, ruta): pesos aproximados del tráfico del frontend en temporada de giras
+MIX: List[Tuple[str, str, int, Callable[[random.Random, Ids], str]]] = [
+    ("dashboard", "concerts-executive-summary", 10, lambda r, ids: f"{API}/statistics/concerts/executive-summary"),
+    ("dashboard", "discography-executive-summary", 5, lambda r, ids: f"{API}/statistics/discography/executive-summary"),
+    ("dashboard", "top-20-most-played", 6, lambda r, ids: f"{API}/statistics/concerts/get-top-20-most-played-songs"),
+    ("dashboard", "concerts-by-year", 4, lambda r, ids: f"{API}/statistics/concerts/get-concerts-stats-by-year"),
+    ("dashboard", "concert-counts-by-country", 3, lambda r, ids: f"{API}/statistics/concerts/get-concert-counts-by-country"),
+    ("dashboard", "top-20-openers", 3, lambda r, ids: f"{API}/statistics/concerts/get-top-20-concert-opener-tracks"),
+    ("dashboard", "top-segues", 2, lambda r, ids: f"{API}/statistics/concerts/get-top-segues"),
+    ("concerts", "concerts-by-year-range", 12, lambda r, ids: _year_range(r)),
+    ("concerts", "concerts-by-country", 4, lambda r, ids: f"{_year_range(r)}&countryId={r.randint(1, ids.countries)}"),
+    ("concerts", "concerts-by-date", 3, lambda r, ids: f"{API}/concerts/get-by-date?search_date={_random_date(r)}"),
+    ("setlists", "setlist", 12, lambda r, ids: f"{API}/concerts/get-setlist?concertId={r.randint(1, ids.concerts)}"),
+    ("setlists", "setlists-batch", 4, lambda r, ids: f"{API}/concerts/setlists?ids=" + ",".join(
+        str(r.randint(1, ids.concerts)) for _ in range(20))),
+    ("setlists", "setlist-transitions", 2, lambda r, ids: f"{API}/statistics/concerts/get-setlist-transitions?song={r.choice(FAMOUS_TITLES[:10])}"),
+    ("albums", "album-tracks", 10, lambda r, ids: f"{API}/tracks/album/{r.randint(1, ids.albums)}"),
+    ("albums", "album-detail", 6, lambda r, ids: f"{API}/albums/{r.randint(1, ids.albums)}"),
+    ("albums", "albums", 3, lambda r, ids: f"{API}/albums/"),
+    ("albums", "album-play-counts", 3, lambda r, ids: f"{API}/statistics/concerts/get-tracks-with-play-count-by-album?albumId={r.randint(1, ids.albums)}"),
+    ("search", "search", 5, lambda r, ids: f"{API}/search/?q={r.choice(['black', 'oye', 'soul', 'europa', 'venue 1'])}"),
+]
+
+def _year_range(r: random.Random) -> str:
+    year = r.randint(FIRST_YEAR, LAST_YEAR)
+    return f"{API}/concerts/?startDate={year}-01-01&endDate={year}-12-31&pageSize=50"
+
+def _random_date(r: random.Random) -> str:
+    return f"{r.randint(FIRST_YEAR, LAST_YEAR)}-{r.randint(1, 12):02d}-{r.randint(1, 28):02d}"
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def latency_summary(samples: List[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p95_ms": round(percentile(ordered, 95), 2),
+        "p99_ms": round(percentile(ordered, 99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0
+    }
+
+async def run_level(client, mix, ids: Ids, concurrency: int, duration: Optional[float],
+                    total_requests: Optional[int], seed: int) -> dict:
+    """Trabajadores en lazo cerrado: cada uno envía el siguiente request apenas recibe la respuesta."""
+    weights = [weight for _, _, weight, _ in mix]
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[int, int]] = {}
+    errors: Dict[str, int] = {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker(worker_id: int):
+        nonlocal issued
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            if deadline and time.perf_counter() >= deadline:
+                return
+            if total_requests is not None:
+                if issued >= total_requests:
+                    return
+                issued += 1
+            _, name, _, build = rng.choices(mix, weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await client.get(build(rng, ids))
+                status = response.status_code
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                status = 599
+            elapsed = (time.perf_counter() - started) * 1000
+            latencies.setdefault(name, []).append(elapsed)
+            by_status = statuses.setdefault(name, {})
+            by_status[status] = by_status.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall_s = time.perf_counter() - started
+
+    all_samples = [ms for samples in latencies.values() for ms in samples]
+    failed = sum(count for by_status in statuses.values() for status, count in by_status.items() if status >= 400)
+    return {
+        "concurrency": concurrency,
+        "wall_s": round(wall_s, 2),
+        "requests": len(all_samples),
+        "failed": failed,
+        "throughput_rps": round(len(all_samples) / wall_s, 1) if wall_s else 0.0,
+        "latency": latency_summary(all_samples),
+        "exceptions": errors,
+        "endpoints": {
+            name: {**latency_summary(samples), "statuses": {str(k): v for k, v in sorted(statuses[name].items())}}
+            for name, samples in sorted(latencies.items())
+        }
+    }
+
+def print_level(level: dict) -> None:
+    latency = level["latency"]
+    print(f"\n👥 concurrencia {level['concurrency']}: {level['requests']} requests en {level['wall_s']} s"
+          f" -> {level['throughput_rps']} req/s | p50 {latency['p50_ms']} ms | p95 {latency['p95_ms']} ms"
+          f" | p99 {latency['p99_ms']} ms | fallidos {level['failed']}")
+    print(f"   {'request':<34}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  status")
+    for name, row in level["endpoints"].items():
+        statuses = ", ".join(f"{code}×{count}" for code, count in row["statuses"].items())
+        print(f"   {name:<34}{row['count']:>7}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}  {statuses}")
+    for name, count in level["exceptions"].items():
+        print(f"   ⚠️  {name}: {count}")
+
+async def main(args):
+    import httpx
+
+    db, client = open_database(args.backend, args.uri, args.scale)
+    generator = ArchiveGenerator(args.scale, args.seed)
+    counts, _ = await seed(db, generator, force=False)
+    if client:
+        client.close()
+    ids = Ids(counts)
+
+    # La app lee el token y la conexión del entorno al arrancar (lifespan)
+    token = os.environ.setdefault("API_KEY_INTERNAL", "load-test-token")
+    os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost")
+    os.environ["MONGODB_URL"] = args.uri
+    os.environ["MONGODB_NAME"] = getattr(db, "name", "")
+    from app.main import app
+
+    mix = [entry for entry in MIX if not args.groups or entry[0] in args.groups]
+    print(f"🎯 Mezcla: {', '.join(f'{name}({weight})' for _, name, weight, _ in mix)}")
+
+    async def drive():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test",
+                                     headers={TOKEN_HEADER: token}, limits=limits, timeout=args.timeout) as http:
+            # Un request de cada tipo (snapshots, motor columnar, grafo de setlists, cachés) y luego
+            # --warmup requests de la mezcla; nada de esto entra en las mediciones
+            rng = random.Random(args.seed + 1)
+            for _, _, _, build in mix:
+                await http.get(build(rng, ids))
+            if args.warmup:
+                await run_level(http, mix, ids, 1, None, args.warmup, args.seed + 1)
+            print(f"🔥 Calentamiento: {len(mix) + args.warmup} requests")
+            return [await run_level(http, mix, ids, level, args.duration if args.requests is None else None,
+                                    args.requests, args.seed) for level in args.concurrency]
+
+    if args.backend == "memory":
+        # Sin mongod: la app usa la base en memoria vía override de get_db (sin lifespan)
+        from app.database import get_db
+        app.dependency_overrides[get_db] = lambda: db
+        levels = await drive()
+    else:
+        async with app.router.lifespan_context(app):
+            levels = await drive()
+
+    for level in levels:
+        print_level(level)
+
+    report = {
+        "commit": git_commit(), "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "backend": args.backend, "scale": args.scale, "counts": counts,
+        "engine": os.getenv("ANALYTICS_ENGINE", "mongo"), "duration_s": args.duration, "requests": args.requests,
+        "warmup": args.warmup, "mix": {name: weight for _, name, weight, _ in mix}, "levels": levels
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load-{report['commit']}-x{args.scale:g}.json"
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\n💾 Resultados en {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga en proceso de la API (httpx + ASGI)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Escala del archivo sintético (se siembra si falta)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backend", choices=["mongod", "memory"], default="mongod")
+    parser.add_argument("--uri", default=os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Trabajadores simultáneos por nivel")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos por nivel")
+    parser.add_argument("--requests", type=int, help="Requests por nivel (en lugar de --duration)")
+    parser.add_argument("--warmup", type=int, default=100, help="Requests previos que no se miden")
+    parser.add_argument("--groups", nargs="+", choices=sorted({group for group, _, _, _ in MIX}),
+                        help="Solo estos grupos de la mezcla")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por request en segundos")
+    parser.add_argument("--output", help="Ruta del JSON (por defecto benchmarks/results/load-<commit>-x<escala>.json)")
+    args = parser.parse_args()
+    asyncio.run(main(args))
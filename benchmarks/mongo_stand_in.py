@@ -0,0 +1,112 @@
+#Base en memoria con la interfaz de Motor que usan los repositorios, sobre mongomock (pip install -r requirements-dev.txt).
+#Sirve para correr los benchmarks sin un mongod local: los tiempos NO son comparables con los de Mongo
+#(mongomock ejecuta los pipelines en Python) y algunos operadores no están soportados; esos métodos
+#se reportan con status "error" en lugar de detener la corrida.
+from typing import Any
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+try:
+    import mongomock
+except ImportError:  # pragma: no cover - dependencia opcional de los benchmarks
+    mongomock = None
+
+class StandInCursor:
+    def __init__(self, source):
+        self._source = source
+        self._iterator = None
+
+    def sort(self, *args, **kwargs):
+        self._source = self._source.sort(*args, **kwargs)
+        return self
+
+    def limit(self, n: int):
+        self._source = self._source.limit(n)
+        return self
+
+    def skip(self, n: int):
+        self._source = self._source.skip(n)
+        return self
+
+    def batch_size(self, n: int):
+        return self
+
+    async def to_list(self, length=None):
+        rows = list(self._source)
+        return rows if length is None else rows[:length]
+
+    def __aiter__(self):
+        self._iterator = iter(self._source)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+class StandInCollection:
+    def __init__(self, collection, database):
+        self._collection = collection
+        self.database = database
+        self.name = collection.name
+        self.read_preference = None
+
+    def find(self, *args, **kwargs) -> StandInCursor:
+        return StandInCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline, **kwargs) -> StandInCursor:
+        # allowDiskUse, hint, etc. no aplican en memoria
+        return StandInCursor(self._collection.aggregate(pipeline))
+
+    async def bulk_write(self, operations, ordered: bool = True):
+        """El bulk_write de mongomock no acepta las operaciones de PyMongo 4.x: se aplican una por una."""
+        collection = self._collection
+        for op in operations:
+            if isinstance(op, ReplaceOne):
+                collection.replace_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, UpdateOne):
+                collection.update_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, UpdateMany):
+                collection.update_many(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, InsertOne):
+                collection.insert_one(op._doc)
+            elif isinstance(op, DeleteOne):
+                collection.delete_one(op._filter)
+            elif isinstance(op, DeleteMany):
+                collection.delete_many(op._filter)
+
+    def list_indexes(self) -> StandInCursor:
+        return StandInCursor(iter(list(self._collection.list_indexes())))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._collection, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return attr(*args, **kwargs)
+        return call
+
+class StandInDatabase:
+    def __init__(self, name: str = "santana_bench"):
+        if mongomock is None:
+            raise RuntimeError("El backend en memoria necesita mongomock: pip install -r requirements-dev.txt")
+        self._db = mongomock.MongoClient()[name]
+        self.name = name
+
+    def __getattr__(self, name: str) -> StandInCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return StandInCollection(self._db[name], self)
+
+    def __getitem__(self, name: str) -> StandInCollection:
+        return StandInCollection(self._db[name], self)
+
+    async def command(self, command, **kwargs):
+        return self._db.command(command)
+
+    async def drop_collection(self, name: str) -> None:
+        self._db.drop_collection(name)
+
+    async def list_collection_names(self):
+        return self._db.list_collection_names()
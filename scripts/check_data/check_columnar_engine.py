@@ -0,0 +1,141 @@
+#Compara el motor columnar en memoria (ANALYTICS_ENGINE=columnar) con los pipelines de Mongo de
+#StatisticsConcertsRepository y StatisticsDiscographyRepository, método por método. No escribe nada en --db:
+#los snapshots (stats_snapshots) se omiten y cada pipeline se ejecuta directamente.
+#Los empates de un $sort no tienen orden garantizado en Mongo: si solo cambia el orden de filas empatadas
+#se reporta como aviso, no como diferencia; en los top N también pueden cambiar las filas empatadas en el corte.
+
+# python -m scripts.check_data.check_columnar_engine
+# python -m scripts.check_data.check_columnar_engine --scale 1 --seed 7
+# python -m scripts.check_data.check_columnar_engine --db
+import argparse
+import asyncio
+import json
+import sys
+import app.repositories.columnar_engine as engine_module
+from app.repositories.columnar_engine import columnar_engine
+from app.repositories.statistics_concerts_repository import StatisticsConcertsRepository
+from app.repositories.statistics_discography_repository import StatisticsDiscographyRepository
+
+class DirectPipelines:
+    """Reemplaza StatsSnapshotRepository: ejecuta el builder sin leer ni escribir stats_snapshots."""
+    async def get_or_build(self, key, builder):
+        return await builder()
+
+# Top N con $limit: campo del $sort cuyos empates en la última posición pueden dejar fuera filas distintas
+LIMIT_KEYS = {"get_top_20_most_played_songs": "play_count", "get_top_20_concert_opener_tracks": "play_count"}
+
+def cases(album_id):
+    """(repositorio, método, kwargs) de cada lectura que el motor columnar puede responder."""
+    concerts = [
+        "get_top_20_most_played_songs", "get_most_played_studio_albums", "get_most_explored_studio_albums",
+        "get_concerts_stats_by_year", "get_concert_counts_by_country", "get_top_20_concert_opener_tracks",
+        "get_non_album_songs", "get_geographic_conquest_milestones"
+    ]
+    discography = ["get_love_song_stats", "get_musical_genre_stats", "get_guest_artists_report",
+                   "get_instrumental_tracks_by_year"]
+    result = [(StatisticsConcertsRepository, name, {}) for name in concerts]
+    result.append((StatisticsConcertsRepository, "get_tracks_with_play_count_by_album", {"album_id": album_id}))
+    result += [(StatisticsDiscographyRepository, name, {}) for name in discography]
+    for name in ("get_instrumental_stats", "get_key_stats"):
+        result.append((StatisticsDiscographyRepository, name, {"match_query": {}, "album_id": None}))
+        result.append((StatisticsDiscographyRepository, name, {"match_query": {"album_id": album_id}, "album_id": album_id}))
+    return result
+
+async def run_case(db, repo_class, method, kwargs, engine):
+    engine_module.ANALYTICS_ENGINE = engine
+    repo = repo_class(db)
+    if hasattr(repo, "snapshots"):
+        repo.snapshots = DirectPipelines()
+    return await getattr(repo, method)(**kwargs)
+
+def canonical(row):
+    """Fila comparable sin importar el orden: floats redondeados para tolerar el último bit de $divide."""
+    def clean(value):
+        if isinstance(value, float):
+            return round(value, 9)
+        if isinstance(value, dict):
+            return {k: clean(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [clean(v) for v in value]
+        return value
+    return json.dumps(clean(row), sort_keys=True, default=str, ensure_ascii=False)
+
+def compare(expected, actual, limit_key=None):
+    """'ok', 'ties' (mismas filas, empates en otro orden) o el detalle de la primera diferencia."""
+    expected_rows, actual_rows = [canonical(r) for r in expected], [canonical(r) for r in actual]
+    if expected_rows == actual_rows:
+        return "ok"
+    if sorted(expected_rows) == sorted(actual_rows):
+        return "ties"
+    if limit_key and expected and len(expected) == len(actual):
+        # Fuera del valor de corte las filas deben coincidir; en el corte basta con el mismo conteo
+        cutoff = expected[-1].get(limit_key)
+        above = lambda rows: sorted(canonical(r) for r in rows if r.get(limit_key) != cutoff)
+        at_cutoff = lambda rows: sum(1 for r in rows if r.get(limit_key) == cutoff)
+        if above(expected) == above(actual) and at_cutoff(expected) == at_cutoff(actual):
+            return "ties"
+    if len(expected_rows) != len(actual_rows):
+        return f"{len(expected_rows)} filas en Mongo vs {len(actual_rows)} en columnar"
+    for i, (a, b) in enumerate(zip(expected_rows, actual_rows)):
+        if a != b:
+            return f"fila #{i}: Mongo {a} vs columnar {b}"
+    return "diferencias"
+
+async def seed_synthetic(scale, seed):
+    from benchmarks.archive_generator import ArchiveGenerator
+    from benchmarks.bench_repositories import seed as seed_archive
+    from benchmarks.mongo_stand_in import StandInDatabase
+    db = StandInDatabase("santana_check_columnar")
+    await seed_archive(db, ArchiveGenerator(scale, seed), force=True)
+    return db
+
+async def main(args):
+    if args.db:
+        from scripts.common.db_utils import db_manager
+        db = await db_manager.connect()
+        source = "base configurada"
+    else:
+        db = await seed_synthetic(args.scale, args.seed)
+        source = f"archivo sintético x{args.scale:g} (semilla {args.seed})"
+
+    try:
+        album = await db.albums.find_one({}, {"_id": 0, "id": 1}, sort=[("id", 1)])
+        columnar_engine.invalidate()
+        mismatches, ties, unsupported = [], [], []
+        print(f"🔎 Comparando motor columnar vs pipelines de Mongo sobre {source}")
+        for repo_class, method, kwargs in cases(album["id"] if album else None):
+            name = f"{repo_class.__name__}.{method}({', '.join(f'{k}={v}' for k, v in kwargs.items())})"
+            try:
+                expected = await run_case(db, repo_class, method, kwargs, "mongo")
+            except Exception as e:
+                # mongomock no implementa todos los operadores de los pipelines
+                unsupported.append(f"{name}: {type(e).__name__}: {e}"[:200])
+                continue
+            actual = await run_case(db, repo_class, method, kwargs, "columnar")
+            status = compare(expected or [], actual or [], LIMIT_KEYS.get(method))
+            if status == "ok":
+                print(f"   ✅ {name}: {len(expected or [])} filas")
+            elif status == "ties":
+                ties.append(name)
+                print(f"   🔀 {name}: mismas filas, empates en otro orden")
+            else:
+                mismatches.append(f"{name}: {status}")
+                print(f"   ❌ {name}: {status}")
+    finally:
+        engine_module.ANALYTICS_ENGINE = "mongo"
+        if args.db:
+            await db_manager.close()
+
+    for line in unsupported:
+        print(f"   ⏭️  Sin pipeline en este backend: {line}")
+    if mismatches:
+        print(f"❌ {len(mismatches)} métodos no coinciden")
+        sys.exit(1)
+    print(f"✅ El motor columnar coincide con los pipelines de Mongo ({len(ties)} con empates en otro orden)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paridad del motor columnar con los pipelines de Mongo")
+    parser.add_argument("--db", action="store_true", help="Comparar sobre la base configurada (MONGODB_URL) en lugar del archivo sintético")
+    parser.add_argument("--scale", type=float, default=0.2, help="Escala del archivo sintético (1 = tamaño real)")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
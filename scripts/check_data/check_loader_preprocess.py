@@ -0,0 +1,237 @@
+#Compara el preprocesamiento vectorizado de ConcertsLoader (preprocess) con el parseo fila a fila anterior
+#(groupby + iterrows + strptime + song_exceptions). No escribe nada: solo valida que fechas, llaves, setlists y track_ids coincidan.
+#El Excel conciertos_santana.xlsx usa otro layout (Lugar, Pais, Gira...): sus columnas se adaptan a las del loader.
+
+# python -m scripts.check_data.check_loader_preprocess
+# python -m scripts.check_data.check_loader_preprocess --synthetic 5000
+# python -m scripts.check_data.check_loader_preprocess --file scripts/data_sources/otro.xlsx --db
+import argparse
+import asyncio
+import random
+import sys
+from datetime import datetime, time
+from pathlib import Path
+import pandas as pd
+from scripts.common.title_matching import INITIAL_ALIASES, TitleIndex, normalize_title
+from scripts.maintenance.load_concerts import ConcertsLoader, DATE_FORMATS, GROUP_KEY, REQUIRED_COLUMNS
+
+DEFAULT_FILE = Path(__file__).parent.parent / "data_sources" / "conciertos_santana.xlsx"
+# Layout antiguo -> columnas de Conciertos-Consolidado
+LEGACY_COLUMNS = {"Lugar": "Venue", "Pais": "País", "Gira": "Tour", "Estado": "Código Estado"}
+# Valor constante para las columnas obligatorias que el layout antiguo no trae: con None el groupby
+# descartaría todas las filas y no se compararía ningún concierto
+PLACEHOLDER = "Sin dato"
+# Diccionario de alias original de ConcertsLoader (antes de TitleIndex y track_title_aliases)
+SONG_EXCEPTIONS = {
+    "jin-go-lo-ba": "Jingo",
+    "spirits dancing in the flesh": "Let There Be Light/Spirits Dancing in the Flesh",
+    "black magic woman": "Black Magic Woman/Gypsy queen",
+    "gypsy queen": "Black Magic Woman/Gypsy queen",
+    "right on": "Saja/Right On",
+    "saja": "Saja/Right On",
+    "contigo": "Contigo (With You)",
+    "holiday": "Life Is a Lady/Holiday",
+    "life is a lady": "Life Is a Lady/Holiday",
+    "stone flower (introduction)": "Stone Flower",
+}
+
+def legacy_normalize(text):
+    return str(text).strip().lower() if pd.notna(text) else ""
+
+def legacy_track_cache(tracks):
+    """Caché de tracks tal como la armaba ConcertsLoader.initialize: título normalizado -> candidatos."""
+    cache = {}
+    for d in tracks:
+        cache.setdefault(str(d.get('title')).strip().lower(), []).append({
+            'id': d.get('id'), 'is_live': d.get('metadata', {}).get('is_live', False)
+        })
+    return cache
+
+def legacy_resolve(cache, song_name):
+    """resolve_track_id original: song_exceptions + match exacto, estudio antes que live."""
+    norm_name = legacy_normalize(song_name)
+    candidates = cache.get(legacy_normalize(SONG_EXCEPTIONS.get(norm_name, norm_name)), [])
+    if not candidates:
+        return None
+    studio_track = next((c['id'] for c in candidates if not c['is_live']), None)
+    return studio_track if studio_track else candidates[0]['id']
+
+def legacy_parse(track_cache, df):
+    """Parseo fila a fila tal como lo hacía ConcertsLoader.run antes de la etapa vectorizada."""
+    parsed = []
+    for name, group in df.groupby(GROUP_KEY, sort=False):
+        first_row = group.iloc[0]
+        if any(pd.isna(first_row[f]) for f in REQUIRED_COLUMNS):
+            parsed.append({'status': 'invalid'})
+            continue
+
+        show_time = str(first_row['Hora Función']).strip() if pd.notna(first_row['Hora Función']) else ""
+        date_dt = None
+        raw_val = first_row['Fecha']
+        if isinstance(raw_val, datetime):
+            date_dt = raw_val
+        else:
+            raw_date = str(raw_val).strip().split(' ')[0]
+            for fmt in DATE_FORMATS:
+                try:
+                    date_dt = datetime.strptime(raw_date, fmt)
+                    break
+                except ValueError:
+                    continue
+        if not date_dt:
+            parsed.append({'status': 'bad_date'})
+            continue
+
+        h, m, s = 0, 0, 0
+        clean_time = "00:00:00"
+        time_ok = True
+        if show_time and ':' in show_time:
+            try:
+                parts = show_time.split(':')
+                h = int(parts[0])
+                m = int(parts[1]) if len(parts) > 1 else 0
+                s = int(parts[2]) if len(parts) > 2 else 0
+                clean_time = f"{h:02d}:{m:02d}:{s:02d}"
+            except ValueError:
+                time_ok = False
+        date_dt = date_dt.replace(hour=h, minute=m, second=s, microsecond=0)
+
+        songs = []
+        song_counter = 1
+        for _, s_row in group.iterrows():
+            if pd.isna(s_row['Canción']): continue
+            guest_names = []
+            raw_guests = s_row.get('Artista Invitado')
+            if pd.notna(raw_guests) and str(raw_guests).strip() != "":
+                guest_names = [art.strip() for art in str(raw_guests).split(',')]
+            for sub_s in [x.strip() for x in str(s_row['Canción']).split(' / ')]:
+                t_id_ref = legacy_resolve(track_cache, sub_s)
+                songs.append((song_counter, sub_s, tuple(guest_names), t_id_ref if t_id_ref else None,
+                              str(s_row['Es Cover?']).strip().upper() == 'VERDADERO'))
+                song_counter += 1
+
+        parsed.append({
+            'status': 'ok', 'time_ok': time_ok, 'concert_date': datetime(*date_dt.timetuple()[:6]),
+            'concert_date_str': f"{date_dt.strftime('%Y/%m/%d')} {clean_time}",
+            'show_time': show_time or None, 'songs': songs
+        })
+    return parsed
+
+def vectorized_parse(loader, df):
+    concerts, songs = loader.preprocess(df)
+    setlists = {}
+    for song in songs.to_dict('records'):
+        track_id = song['track_id']
+        setlists.setdefault(song['concert_idx'], []).append((
+            int(song['song_number']), song['song_name'], tuple(song['guest_names']),
+            int(track_id) if pd.notna(track_id) and track_id else None, bool(song['is_cover'])
+        ))
+
+    parsed = []
+    for concert_idx, row in concerts.iterrows():
+        if not row['valid']:
+            parsed.append({'status': 'invalid'})
+        elif not row['date_ok']:
+            parsed.append({'status': 'bad_date'})
+        else:
+            parsed.append({
+                'status': 'ok', 'time_ok': bool(row['time_ok']), 'concert_date': row['concert_date'].to_pydatetime(),
+                'concert_date_str': row['concert_date_str'], 'show_time': row['show_time'],
+                'songs': setlists.get(concert_idx, [])
+            })
+    return parsed
+
+def adapt_columns(df):
+    df = df.rename(columns={k: v for k, v in LEGACY_COLUMNS.items() if k in df.columns and v not in df.columns})
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            df[col] = PLACEHOLDER
+    # Celdas vacías en la llave de agrupación: ambos parseos descartan esas filas en silencio
+    df[GROUP_KEY] = df[GROUP_KEY].astype(object).where(df[GROUP_KEY].notna(), PLACEHOLDER)
+    for col in ['Hora Función', 'Tour', 'Código Estado', 'Nombre Estado', 'Canción', 'Artista Invitado', 'Es Cover?']:
+        if col not in df.columns:
+            df[col] = None
+    return df
+
+def synthetic_frame(n_concerts, titles, seed=7):
+    """Casos de borde del Excel: fechas datetime/string en varios formatos, horas inválidas, medleys, invitados."""
+    rng = random.Random(seed)
+    dates = [datetime(1970, 1, 1), "1971-03-04", "1971/3/4", "04/03/1972", "12/31/1973", "31-12-1973", "1975-06-07 00:00:00"]
+    times = [None, "20:00", "21:30:15", " 9:5 ", "20h", "20:xx", "7:30:pm", time(19, 45), ""]
+    songs = titles + ["Jin-Go-Lo-Ba", "Unknown Tune", f"{titles[0]} / {titles[1]}", "  Gypsy Queen ", None]
+    rows = []
+    for i in range(n_concerts):
+        base = {
+            'Fecha': rng.choice(dates) if rng.random() < 0.3 else datetime(1970 + i % 50, 1 + i % 12, 1 + i % 28),
+            'Venue': rng.choice([f"Venue {i % 300}", None]) if rng.random() < 0.02 else f"Venue {i % 300}",
+            'Tipo de Función': rng.choice(["Unique", "Early", "Late"]), 'Tipo de Concierto': "Concert",
+            'Tipo de Lugar': rng.choice(["Arena", "Club", None]), 'Ciudad': rng.choice(["Lima", "Madrid", "Tokyo"]),
+            'País': "X", 'Continente': "Y", 'Hora Función': rng.choice(times), 'Tour': rng.choice([None, "T1"]),
+            'Código Estado': None, 'Nombre Estado': None,
+        }
+        for _ in range(rng.randint(1, 12)):
+            rows.append({**base, 'Canción': rng.choice(songs), 'Artista Invitado': rng.choice([None, "", "A, B", "C,", " "]),
+                         'Es Cover?': rng.choice(["VERDADERO", "FALSO", " verdadero ", None, True])})
+    return pd.DataFrame(rows)
+
+def compare(legacy, vectorized):
+    mismatches = []
+    if len(legacy) != len(vectorized):
+        mismatches.append(f"conciertos: {len(legacy)} fila a fila vs {len(vectorized)} vectorizado")
+    for i, (a, b) in enumerate(zip(legacy, vectorized)):
+        if a != b:
+            diff = {k: (a.get(k), b.get(k)) for k in set(a) | set(b) if a.get(k) != b.get(k)}
+            mismatches.append(f"concierto #{i}: {diff}")
+    return mismatches
+
+async def initialize_from_db(loader):
+    """Caché del loader desde Mongo y los tracks crudos para la caché del parseo fila a fila."""
+    await loader.initialize()
+    return await loader.db.tracks.find({}, {"_id": 0, "id": 1, "title": 1, "metadata.is_live": 1}).to_list(length=None)
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridad del preprocesamiento vectorizado del loader de conciertos")
+    parser.add_argument("--file", default=str(DEFAULT_FILE))
+    parser.add_argument("--synthetic", type=int, default=0, help="Conciertos sintéticos en lugar del Excel")
+    parser.add_argument("--db", action="store_true", help="Cargar la caché de tracks desde Mongo para comparar track_ids")
+    args = parser.parse_args()
+
+    loader = ConcertsLoader()
+    tracks = []
+    if args.db:
+        tracks = asyncio.run(initialize_from_db(loader))
+
+    if args.synthetic:
+        titles = ["Jingo", "Evil Ways", "Soul Sacrifice", "Black Magic Woman/Gypsy queen", "Oye Como Va"]
+        if not args.db:
+            tracks = [{'id': 100 + i, 'title': t, 'metadata': {'is_live': True}} for i, t in enumerate(titles)]
+            tracks += [{'id': i + 1, 'title': t, 'metadata': {'is_live': i % 2 == 0}} for i, t in enumerate(titles)]
+            loader.titles = TitleIndex(tracks, {normalize_title(k): normalize_title(v) for k, v in INITIAL_ALIASES.items()})
+        df = synthetic_frame(args.synthetic, titles)
+        source = f"{args.synthetic} conciertos sintéticos"
+    else:
+        if not Path(args.file).exists():
+            print(f"❌ No se encontró el archivo en: {args.file}")
+            sys.exit(1)
+        df = adapt_columns(pd.read_excel(args.file))
+        source = Path(args.file).name
+
+    legacy, vectorized = legacy_parse(legacy_track_cache(tracks), df), vectorized_parse(loader, df)
+    statuses = pd.Series([c['status'] for c in legacy]).value_counts().to_dict()
+    songs = sum(len(c.get('songs', [])) for c in legacy)
+    print(f"📄 {source}: {len(df)} filas, {len(legacy)} conciertos {statuses}, {songs} canciones")
+
+    if not legacy:
+        print("❌ No se formó ningún concierto: no hay nada que comparar")
+        sys.exit(1)
+
+    mismatches = compare(legacy, vectorized)
+    if mismatches:
+        print(f"❌ {len(mismatches)} diferencias:")
+        for line in mismatches[:20]:
+            print(f"   {line}")
+        sys.exit(1)
+    print("✅ El preprocesamiento vectorizado coincide con el parseo fila a fila")
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@
 import asyncio
 import pandas as pd
 import re
+import time
 from scripts.common.db_utils import db_manager
+from scripts.common.title_matching import TitleIndex, load_aliases, normalize_title
 from pathlib import Path
 
 # Añadimos el parámetro studio_only
@@ -19,9 +21,8 @@ async def audit_tracks(filename: str, studio_only: bool = True):
     # Definimos el filtro de búsqueda
     query = {"metadata.is_live": False} if studio_only else {}
     
-    tracks_cursor = db.tracks.find(query, {"title": 1, "_id": 0})
-    tracks_db = [str(t['title']).strip() for t in await tracks_cursor.to_list(length=None)]
-    tracks_db_lower = {t.lower(): t for t in tracks_db}
+    tracks_cursor = db.tracks.find(query, {"id": 1, "title": 1, "metadata.is_live": 1, "_id": 0})
+    titles = TitleIndex(await tracks_cursor.to_list(length=None), await load_aliases(db))
 
     try:
         df = pd.read_excel(file_path)
@@ -47,22 +48,26 @@ async def audit_tracks(filename: str, studio_only: bool = True):
     songs_not_found = []
     songs_with_suggestions = []
     perfect_matches = 0
+    alias_matches = 0
+    lookup_seconds = 0.0
 
-    print(f"🔍 Auditando {len(sorted_unique_titles)} títulos únicos contra {len(tracks_db)} tracks en BD...")
+    print(f"🔍 Auditando {len(sorted_unique_titles)} títulos únicos contra {len(titles)} tracks en BD...")
 
     for song_clean in sorted_unique_titles:
-        song_lower = song_clean.lower()
+        song_lower = normalize_title(song_clean)
 
-        # 1. Match exacto
-        if song_lower in tracks_db_lower:
+        # 1. Match exacto (o vía alias de track_title_aliases)
+        if song_lower in titles.by_title:
             perfect_matches += 1
             continue
+        if titles.resolve(song_clean) is not None:
+            alias_matches += 1
+            continue
 
-        # 2. Búsqueda de similitudes
-        suggestions = [
-            original_title for lower_title, original_title in tracks_db_lower.items() 
-            if song_lower in lower_title or lower_title in song_lower
-        ]
+        # 2. Búsqueda de similitudes: candidatos por trigramas + Jaro-Winkler
+        start = time.perf_counter()
+        suggestions = [title for title, _ in titles.suggest(song_clean)]
+        lookup_seconds += time.perf_counter() - start
 
         if suggestions:
             songs_with_suggestions.append({
@@ -78,6 +83,7 @@ async def audit_tracks(filename: str, studio_only: bool = True):
     print(f"🎵 REPORTE DE CONSISTENCIA DE TRACKS - MODO: {mode_text}")
     print("="*85)
     print(f"✅ Match exacto: {perfect_matches}")
+    print(f"🔗 Match por alias: {alias_matches}")
     print(f"⚠️  Con similitudes: {len(songs_with_suggestions)}")
     print(f"❌ Sin coincidencia: {len(songs_not_found)}")
     print("="*85)
@@ -95,6 +101,9 @@ async def audit_tracks(filename: str, studio_only: bool = True):
 
     print("\n" + "="*85)
     print(f"TOTAL ANALIZADO: {len(sorted_unique_titles)} canciones únicas.")
+    searched = len(songs_with_suggestions) + len(songs_not_found)
+    if searched:
+        print(f"⏱️  Búsqueda de similitudes: {lookup_seconds * 1000 / searched:.3f} ms por título")
     print("="*85)
 
     await db_manager.close()
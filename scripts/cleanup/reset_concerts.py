@@ -18,7 +18,9 @@ async def reset_concerts():
         collections_to_clear = [
             'guest_artists_concerts',
             'concert_songs',
-            'concerts'
+            'concerts',
+            'track_play_stats',
+            'concert_changes'
         ]
 
         for coll in collections_to_clear:
@@ -40,6 +42,14 @@ async def reset_concerts():
             )
             logger.info(f"🔄 Secuencia '{seq}' reiniciada a 0.")
 
+        # 4. Nueva versión de datos para invalidar los snapshots de estadísticas
+        await db.counters.update_one(
+            {'_id': 'data_version'},
+            {'$inc': {'sequence_value': 1}},
+            upsert=True
+        )
+        logger.info("🔖 Versión de datos incrementada.")
+
         logger.info("🏁 Proceso de limpieza y reinicio completado.")
 
     except Exception as e:
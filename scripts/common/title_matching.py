@@ -0,0 +1,163 @@
+import heapq
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import jellyfish
+
+# Alias de títulos del Excel -> título del track en BD (antes song_exceptions en load_concerts.py).
+# Se administran con scripts/maintenance/track_title_aliases.py.
+TRACK_TITLE_ALIASES = "track_title_aliases"
+
+# Alias iniciales (los song_exceptions originales); se siembran si la colección está vacía
+INITIAL_ALIASES = {
+    "jin-go-lo-ba": "Jingo",
+    "spirits dancing in the flesh": "Let There Be Light/Spirits Dancing in the Flesh",
+    "black magic woman": "Black Magic Woman/Gypsy queen",
+    "gypsy queen": "Black Magic Woman/Gypsy queen",
+    "right on": "Saja/Right On",
+    "saja": "Saja/Right On",
+    "contigo": "Contigo (With You)",
+    "holiday": "Life Is a Lady/Holiday",
+    "life is a lady": "Life Is a Lady/Holiday",
+    "stone flower (introduction)": "Stone Flower",
+}
+
+_FOLD = re.compile(r"[^0-9a-z]+")
+
+def normalize_title(text) -> str:
+    """La misma normalización que usa el loader para el match exacto: trim + minúsculas."""
+    return str(text).strip().lower() if text is not None else ""
+
+def fold_title(text) -> str:
+    """Forma para comparar variantes: sin signos de puntuación y con espacios simples."""
+    return " ".join(_FOLD.sub(" ", normalize_title(text)).split())
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+async def load_aliases(db) -> Dict[str, str]:
+    """alias normalizado -> título destino normalizado"""
+    docs = await db[TRACK_TITLE_ALIASES].find({}, {"_id": 0, "alias": 1, "title": 1}).to_list(length=None)
+    return {normalize_title(d["alias"]): normalize_title(d["title"]) for d in docs if d.get("alias") and d.get("title")}
+
+async def save_alias(db, alias: str, title: str) -> None:
+    await db[TRACK_TITLE_ALIASES].update_one(
+        {"alias": normalize_title(alias)},
+        {"$set": {"title": str(title).strip(), "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+async def seed_initial_aliases(db) -> int:
+    for alias, title in INITIAL_ALIASES.items():
+        await save_alias(db, alias, title)
+    return len(INITIAL_ALIASES)
+
+async def delete_alias(db, alias: str) -> bool:
+    result = await db[TRACK_TITLE_ALIASES].delete_one({"alias": normalize_title(alias)})
+    return result.deleted_count > 0
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas sobre nombres (títulos, ciudades, países...) para sugerir parecidos:
+    los candidatos con más trigramas en común se puntúan con Jaro-Winkler (jellyfish).
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.entries: List[Tuple[str, str]] = []  # (forma plegada, nombre original); uno por forma plegada
+        self.gram_counts: List[int] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        seen = set()
+        for name in names:
+            folded = fold_title(name)
+            if not folded or folded in seen:
+                continue
+            seen.add(folded)
+            grams = trigrams(folded)
+            for gram in grams:
+                self.postings[gram].append(len(self.entries))
+            self.entries.append((folded, str(name).strip()))
+            self.gram_counts.append(len(grams))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def suggest(self, text, limit: int = 3, min_score: float = 0.85, max_candidates: int = 30) -> List[Tuple[str, float]]:
+        """[(nombre original, score)] ordenado de mayor a menor."""
+        folded = fold_title(text)
+        if not folded:
+            return []
+        grams = trigrams(folded)
+        # Los trigramas muy frecuentes ("cit", "the") no discriminan: se ignoran si hay otros más raros
+        common = max(64, len(self.entries) // 10)
+        postings = [self.postings[gram] for gram in grams if gram in self.postings]
+        rare = [p for p in postings if len(p) <= common]
+        overlap = defaultdict(int)
+        for posting in rare or postings:
+            for pos in posting:
+                overlap[pos] += 1
+
+        # Coeficiente de Dice sobre trigramas para acotar candidatos antes de puntuar
+        shortlist = heapq.nlargest(
+            max_candidates, overlap,
+            key=lambda pos: 2 * overlap[pos] / (len(grams) + self.gram_counts[pos])
+        )
+
+        scored = []
+        for pos in shortlist:
+            candidate, original = self.entries[pos]
+            score = jellyfish.jaro_winkler_similarity(folded, candidate)
+            # Medleys y nombres compuestos ("Black Magic Woman/Gypsy Queen"): contención por palabras completas
+            shorter, longer = sorted((folded, candidate), key=len)
+            if len(shorter) >= 4 and f" {shorter} " in f" {longer} ":
+                score = max(score, 0.9)
+            if score >= min_score:
+                scored.append((original, round(score, 3)))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+class TitleIndex:
+    """
+    Índice de títulos de tracks en memoria:
+    - match exacto (título normalizado -> candidatos, estudio antes que live) con alias;
+    - TrigramIndex sobre los títulos para sugerir variantes.
+    """
+
+    def __init__(self, tracks: Iterable[dict], aliases: Optional[Dict[str, str]] = None):
+        self.aliases = dict(aliases or {})
+        self.by_title: Dict[str, List[dict]] = {}
+        for t in tracks:
+            if not t.get("title"):
+                continue
+            self.by_title.setdefault(normalize_title(t["title"]), []).append({
+                "id": t.get("id"),
+                "is_live": t.get("metadata", {}).get("is_live", False),
+                "title": str(t["title"]).strip()
+            })
+
+        self.trigrams = TrigramIndex(candidates[0]["title"] for candidates in self.by_title.values())
+
+    def __len__(self) -> int:
+        return len(self.by_title)
+
+    def canonical(self, title) -> str:
+        """Título normalizado tras aplicar el alias (si lo hay)."""
+        norm = normalize_title(title)
+        return normalize_title(self.aliases.get(norm, norm))
+
+    def resolve(self, title) -> Optional[int]:
+        """track_id por alias/match exacto: prioridad estudio, luego cualquier versión (live)."""
+        candidates = self.by_title.get(self.canonical(title), [])
+        if not candidates:
+            return None
+        studio_track = next((c["id"] for c in candidates if not c["is_live"]), None)
+        return studio_track or candidates[0]["id"]
+
+    def lookup_table(self) -> Dict[str, int]:
+        """Título normalizado -> track_id resuelto (para joins vectorizados con pandas)."""
+        return {title: self.resolve(title) for title in self.by_title}
+
+    def suggest(self, title, limit: int = 3, min_score: float = 0.85) -> List[Tuple[str, float]]:
+        """Títulos parecidos (trigramas + Jaro-Winkler) tras aplicar el alias: [(título original, score)]."""
+        return self.trigrams.suggest(self.canonical(title), limit=limit, min_score=min_score)
@@ -0,0 +1,86 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from pymongo import DeleteMany, ReplaceOne
+
+# Colección derivada: una fila por track con sus estadísticas en vivo.
+# La leen los endpoints de top-20 y de conteo por álbum (app/repositories/statistics_concerts_repository.py).
+TRACK_PLAY_STATS = "track_play_stats"
+
+async def refresh_track_play_stats(db, track_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recalcula track_play_stats para los tracks indicados (o para todos si track_ids es None)
+    a partir de concert_songs. Los tracks sin ejecuciones se eliminan de la colección.
+    Devuelve la cantidad de filas escritas.
+    """
+    ids = None if track_ids is None else sorted({t for t in track_ids if t is not None})
+    if ids is not None and not ids:
+        return 0
+
+    match = {"track_ids": {"$exists": True, "$ne": []}} if ids is None else {"track_ids": {"$in": ids}}
+    pipeline = [
+        {"$match": match},
+        # Un track repetido dentro de la misma canción cuenta una sola vez
+        {"$project": {"concert_id": 1, "song_number": 1, "track_id": {"$setUnion": ["$track_ids", []]}}},
+        {"$unwind": "$track_id"},
+    ]
+    if ids is not None:
+        pipeline.append({"$match": {"track_id": {"$in": ids}}})
+    pipeline += [
+        # 1. Ejecuciones por (track, concierto)
+        {"$group": {
+            "_id": {"track_id": "$track_id", "concert_id": "$concert_id"},
+            "plays": {"$sum": 1},
+            "openers": {"$sum": {"$cond": [{"$eq": ["$song_number", 1]}, 1, 0]}}
+        }},
+        # 2. Fecha del concierto (una búsqueda por par, no por canción)
+        {"$lookup": {
+            "from": "concerts",
+            "localField": "_id.concert_id",
+            "foreignField": "id",
+            "as": "concert"
+        }},
+        {"$unwind": {"path": "$concert", "preserveNullAndEmptyArrays": True}},
+        # 3. Totales por track
+        {"$group": {
+            "_id": "$_id.track_id",
+            "total_plays": {"$sum": "$plays"},
+            "opener_count": {"$sum": "$openers"},
+            "distinct_concerts": {"$sum": 1},
+            "first_played": {"$min": "$concert.concert_date"},
+            "last_played": {"$max": "$concert.concert_date"}
+        }}
+    ]
+    rows = await db.concert_songs.aggregate(pipeline).to_list(length=None)
+
+    # Truncado a milisegundos (la precisión de las fechas en Mongo): se compara en el borrado de abajo
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    operations = [
+        ReplaceOne(
+            {"track_id": row["_id"]},
+            {
+                "track_id": row["_id"],
+                "total_plays": row["total_plays"],
+                "opener_count": row["opener_count"],
+                "distinct_concerts": row["distinct_concerts"],
+                "first_played": row.get("first_played"),
+                "last_played": row.get("last_played"),
+                "updated_at": now
+            },
+            upsert=True
+        )
+        for row in rows
+    ]
+
+    # Tracks que ya no se tocan en ningún concierto
+    if ids is None:
+        # Todas las filas vigentes se acaban de reescribir con updated_at = now: sin lista $nin de ids
+        operations.append(DeleteMany({"updated_at": {"$ne": now}}))
+    else:
+        not_played = sorted(set(ids) - {row["_id"] for row in rows})
+        if not_played:
+            operations.append(DeleteMany({"track_id": {"$in": not_played}}))
+
+    if operations:
+        await db[TRACK_PLAY_STATS].bulk_write(operations, ordered=False)
+    return len(rows)
@@ -4,31 +4,99 @@
 
 # python -m scripts.maintenance.load_concerts
 import pandas as pd
+import argparse
 import asyncio
 import logging
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from pymongo import DeleteMany, InsertOne, UpdateOne
 from scripts.common.db_utils import db_manager
+from scripts.common.title_matching import TitleIndex, load_aliases, seed_initial_aliases
+from scripts.common.track_play_stats import refresh_track_play_stats
+from scripts.maintenance.refresh_stats_snapshots import refresh_stats_snapshots
 
 # Configuración de Logs (Punto 10)
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger()
 
-class ConcertsLoader:
+# Llave de negocio del Excel y columnas obligatorias de la primera fila de cada concierto
+GROUP_KEY = ['Fecha', 'Venue', 'Tipo de Función', 'Ciudad']
+REQUIRED_COLUMNS = ['Fecha', 'Venue', 'Tipo de Función', 'Tipo de Concierto', 'Tipo de Lugar', 'Ciudad', 'País', 'Continente']
+OPTIONAL_COLUMNS = ['Tour', 'Hora Función', 'Código Estado', 'Nombre Estado', 'Canción', 'Artista Invitado', 'Es Cover?']
+DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y']
+
+class PhaseTimer:
+    """Acumula el tiempo de cada fase de la carga para el reporte final."""
+
     def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - start)
+
+    def report(self):
+        for name, seconds in self.phases.items():
+            logger.info(f"   ⏱️  {name:<16} {seconds:8.2f} s")
+
+class IdAllocator:
+    """
+    Reserva rangos de IDs con un solo $inc: n por contador (modo batch).
+    Al terminar devuelve los IDs no usados si nadie más tomó IDs del contador.
+    """
+
+    def __init__(self, db, block_size=100):
+        self.db = db
+        self.block_size = block_size
+        self.ranges = {}  # contador -> [siguiente, último reservado]
+
+    async def next_id(self, counter_name):
+        current = self.ranges.get(counter_name)
+        if current is None or current[0] > current[1]:
+            counter = await self.db.counters.find_one_and_update(
+                {'_id': counter_name},
+                {'$inc': {'sequence_value': self.block_size}},
+                upsert=True,
+                return_document=True
+            )
+            last = counter['sequence_value']
+            current = self.ranges[counter_name] = [last - self.block_size + 1, last]
+        value = current[0]
+        current[0] += 1
+        return value
+
+    async def release_unused(self):
+        for counter_name, (next_value, last) in self.ranges.items():
+            unused = last - next_value + 1
+            if unused > 0:
+                # Solo si el contador sigue en nuestro último ID reservado (nadie más lo incrementó)
+                await self.db.counters.update_one(
+                    {'_id': counter_name, 'sequence_value': last},
+                    {'$inc': {'sequence_value': -unused}}
+                )
+        self.ranges = {}
+
+class ConcertsLoader:
+    def __init__(self, batch_mode=False, batch_size=1000):
         self.db = None
+        # Modo batch: IDs por rangos y escrituras acumuladas en bulk_write no ordenados
+        self.batch_mode = batch_mode
+        self.batch_size = batch_size
+        self.id_allocator = None
+        self.pending = None
+        self.timings = PhaseTimer()
         self.cache = {}
-        self.song_exceptions = {
-            "jin-go-lo-ba": "Jingo",
-            "spirits dancing in the flesh": "Let There Be Light/Spirits Dancing in the Flesh",
-            "black magic woman": "Black Magic Woman/Gypsy queen",
-            "gypsy queen": "Black Magic Woman/Gypsy queen",
-            "right on": "Saja/Right On",
-            "saja": "Saja/Right On",
-            "contigo": "Contigo (With You)",
-            "holiday": "Life Is a Lady/Holiday",
-            "life is a lady": "Life Is a Lady/Holiday",
-            "stone flower (introduction)": "Stone Flower",
-            }
+        # Tracks cuyas ejecuciones cambiaron en esta carga (para track_play_stats)
+        self.touched_track_ids = set()
+        # Conciertos escritos en esta carga (concert_changes: delta de las matrices de setlists)
+        self.touched_concert_ids = set()
+        # Títulos de tracks (match exacto + alias de track_title_aliases)
+        self.titles = TitleIndex([])
 
     async def initialize(self):
         """Inicializa conexión y carga caché en memoria (Punto 7)"""
@@ -44,18 +112,13 @@ class ConcertsLoader:
             data = await cursor.to_list(length=None)
             
             if coll == 'tracks':
-                self.cache[coll] = {}
-                for d in data:
-                    title_norm = str(d.get('title')).strip().lower()
-                    # MODIFICACIÓN: Guardamos ID y el flag is_live
-                    track_info = {
-                        'id': d.get('id'),
-                        'is_live': d.get('metadata', {}).get('is_live', False)
-                    }
-                    
-                    if title_norm not in self.cache[coll]:
-                        self.cache[coll][title_norm] = []
-                    self.cache[coll][title_norm].append(track_info)
+                aliases = await load_aliases(self.db)
+                if not aliases:
+                    # Sin alias la recarga borraría los track_ids de Jingo, Black Magic Woman, etc.
+                    seeded = await seed_initial_aliases(self.db)
+                    logger.warning(f"⚠️ track_title_aliases estaba vacía: se registraron los {seeded} alias iniciales")
+                    aliases = await load_aliases(self.db)
+                self.titles = TitleIndex(data, aliases)
             elif coll == 'concerts':
                 # Llave: (fecha_str, venue_name_lower, show_type_id, city_id)
                 self.cache[coll] = {
@@ -63,7 +126,10 @@ class ConcertsLoader:
                     for d in data if d.get('concert_date_str')
                 }
             elif coll == 'cities':
-                self.cache[coll] = data
+                # Índice (nombre normalizado, country_id) -> city_id; ante duplicados gana el primero
+                self.cache[coll] = {}
+                for d in data:
+                    self.cache[coll].setdefault((self.normalize(d.get('name')), d.get('country_id')), d.get('id'))
             else:
                 name_field = 'name' if coll in ['continents', 'countries', 'states'] else f"{coll[:-1]}_name"
                 if coll == 'guest_artists_concerts': name_field = 'guest_artist_name'
@@ -77,6 +143,12 @@ class ConcertsLoader:
                     str(d.get(name_field)).strip().lower(): d.get(id_field) 
                     for d in data if d.get(name_field)
                 }
+                if coll == 'states':
+                    # Índice (código normalizado, country_id) -> state_id
+                    self.cache['state_codes'] = {
+                        (self.normalize(d.get('code')), d.get('country_id')): d.get(id_field)
+                        for d in data if d.get('code')
+                    }
                 
     async def get_next_id(self, counter_name):
         """Usa la colección counters (Punto 11)"""
@@ -88,6 +160,19 @@ class ConcertsLoader:
         )
         return counter['sequence_value']
 
+    async def next_id(self, counter_name):
+        """En modo batch toma el ID del rango reservado; si no, un $inc por ID."""
+        if self.batch_mode:
+            return await self.id_allocator.next_id(counter_name)
+        return await self.get_next_id(counter_name)
+
+    async def insert_doc(self, coll_name, doc):
+        """Alta de maestros/ciudades: inmediata o acumulada para el próximo bulk_write."""
+        if self.batch_mode:
+            self.pending['inserts'].setdefault(coll_name, []).append(doc)
+        else:
+            await self.db[coll_name].insert_one(doc)
+
     def normalize(self, text):
         """Aplica trim y minúsculas (Punto 8)"""
         return str(text).strip().lower() if pd.notna(text) else ""
@@ -99,14 +184,26 @@ class ConcertsLoader:
         if norm_name in self.cache[coll_name]:
             return self.cache[coll_name][norm_name]
         
-        new_id = await self.get_next_id(id_field)
+        new_id = await self.next_id(id_field)
         doc = {id_field: new_id, name_field: str(name_val).strip()}
         if extra_data: doc.update(extra_data)
         
-        await self.db[coll_name].insert_one(doc)
+        await self.insert_doc(coll_name, doc)
         self.cache[coll_name][norm_name] = new_id
         return new_id
 
+    async def get_or_create_state(self, name_val, code, country_id):
+        """Estado por (código, país); si el código no está indexado se busca/crea por nombre como antes."""
+        code_key = (self.normalize(code), country_id)
+        if code_key in self.cache['state_codes']:
+            return self.cache['state_codes'][code_key]
+        
+        state_id = await self.get_or_create_master('states', name_val, 'state_id', 'name', 
+                                                 {'code': code, 'country_id': country_id})
+        if state_id is not None:
+            self.cache['state_codes'][code_key] = state_id
+        return state_id
+
     async def process_geo(self, row):
         """Jerarquía Geográfica (Punto 2.4)"""
         cont_id = await self.get_or_create_master('continents', row['Continente'], 'continent_id', 'name')
@@ -114,19 +211,16 @@ class ConcertsLoader:
         
         state_id = None
         if pd.notna(row['Código Estado']):
-            state_id = await self.get_or_create_master('states', row['Nombre Estado'], 'state_id', 'name', 
-                                                     {'code': row['Código Estado'], 'country_id': country_id})
+            state_id = await self.get_or_create_state(row['Nombre Estado'], row['Código Estado'], country_id)
         
-        city_name = self.normalize(row['Ciudad'])
-        matched_cities = [c for c in self.cache['cities'] if self.normalize(c['name']) == city_name and c.get('country_id') == country_id]
+        city_key = (self.normalize(row['Ciudad']), country_id)
+        city_id = self.cache['cities'].get(city_key)
         
-        if matched_cities:
-            city_id = matched_cities[0]['id']
-        else:
-            city_id = await self.get_next_id('city_id')
+        if city_id is None:
+            city_id = await self.next_id('city_id')
             new_city = {'id': city_id, 'name': str(row['Ciudad']).strip(), 'country_id': country_id, 'state_id': state_id, 'code': None}
-            await self.db.cities.insert_one(new_city)
-            self.cache['cities'].append(new_city)
+            await self.insert_doc('cities', new_city)
+            self.cache['cities'][city_key] = city_id
         
         return {
             'city_id': city_id,
@@ -136,172 +230,349 @@ class ConcertsLoader:
         }
 
     def resolve_track_id(self, song_name):
-        # 1. Normalizar nombre del Excel
-        norm_name = self.normalize(song_name)
-        
-        # 2. NUEVO: Verificar si es una excepción (Alias)
-        search_name = self.song_exceptions.get(norm_name, norm_name)
+        """Alias -> match exacto; prioridad estudio, luego cualquier versión (live)."""
+        return self.titles.resolve(song_name)
 
-        final_search = self.normalize(search_name)
-        
-        # 3. Obtener candidatos de la caché
-        candidates = self.cache['tracks'].get(final_search, [])
-        
-        if not candidates:
+    def preprocess(self, df):
+        """
+        Etapa vectorizada previa a la escritura: fechas, horas, medleys y track_ids en columnas.
+        Devuelve (concerts, songs): una fila por concierto (grupo del Excel) y una por canción.
+        """
+        df = df.reset_index(drop=True)
+        for col in OPTIONAL_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+
+        # Agrupar por la llave de negocio del Excel (Punto 9); filas con llave vacía quedan fuera (-1)
+        df['concert_idx'] = df.groupby(GROUP_KEY, sort=False).ngroup()
+        df = df[df['concert_idx'] >= 0]
+
+        # --- Conciertos: solo cuenta la primera fila de cada grupo ---
+        concerts = df.drop_duplicates('concert_idx').set_index('concert_idx')
+        concerts['valid'] = concerts[REQUIRED_COLUMNS].notna().all(axis=1)
+
+        # Validación de Fecha (Punto 1): valores datetime tal cual, strings con los formatos conocidos
+        raw = concerts['Fecha']
+        is_dt = raw.map(lambda v: isinstance(v, datetime))
+        dates = pd.to_datetime(raw.where(is_dt), errors='coerce')
+        raw_date = raw.where(~is_dt).astype(str).str.strip().str.split(' ').str[0]
+        for fmt in DATE_FORMATS:
+            dates = dates.fillna(pd.to_datetime(raw_date, format=fmt, errors='coerce'))
+        concerts['date_ok'] = dates.notna()
+
+        # Hora: "HH[:MM[:SS]]"; si una parte no es entera se usa 00:00:00 en la llave
+        show_time = concerts['Hora Función'].where(concerts['Hora Función'].notna(), '').astype(str).str.strip()
+        has_time = show_time.str.contains(':', regex=False)
+        parts = show_time.where(has_time, '').str.split(':')
+        h, m, sec = (self._int_part(parts.str[i]) for i in range(3))
+        m_ok = m.notna() | (parts.str.len() < 2)
+        sec_ok = sec.notna() | (parts.str.len() < 3)
+        in_range = h.fillna(0).between(0, 23) & m.fillna(0).between(0, 59) & sec.fillna(0).between(0, 59)
+        parsed = has_time & h.notna() & m_ok & sec_ok & in_range
+        concerts['time_ok'] = ~has_time | parsed
+        # Como antes: las partes leídas antes de la primera inválida se aplican a la fecha
+        m = m.where(has_time & in_range & h.notna()).fillna(0).astype(int)
+        h = h.where(has_time & in_range).fillna(0).astype(int)
+        sec = sec.where(parsed).fillna(0).astype(int)
+        clean_time = (h.astype(str).str.zfill(2) + ':' + m.astype(str).str.zfill(2) + ':'
+                      + sec.astype(str).str.zfill(2)).where(parsed, '00:00:00')
+
+        dates = dates.dt.normalize() + pd.to_timedelta(h * 3600 + m * 60 + sec, unit='s')
+        concerts['concert_date'] = dates
+        concerts['concert_date_str'] = dates.dt.strftime('%Y/%m/%d') + ' ' + clean_time
+        concerts['show_time'] = show_time.where(show_time != '', None)
+
+        # --- Canciones: split de medleys " / " (Punto 3) y numeración por concierto ---
+        songs = df.loc[df['Canción'].notna(), ['concert_idx', 'Canción', 'Artista Invitado', 'Es Cover?']]
+        songs = songs.assign(song_name=songs['Canción'].astype(str).str.split(' / ')).explode('song_name')
+        # astype(object): sin canciones el explode deja una columna float y .str falla
+        songs['song_name'] = songs['song_name'].astype(object).str.strip()
+        songs['song_number'] = songs.groupby('concert_idx', sort=False).cumcount() + 1
+        songs['is_cover'] = songs['Es Cover?'].astype(str).str.strip().str.upper().eq('VERDADERO')
+
+        guests = songs['Artista Invitado']
+        has_guests = guests.notna() & guests.astype(str).str.strip().ne('')
+        songs['guest_names'] = [
+            [art.strip() for art in names] if ok else []
+            for names, ok in zip(guests.astype(str).str.split(','), has_guests)
+        ]
+
+        # track_id por join con el mapa de títulos (alias primero)
+        norm = songs['song_name'].str.strip().str.lower()
+        aliases = pd.Series(self.titles.aliases, dtype=object)
+        search = norm.map(aliases).fillna(norm).astype(object).str.strip().str.lower()
+        songs['track_id'] = search.map(self.titles.lookup_table()).astype('Int64')
+
+        songs = songs[['concert_idx', 'song_number', 'song_name', 'guest_names', 'track_id', 'is_cover']].reset_index(drop=True)
+        return concerts, songs
+
+    @staticmethod
+    def _int_part(part):
+        """Parte de la hora como entero (int() de Python: admite espacios y signo), NA si no lo es."""
+        text = part.where(part.notna(), '').astype(str)
+        return pd.to_numeric(text.where(text.str.fullmatch(r'\s*[+-]?\d+\s*')), errors='coerce')
+
+    def report_unmatched_titles(self, songs, limit=20):
+        """Canciones sin track: sugiere títulos parecidos (agregarlos con scripts.maintenance.track_title_aliases)."""
+        unmatched = sorted(songs.loc[songs['track_id'].isna(), 'song_name'].unique(), key=str.lower)
+        if not unmatched:
+            return
+        logger.info(f"🔎 {len(unmatched)} canciones sin track asociado")
+        for title in unmatched[:limit]:
+            suggestions = self.titles.suggest(title)
+            if suggestions:
+                options = " o ".join(f"'{t}' ({score})" for t, score in suggestions)
+                logger.info(f"   • '{title}' -> ¿{options}?")
+
+    async def prepare_concert(self, first_row, songs):
+        """Resuelve maestros/geografía de un concierto ya preprocesado y arma su setlist."""
+        if not first_row['valid']:
+            name = tuple(first_row[k] for k in GROUP_KEY)
+            logger.error(f"⚠️ Campos obligatorios incompletos en: {name}")
             return None
+        if not first_row['date_ok']:
+            logger.error(f"⚠️ Fecha no reconocida o vacía: {first_row['Fecha']}")
+            return None
+        if not first_row['time_ok']:
+            logger.warning(f"⚠️ Hora mal formateada '{first_row['show_time']}', usando 00:00:00")
+
+        # Obtener IDs de Maestros
+        st_id = await self.get_or_create_master('show_types', first_row['Tipo de Función'], 'show_type_id', 'show_type_name')
+        ct_id = await self.get_or_create_master('concert_types', first_row['Tipo de Concierto'], 'concert_type_id', 'concert_type_name')
+        vt_id = await self.get_or_create_master('venue_types', first_row['Tipo de Lugar'], 'venue_type_id', 'venue_type_name')
+        t_id = await self.get_or_create_master('tours', first_row['Tour'], 'tour_id', 'tour_name') if pd.notna(first_row['Tour']) else None
+        geo_data = await self.process_geo(first_row)
+
+        # Guest Artists: los nombres ya vienen separados, aquí solo se resuelven IDs
+        setlist = []
+        for song in songs:
+            guest_ids = [
+                await self.get_or_create_master('guest_artists_concerts', art, 'guest_artist_concert_id', 'guest_artist_name')
+                for art in song['guest_names']
+            ]
+            track_id = song['track_id']
+            setlist.append({
+                'song_number': int(song['song_number']),
+                'song_name': song['song_name'],
+                'guest_artist_ids': guest_ids,
+                'track_ids': [int(track_id)] if pd.notna(track_id) and track_id else [],
+                'is_cover': bool(song['is_cover'])
+            })
+
+        concert_date = first_row['concert_date'].to_pydatetime()
+        concert_date_str = first_row['concert_date_str']
+        return {
+            'concert_key': (concert_date_str, self.normalize(first_row['Venue']), st_id, geo_data['city_id']),
+            'concert_date': concert_date,
+            'concert_date_str': concert_date_str,
+            'venue_name': str(first_row['Venue']).strip(),
+            'venue_type_id': vt_id,
+            'show_type_id': st_id,
+            'show_time': first_row['show_time'],
+            'concert_type_id': ct_id,
+            'tour_id': t_id,
+            'geo': geo_data,
+            'songs': setlist
+        }
+
+    def concert_update_fields(self, concert):
+        geo_data = concert['geo']
+        return {
+            'venue_type_id': concert['venue_type_id'],
+            'show_type_id': concert['show_type_id'], 
+            'show_time': concert['show_time'], 
+            'concert_type_id': concert['concert_type_id'],
+            'tour_id': concert['tour_id'],
+            'state_id': int(geo_data['state_id']) if geo_data['state_id'] is not None else None,
+            'country_id': int(geo_data['country_id']),
+            'continent_id': int(geo_data['continent_id'])
+        }
+
+    def new_concert_doc(self, concert_id, concert):
+        geo_data = concert['geo']
+        return {
+            'id': concert_id, 
+            'concert_date': concert['concert_date'], 
+            'concert_date_str': concert['concert_date_str'],
+            'venue_name': concert['venue_name'], 
+            'venue_type_id': concert['venue_type_id'],
+            'show_type_id': concert['show_type_id'], 
+            'show_time': concert['show_time'], 
+            'concert_type_id': concert['concert_type_id'],
+            'tour_id': concert['tour_id'], 
+            'city_id': geo_data['city_id'], 
+            'state_id': geo_data['state_id'],
+            'country_id': geo_data['country_id'],
+            'continent_id': geo_data['continent_id'],
+            'concert_year': concert['concert_date'].year, 
+            'song_count': 0
+        }
+
+    async def write_concert(self, concert):
+        """Modo secuencial: escribe el concierto y su setlist de inmediato."""
+        concert_key = concert['concert_key']
+        concert_id = self.cache['concerts'].get(concert_key)
         
-        # 4. MODIFICACIÓN: Prioridad 1 -> No es Live (Estudio)
-        studio_track = next((c['id'] for c in candidates if not c['is_live']), None)
-        if studio_track:
-            return studio_track
-        
-        # 5. Prioridad 2 -> Cualquier versión disponible (Live)
-        return candidates[0]['id']
+        if concert_id:
+            logger.info(f"✅ Actualizando: {concert['concert_date_str']} - {concert['venue_name']}")
+            self.touched_track_ids.update(await self.db.concert_songs.distinct('track_ids', {'concert_id': concert_id}))
+            await self.db.concert_songs.delete_many({'concert_id': concert_id})
+            await self.db.concerts.update_one(
+                {'id': concert_id}, 
+                {'$set': self.concert_update_fields(concert)}
+            )
+        else:
+            concert_id = await self.get_next_id('concert_id')
+            logger.info(f"🆕 Nuevo: {concert['concert_date_str']} - {concert['venue_name']}")
+            await self.db.concerts.insert_one(self.new_concert_doc(concert_id, concert))
+            self.cache['concerts'][concert_key] = concert_id
 
-    async def run(self, file_path):
-        await self.initialize()
-        df = pd.read_excel(file_path)
-        # Agrupar por la llave de negocio del Excel (Punto 9)
-        grouped = df.groupby(['Fecha', 'Venue', 'Tipo de Función', 'Ciudad'], sort=False)
+        songs_to_insert = [{'concert_id': concert_id, **song} for song in concert['songs']]
+        if songs_to_insert:
+            for song in songs_to_insert:
+                self.touched_track_ids.update(song['track_ids'])
+            await self.db.concert_songs.insert_many(songs_to_insert)
+            await self.db.concerts.update_one({'id': concert_id}, {'$set': {'song_count': len(songs_to_insert)}})
+        self.touched_concert_ids.add(concert_id)
 
-        for name, group in grouped:
-            first_row = group.iloc[0]
-            
-            # Validación de obligatorios (Punto 6)
-            required = ['Fecha', 'Venue', 'Tipo de Función', 'Tipo de Concierto', 'Tipo de Lugar', 'Ciudad', 'País', 'Continente']
-            if any(pd.isna(first_row[f]) for f in required):
-                logger.error(f"⚠️ Campos obligatorios incompletos en: {name}")
-                continue
+    def new_pending(self):
+        # inserts: colección -> docs; new/updated: concert_id -> doc/$set; songs: concert_id -> setlist
+        return {'inserts': {}, 'new': {}, 'updated': {}, 'replaced': set(), 'songs': {}}
+
+    def pending_ops(self):
+        p = self.pending
+        return (sum(len(docs) for docs in p['inserts'].values()) + len(p['new']) + len(p['updated'])
+                + sum(len(songs) for songs in p['songs'].values()))
 
-            # Validación de Fecha (Punto 1)
-            raw_date = str(first_row['Fecha']).split(' ')[0] # Asegurar solo fecha
-            show_time = str(first_row['Hora Función']).strip() if pd.notna(first_row['Hora Función']) else ""
-            date_dt = None
-            concert_date_str = ""
+    async def queue_concert(self, concert):
+        """Modo batch: acumula las operaciones del concierto para el próximo flush."""
+        concert_key = concert['concert_key']
+        concert_id = self.cache['concerts'].get(concert_key)
+        songs = [{'concert_id': concert_id, **song} for song in concert['songs']] if concert_id else None
 
-            raw_val = first_row['Fecha']
-            if isinstance(raw_val, datetime):
-                date_dt = raw_val
+        if concert_id:
+            logger.info(f"✅ Actualizando: {concert['concert_date_str']} - {concert['venue_name']}")
+            fields = self.concert_update_fields(concert)
+            if songs:
+                fields['song_count'] = len(songs)
+            if concert_id in self.pending['new']:
+                # Mismo concierto dos veces en el Excel dentro del lote: se actualiza el alta pendiente
+                self.pending['new'][concert_id].update(fields)
             else:
-                raw_date = str(raw_val).strip().split(' ')[0]
-                # Intentar varios formatos si es string
-                for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y']:
-                    try:
-                        date_dt = datetime.strptime(raw_date, fmt)
-                        break
-                    except: continue
-
-            if not date_dt:
-                logger.error(f"⚠️ Fecha no reconocida o vacía: {first_row['Fecha']}")
+                self.pending['replaced'].add(concert_id)
+                self.pending['updated'].setdefault(concert_id, {}).update(fields)
+        else:
+            concert_id = await self.id_allocator.next_id('concert_id')
+            logger.info(f"🆕 Nuevo: {concert['concert_date_str']} - {concert['venue_name']}")
+            songs = [{'concert_id': concert_id, **song} for song in concert['songs']]
+            doc = self.new_concert_doc(concert_id, concert)
+            doc['song_count'] = len(songs) if songs else 0
+            self.pending['new'][concert_id] = doc
+            self.cache['concerts'][concert_key] = concert_id
+
+        # El setlist reemplaza al anterior (también si el concierto ya estaba en el lote)
+        self.pending['songs'][concert_id] = songs
+        self.touched_concert_ids.add(concert_id)
+
+    async def bulk(self, coll_name, operations):
+        """bulk_write no ordenados en bloques de batch_size."""
+        for i in range(0, len(operations), self.batch_size):
+            await self.db[coll_name].bulk_write(operations[i:i + self.batch_size], ordered=False)
+
+    async def flush(self):
+        p = self.pending
+        if not self.pending_ops() and not p['replaced']:
+            return
+
+        with self.timings.phase('write_masters'):
+            for coll_name, docs in p['inserts'].items():
+                await self.bulk(coll_name, [InsertOne(doc) for doc in docs])
+
+        # Las canciones anteriores se borran antes de insertar las nuevas (los bulk no ordenados no garantizan orden)
+        with self.timings.phase('delete_songs'):
+            replaced = sorted(p['replaced'])
+            for i in range(0, len(replaced), self.batch_size):
+                chunk = replaced[i:i + self.batch_size]
+                self.touched_track_ids.update(await self.db.concert_songs.distinct('track_ids', {'concert_id': {'$in': chunk}}))
+                await self.bulk('concert_songs', [DeleteMany({'concert_id': {'$in': chunk}})])
+
+        with self.timings.phase('write_concerts'):
+            operations = [InsertOne(doc) for doc in p['new'].values()]
+            operations += [UpdateOne({'id': concert_id}, {'$set': fields}) for concert_id, fields in p['updated'].items()]
+            await self.bulk('concerts', operations)
+
+        with self.timings.phase('write_songs'):
+            songs = [song for setlist in p['songs'].values() for song in setlist]
+            for song in songs:
+                self.touched_track_ids.update(song['track_ids'])
+            await self.bulk('concert_songs', [InsertOne(song) for song in songs])
+
+        self.pending = self.new_pending()
+
+    async def run(self, file_path):
+        started = time.perf_counter()
+        with self.timings.phase('initialize'):
+            await self.initialize()
+        if self.batch_mode:
+            self.id_allocator = IdAllocator(self.db)
+            self.pending = self.new_pending()
+
+        with self.timings.phase('read_excel'):
+            df = pd.read_excel(file_path)
+        with self.timings.phase('preprocess'):
+            concerts, songs = self.preprocess(df)
+            setlists = {}
+            for song in songs.to_dict('records'):
+                setlists.setdefault(song['concert_idx'], []).append(song)
+        self.report_unmatched_titles(songs)
+
+        for concert_idx, first_row in concerts.iterrows():
+            with self.timings.phase('prepare'):
+                concert = await self.prepare_concert(first_row, setlists.get(concert_idx, []))
+            if concert is None:
                 continue
 
-            # 2. Procesar la hora con tu variable show_time
-            h, m, s = 0, 0, 0
-            clean_time = "00:00:00" # Valor por defecto
-            
-            if show_time and ':' in show_time:
-                try:
-                    parts = show_time.split(':')
-                    h = int(parts[0])
-                    m = int(parts[1]) if len(parts) > 1 else 0
-                    s = int(parts[2]) if len(parts) > 2 else 0
-                    clean_time = f"{h:02d}:{m:02d}:{s:02d}"
-                except:
-                    logger.warning(f"⚠️ Hora mal formateada '{show_time}', usando 00:00:00")
-
-            # 3. Normalizar el objeto final y el string de la llave
-            date_dt = date_dt.replace(hour=h, minute=m, second=s, microsecond=0)
-            concert_date_str = f"{date_dt.strftime('%Y/%m/%d')} {clean_time}"
-
-            # Obtener IDs de Maestros
-            st_id = await self.get_or_create_master('show_types', first_row['Tipo de Función'], 'show_type_id', 'show_type_name')
-            ct_id = await self.get_or_create_master('concert_types', first_row['Tipo de Concierto'], 'concert_type_id', 'concert_type_name')
-            vt_id = await self.get_or_create_master('venue_types', first_row['Tipo de Lugar'], 'venue_type_id', 'venue_type_name')
-            t_id = await self.get_or_create_master('tours', first_row['Tour'], 'tour_id', 'tour_name') if pd.notna(first_row['Tour']) else None
-            geo_data = await self.process_geo(first_row)
-            city_id = geo_data['city_id']
-
-            # Idempotencia de Concert (Punto 9)
-            concert_key = (concert_date_str, self.normalize(first_row['Venue']), st_id, city_id)
-            concert_id = self.cache['concerts'].get(concert_key)
-            
-            if concert_id:
-                logger.info(f"✅ Actualizando: {concert_date_str} - {first_row['Venue']}")
-                await self.db.concert_songs.delete_many({'concert_id': concert_id})
-                
-                update_fields = {
-                    'venue_type_id': vt_id,
-                    'show_type_id': st_id, 
-                    'show_time': show_time or None, 
-                    'concert_type_id': ct_id,
-                    'tour_id': t_id,
-                    'state_id': int(geo_data['state_id']) if geo_data['state_id'] is not None else None,
-                    'country_id': int(geo_data['country_id']),
-                    'continent_id': int(geo_data['continent_id'])
-                }
-                
-                await self.db.concerts.update_one(
-                    {'id': concert_id}, 
-                    {'$set': update_fields}
-                )
+            if self.batch_mode:
+                await self.queue_concert(concert)
+                if self.pending_ops() >= self.batch_size:
+                    await self.flush()
             else:
-                concert_id = await self.get_next_id('concert_id')
-                logger.info(f"🆕 Nuevo: {concert_date_str} - {first_row['Venue']}")
-                concert_doc = {
-                    'id': concert_id, 
-                    'concert_date': date_dt, 
-                    'concert_date_str': concert_date_str,
-                    'venue_name': str(first_row['Venue']).strip(), 
-                    'venue_type_id': vt_id,
-                    'show_type_id': st_id, 
-                    'show_time': show_time or None, 
-                    'concert_type_id': ct_id,
-                    'tour_id': t_id, 
-                    'city_id': city_id, 
-                    'state_id': geo_data['state_id'],
-                    'country_id': geo_data['country_id'],
-                    'continent_id': geo_data['continent_id'],
-                    'concert_year': date_dt.year, 
-                    'song_count': 0
-                }
-                await self.db.concerts.insert_one(concert_doc)
-                self.cache['concerts'][concert_key] = concert_id
-
-            # Procesar Canciones (Punto 3)
-            songs_to_insert = []
-            song_counter = 1
-            for _, s_row in group.iterrows():
-                if pd.isna(s_row['Canción']): continue
-                
-                # Guest Artists
-                guest_ids = []
-                raw_guests = s_row.get('Artista Invitado')
-                if pd.notna(raw_guests) and str(raw_guests).strip() != "":
-                    for art in str(s_row['Artista Invitado']).split(','):
-                        g_id = await self.get_or_create_master('guest_artists_concerts', art.strip(), 'guest_artist_concert_id', 'guest_artist_name')
-                        guest_ids.append(g_id)
-
-                # Split de canciones " / " (Punto 3)
-                sub_songs = [s.strip() for s in str(s_row['Canción']).split(' / ')]
-                for sub_s in sub_songs:
-                    t_id_ref = self.resolve_track_id(sub_s)
-                    songs_to_insert.append({
-                        'concert_id': concert_id, 
-                        'song_number': song_counter, 
-                        'song_name': sub_s,
-                        'guest_artist_ids': guest_ids, 
-                        'track_ids': [t_id_ref] if t_id_ref else [],
-                        'is_cover': str(s_row['Es Cover?']).strip().upper() == 'VERDADERO'
-                    })
-                    song_counter += 1
-
-            if songs_to_insert:
-                await self.db.concert_songs.insert_many(songs_to_insert)
-                await self.db.concerts.update_one({'id': concert_id}, {'$set': {'song_count': len(songs_to_insert)}})
-
-        logger.info("🏁 Proceso terminado")
+                with self.timings.phase('write'):
+                    await self.write_concert(concert)
+
+        if self.batch_mode:
+            await self.flush()
+            await self.id_allocator.release_unused()
+
+        # Recalcular track_play_stats solo para los tracks tocados por esta carga
+        with self.timings.phase('play_stats'):
+            updated = await refresh_track_play_stats(self.db, self.touched_track_ids)
+        logger.info(f"📊 track_play_stats actualizada: {updated} tracks recalculados de {len(self.touched_track_ids)} afectados")
+
+        # Nueva versión de datos: invalida los snapshots de estadísticas (stats_snapshots)
+        data_version = await self.get_next_id('data_version')
+        logger.info(f"🔖 Versión de datos actualizada a {data_version}")
+        # Conciertos de esta versión: la API actualiza las matrices de setlists solo con ellos
+        await self.db.concert_changes.insert_one({
+            '_id': data_version,
+            'concert_ids': sorted(self.touched_concert_ids),
+            'created_at': datetime.now()
+        })
+
+        # Snapshots de estadísticas listos para la nueva versión (la API no los reconstruye en frío)
+        with self.timings.phase('snapshots'):
+            await refresh_stats_snapshots(self.db)
+
+        logger.info(f"🏁 Proceso terminado en {time.perf_counter() - started:.2f} s ({'batch' if self.batch_mode else 'secuencial'})")
+        self.timings.report()
 
 if __name__ == "__main__":
-    loader = ConcertsLoader()
     FILE_PATH = r"D:\Videos\santanarchive\ms-santanarchive-python\scripts\data_sources\Conciertos-Consolidado.xlsx"
-    asyncio.run(loader.run(FILE_PATH))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Carga de conciertos y setlists desde Excel")
+    parser.add_argument("file_path", nargs="?", default=FILE_PATH)
+    parser.add_argument("--batch", action="store_true", help="IDs por rangos y bulk_write no ordenados")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Operaciones por bulk_write")
+    args = parser.parse_args()
+
+    loader = ConcertsLoader(batch_mode=args.batch, batch_size=args.batch_size)
+    asyncio.run(loader.run(args.file_path))
@@ -0,0 +1,32 @@
+#Este script reconstruye por completo la colección track_play_stats (ejecuciones, aperturas, primera/última fecha y conciertos por track).
+#load_concerts la mantiene de forma incremental; usarlo tras cargas manuales o la primera vez.
+
+# python -m scripts.maintenance.rebuild_track_play_stats
+import asyncio
+import logging
+from scripts.common.db_utils import db_manager
+from scripts.common.track_play_stats import refresh_track_play_stats
+from scripts.maintenance.refresh_stats_snapshots import refresh_stats_snapshots
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger()
+
+async def rebuild_track_play_stats():
+    db = await db_manager.connect()
+
+    await db.track_play_stats.create_index("track_id", unique=True)
+    written = await refresh_track_play_stats(db)
+    logger.info(f"📊 track_play_stats reconstruida: {written} tracks con ejecuciones en vivo.")
+
+    # Nueva versión de datos para invalidar los snapshots de estadísticas
+    await db.counters.update_one(
+        {'_id': 'data_version'},
+        {'$inc': {'sequence_value': 1}},
+        upsert=True
+    )
+    await refresh_stats_snapshots(db)
+
+    await db_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_track_play_stats())
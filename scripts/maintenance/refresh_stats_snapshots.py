@@ -0,0 +1,35 @@
+#Precalcula los snapshots de estadísticas de conciertos (stats_snapshots) para la versión de datos actual
+#y elimina los de versiones anteriores. load_concerts y rebuild_track_play_stats lo ejecutan al terminar;
+#usarlo a mano tras otras escrituras que suban data_version (por ejemplo reset_concerts).
+
+# python -m scripts.maintenance.refresh_stats_snapshots
+import asyncio
+import logging
+import time
+from app.repositories.statistics_concerts_repository import StatisticsConcertsRepository
+from scripts.common.db_utils import db_manager
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger()
+
+async def refresh_stats_snapshots(db) -> bool:
+    """Devuelve False si algún pipeline falló (el snapshot se construirá en el primer request)."""
+    started = time.perf_counter()
+    try:
+        result = await StatisticsConcertsRepository(db).refresh_snapshots()
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudieron precalcular los snapshots de estadísticas: {e}")
+        return False
+    logger.info(f"📸 {len(result['built'])} snapshots de estadísticas precalculados en "
+                f"{time.perf_counter() - started:.2f} s ({result['purged']} obsoletos eliminados)")
+    return True
+
+async def main():
+    db = await db_manager.connect()
+    try:
+        await refresh_stats_snapshots(db)
+    finally:
+        await db_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+#Resume la colección capped slow_queries (app/core/slow_queries.py, API con SLOW_QUERY_LOG=true):
+#ranking de los métodos de repositorio más lentos con lo que mostró su último explain("executionStats").
+
+# python -m scripts.maintenance.slow_queries_report                      -> top 10 de las últimas 24 h
+# python -m scripts.maintenance.slow_queries_report --top 20 --hours 168 --sort total
+# python -m scripts.maintenance.slow_queries_report --method _build_top_20_concert_opener_tracks --stages
+# python -m scripts.maintenance.slow_queries_report --clear              -> vacía el log
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from scripts.common.db_utils import db_manager
+from app.core.slow_queries import SLOW_QUERY_COLLECTION
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger()
+
+SORT_FIELDS = {"max": "max_ms", "avg": "avg_ms", "total": "total_ms", "count": "count", "docs": "max_docs_examined"}
+
+def worst_offenders_pipeline(since: datetime, method: str, sort: str, top: int) -> list:
+    match = {"created_at": {"$gte": since}}
+    if method:
+        match["method"] = method
+    return [
+        {"$match": match},
+        # Orden natural de la capped = orden de inserción: $last es el explain más reciente
+        {"$group": {
+            "_id": {"repository": "$repository", "method": "$method", "collection": "$collection", "operation": "$operation"},
+            "count": {"$sum": 1},
+            "max_ms": {"$max": "$duration_ms"},
+            "avg_ms": {"$avg": "$duration_ms"},
+            "total_ms": {"$sum": "$duration_ms"},
+            "max_docs_examined": {"$max": "$summary.docs_examined"},
+            "max_collection_scans": {"$max": "$summary.collection_scans"},
+            "last_seen": {"$max": "$created_at"},
+            "explains": {"$push": {"$cond": [{"$ne": ["$summary", None]}, "$summary", "$$REMOVE"]}}
+        }},
+        {"$set": {"last_summary": {"$last": "$explains"}}},
+        {"$project": {"explains": 0}},
+        {"$sort": {SORT_FIELDS[sort]: -1}},
+        {"$limit": top}
+    ]
+
+def print_offender(rank: int, row: dict, show_stages: bool) -> None:
+    key = row["_id"]
+    logger.info(f"{rank:>2}. {key['repository']}.{key['method']}  [{key['collection']}.{key['operation']}]")
+    logger.info(f"    ⏱️  {row['count']} veces | máx {row['max_ms']:.0f} ms | prom {row['avg_ms']:.0f} ms | total {row['total_ms'] / 1000:.1f} s"
+                f" | último {row['last_seen']:%Y-%m-%d %H:%M}")
+
+    summary = row.get("last_summary")
+    if not summary:
+        logger.info("    ℹ️  Sin explain en la ventana (throttled/busy)")
+        return
+    ratio = summary["docs_examined"] / summary["n_returned"] if summary.get("n_returned") else None
+    logger.info(f"    🔎 docs examinados {summary['docs_examined']:,} | claves {summary['keys_examined']:,}"
+                f" | devueltos {summary.get('n_returned')}" + (f" | {ratio:,.0f} docs/resultado" if ratio else ""))
+    if summary["collection_scans"]:
+        logger.info(f"    ⚠️  {summary['collection_scans']} COLLSCAN")
+    if summary["indexes_used"]:
+        logger.info(f"    📇 índices: {', '.join(summary['indexes_used'])}")
+    for lookup in summary.get("lookups") or []:
+        logger.info(f"    🔗 $lookup {lookup.get('from')}: {lookup.get('strategy')}" + (f" ({lookup['index']})" if lookup.get("index") else ""))
+
+    if show_stages:
+        for stage in summary["stages"]:
+            details = [f"{stage.get('time_ms')} ms", f"{stage.get('n_returned')} docs"]
+            if stage.get("docs_examined") is not None:
+                details.append(f"{stage['docs_examined']:,} examinados")
+            if stage.get("collection_scans"):
+                details.append(f"{stage['collection_scans']} COLLSCAN")
+            if stage.get("plan"):
+                details.append(stage["plan"])
+            logger.info(f"       {stage['stage']:<14} " + " | ".join(details))
+
+async def main(top: int, hours: float, method: str, sort: str, show_stages: bool, clear: bool):
+    db = await db_manager.connect()
+    collection = db[SLOW_QUERY_COLLECTION]
+
+    if clear:
+        # Una capped no admite delete_many: se elimina y la API la recrea en la próxima captura
+        await collection.drop()
+        logger.info(f"🧹 {SLOW_QUERY_COLLECTION} eliminada.")
+        await db_manager.close()
+        return
+
+    since = datetime.utcnow() - timedelta(hours=hours)
+    rows = await collection.aggregate(worst_offenders_pipeline(since, method, sort, top)).to_list(length=None)
+    total = await collection.count_documents({"created_at": {"$gte": since}})
+    logger.info(f"🐢 {total} consultas lentas desde {since:%Y-%m-%d %H:%M} UTC (orden: {sort})\n")
+    if not rows:
+        logger.info("   ✅ Nada registrado. ¿La API corre con SLOW_QUERY_LOG=true?")
+    for rank, row in enumerate(rows, start=1):
+        print_offender(rank, row, show_stages)
+
+    await db_manager.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ranking de consultas lentas con su explain('executionStats')")
+    parser.add_argument("--top", type=int, default=10, help="Cantidad de métodos a mostrar")
+    parser.add_argument("--hours", type=float, default=24, help="Ventana hacia atrás, en horas")
+    parser.add_argument("--method", help="Solo un método de repositorio (p. ej. _build_top_20_concert_opener_tracks)")
+    parser.add_argument("--sort", choices=sorted(SORT_FIELDS), default="max", help="Criterio del ranking")
+    parser.add_argument("--stages", action="store_true", help="Muestra el detalle por etapa del último explain")
+    parser.add_argument("--clear", action="store_true", help="Vacía el log")
+    args = parser.parse_args()
+    asyncio.run(main(args.top, args.hours, args.method, args.sort, args.stages, args.clear))
@@ -0,0 +1,51 @@
+#Administra la colección track_title_aliases: variantes de títulos del Excel -> título del track en BD.
+#La usan ConcertsLoader.resolve_track_id y scripts/check_data/check_venue_tracks.py (scripts/common/title_matching.py).
+#--seed carga los alias que antes estaban fijos en load_concerts.py (song_exceptions); el loader los siembra solo si la colección está vacía.
+
+# python -m scripts.maintenance.track_title_aliases --list
+# python -m scripts.maintenance.track_title_aliases --seed
+# python -m scripts.maintenance.track_title_aliases --add "jin-go-lo-ba" "Jingo"
+# python -m scripts.maintenance.track_title_aliases --remove "jin-go-lo-ba"
+import argparse
+import asyncio
+from scripts.common.db_utils import db_manager
+from scripts.common.title_matching import (
+    TRACK_TITLE_ALIASES, TitleIndex, delete_alias, load_aliases, save_alias, seed_initial_aliases
+)
+
+async def main(args):
+    db = await db_manager.connect()
+    try:
+        if args.seed:
+            print(f"✅ {await seed_initial_aliases(db)} alias iniciales registrados")
+
+        if args.add:
+            alias, title = args.add
+            titles = TitleIndex(await db.tracks.find({}, {"_id": 0, "id": 1, "title": 1, "metadata.is_live": 1}).to_list(length=None))
+            if titles.resolve(title) is None:
+                suggestions = ", ".join(f"'{t}'" for t, _ in titles.suggest(title))
+                print(f"⚠️ '{title}' no es un título de tracks{f' (¿{suggestions}?)' if suggestions else ''}; se registra igual")
+            await save_alias(db, alias, title)
+            print(f"✅ Alias '{alias}' -> '{title}'")
+
+        if args.remove:
+            removed = await delete_alias(db, args.remove)
+            print(f"{'🗑️ Alias eliminado' if removed else '⚠️ No existe el alias'}: '{args.remove}'")
+
+        if args.list:
+            docs = await db[TRACK_TITLE_ALIASES].find({}, {"_id": 0}).sort("alias", 1).to_list(length=None)
+            print(f"📋 {len(docs)} alias en {TRACK_TITLE_ALIASES}:")
+            for doc in docs:
+                print(f"   • '{doc['alias']}' -> '{doc['title']}'")
+        elif not (args.seed or args.add or args.remove):
+            print(f"📋 {len(await load_aliases(db))} alias registrados (usa --list para verlos)")
+    finally:
+        await db_manager.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alias de títulos de canciones para el loader de conciertos")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--seed", action="store_true", help="Registrar los alias iniciales")
+    parser.add_argument("--add", nargs=2, metavar=("ALIAS", "TITLE"))
+    parser.add_argument("--remove", metavar="ALIAS")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,51 @@
+#Aplica el registro versionado de índices (app/schema_registry.py) y actualiza el documento schema_meta.
+#El arranque de la API solo compara versiones; este script es el que crea los índices.
+
+# python -m scripts.migrations.apply_schema            -> muestra el estado
+# python -m scripts.migrations.apply_schema --apply    -> crea los índices faltantes
+import argparse
+import asyncio
+import logging
+from scripts.common.db_utils import db_manager
+from app.schema_registry import INDEXES, SCHEMA_VERSION, apply_schema, get_schema_version
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger()
+
+async def missing_indexes(db) -> dict:
+    """Índices declarados en el registro que todavía no existen en la base."""
+    missing = {}
+    for collection, models in INDEXES.items():
+        # Por nombre: los índices de texto se listan con llaves internas (_fts, _ftsx)
+        existing = {info["name"] for info in await db[collection].list_indexes().to_list(length=None)}
+        pending = [m.document["name"] for m in models if m.document["name"] not in existing]
+        if pending:
+            missing[collection] = pending
+    return missing
+
+async def main(apply: bool):
+    db = await db_manager.connect()
+
+    version = await get_schema_version(db)
+    logger.info(f"🗂️  schema_meta: v{version} | registro: v{SCHEMA_VERSION}")
+
+    missing = await missing_indexes(db)
+    for collection, names in missing.items():
+        logger.info(f"   ➕ {collection}: {', '.join(names)}")
+    if not missing:
+        logger.info("   ✅ Todos los índices del registro existen.")
+
+    if apply:
+        created = await apply_schema(db)
+        total = sum(len(names) for names in created.values())
+        logger.info(f"🏁 Esquema v{SCHEMA_VERSION} aplicado ({total} índices verificados).")
+    elif version < SCHEMA_VERSION or missing:
+        logger.info("ℹ️  Ejecuta con --apply para crear los índices y registrar la versión.")
+
+    await db_manager.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Registro versionado de índices de MongoDB")
+    parser.add_argument("--apply", action="store_true", help="Crea los índices y actualiza schema_meta")
+    args = parser.parse_args()
+    asyncio.run(main(args.apply))